@@ -0,0 +1,7 @@
+# -*- coding: utf-8 -*-
+"""Micro benchmarks for swaggerpy. Run them from the repository root, e.g.
+
+.. code-block:: bash
+
+    python -m benchmarks.model_decode
+"""
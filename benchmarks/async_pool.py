@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+"""Compares the requests/s of :class:`AsynchronousHttpClient` with and
+without its pool of persistent connections, against a local Twisted server
+returning a pet.
+"""
+import time
+
+import crochet
+from twisted.internet import reactor
+from twisted.web.resource import Resource
+from twisted.web.server import Site
+
+from benchmarks.fixtures import pet_json
+from swaggerpy.async_http_client import AsynchronousHttpClient
+from swaggerpy.compat import json_dumps
+
+REQUESTS = 2000
+
+
+class PetResource(Resource):
+    isLeaf = True
+
+    def __init__(self):
+        Resource.__init__(self)
+        self.body = json_dumps(pet_json(1))
+
+    def render_GET(self, request):
+        request.setHeader('content-type', 'application/json')
+        return self.body
+
+
+@crochet.run_in_reactor
+def listen():
+    return reactor.listenTCP(0, Site(PetResource()), interface='127.0.0.1')
+
+
+def run(http_client, url, concurrency):
+    """Returns the requests/s of REQUESTS requests, sent in waves of
+    concurrent requests.
+    """
+    request_params = {'method': 'GET', 'url': url, 'params': {},
+                      'headers': {}}
+    start = time.time()
+    for _ in xrange(REQUESTS // concurrency):
+        eventuals = [http_client.start_request(dict(request_params))
+                     for _ in xrange(concurrency)]
+        for eventual in eventuals:
+            eventual.wait(timeout=10)
+    return REQUESTS / (time.time() - start)
+
+
+def main():
+    crochet.setup()
+    port = listen().wait(timeout=5).getHost().port
+    url = 'http://127.0.0.1:%d/pet/1' % port
+    for concurrency in (1, 10, 50):
+        print 'waves of %d concurrent requests' % concurrency
+        for label, http_client in (
+                ('new connection per request',
+                 AsynchronousHttpClient(persistent=False)),
+                ('pooled connections', AsynchronousHttpClient(
+                    max_persistent_per_host=concurrency))):
+            # Warm up, so that the pool is filled
+            run(http_client, url, concurrency)
+            print '  %-40s %10.0f requests/s' % (
+                label, run(http_client, url, concurrency))
+            http_client.close(timeout=5)
+
+
+if __name__ == '__main__':
+    main()
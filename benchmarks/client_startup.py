@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""Compares the startup time of a client built with
+:meth:`SwaggerClient.from_url` from api docs files, with loading it from a
+:mod:`swaggerpy.snapshot`, on synthetic specs of growing size.
+"""
+import copy
+import os
+import shutil
+import tempfile
+
+from benchmarks.fixtures import (
+    best_of,
+    PET_MODELS,
+    PET_OPERATIONS,
+    pet_api_declaration,
+)
+from swaggerpy.client import SwaggerClient
+from swaggerpy.compat import json
+from swaggerpy.snapshot import load_snapshot, save_snapshot
+
+
+def api_declaration(index):
+    """Pet declaration whose models and operations are renamed by index
+    """
+    declaration = pet_api_declaration()
+    declaration['models'] = {}
+    for name, model in PET_MODELS.iteritems():
+        model = copy.deepcopy(model)
+        model['id'] = '%s%d' % (name, index)
+        declaration['models'][model['id']] = model
+    text = json.dumps(declaration)
+    for name in PET_MODELS:
+        text = text.replace('"%s"' % name, '"%s%d"' % (name, index))
+    declaration = json.loads(text)
+    for api in declaration['apis']:
+        for operation in api['operations']:
+            operation['nickname'] += str(index)
+    return declaration
+
+
+def write_spec(directory, resources):
+    """Writes a resource listing of resources declarations, each with
+    the pet models and operations.
+
+    :returns: file url of the resource listing
+    """
+    listing = {
+        'swaggerVersion': '1.2',
+        'apis': [{'path': '/pet%d' % i} for i in xrange(resources)],
+    }
+    with open(os.path.join(directory, 'api-docs.json'), 'w') as fp:
+        json.dump(listing, fp)
+    os.mkdir(os.path.join(directory, 'api-docs'))
+    for i in xrange(resources):
+        path = os.path.join(directory, 'api-docs', 'pet%d.json' % i)
+        with open(path, 'w') as fp:
+            json.dump(api_declaration(i), fp)
+    return 'file://' + os.path.join(directory, 'api-docs')
+
+
+def main():
+    directory = tempfile.mkdtemp()
+    try:
+        for resources in (1, 10, 100):
+            spec_dir = os.path.join(directory, str(resources))
+            os.mkdir(spec_dir)
+            url = write_spec(spec_dir, resources)
+            snapshot_path = os.path.join(spec_dir, 'client.snapshot')
+            save_snapshot(SwaggerClient.from_url(url), snapshot_path)
+
+            print '%d resources, %d operations, %d models, snapshot %.1f kB' % (
+                resources, resources * len(PET_OPERATIONS),
+                resources * len(PET_MODELS),
+                os.path.getsize(snapshot_path) / 1e3)
+            for label, func in (
+                    ('from_url', lambda: SwaggerClient.from_url(url)),
+                    ('load_snapshot', lambda: load_snapshot(snapshot_path))):
+                print '  %-40s %10.2f ms' % (label, best_of(func) * 1000)
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""Specs, payloads and timing helpers shared by the benchmarks.
+"""
+import copy
+import time
+
+PET_MODELS = {
+    "Category": {
+        "id": "Category",
+        "properties": {
+            "id": {"type": "integer", "format": "int64"},
+            "name": {"type": "string"},
+        },
+    },
+    "Tag": {
+        "id": "Tag",
+        "properties": {
+            "id": {"type": "integer", "format": "int64"},
+            "name": {"type": "string"},
+        },
+    },
+    "Pet": {
+        "id": "Pet",
+        "required": ["id", "name"],
+        "properties": {
+            "id": {"type": "integer", "format": "int64"},
+            "category": {"$ref": "Category"},
+            "name": {"type": "string"},
+            "photoUrls": {"type": "array", "items": {"type": "string"}},
+            "tags": {"type": "array", "items": {"$ref": "Tag"}},
+            "status": {"type": "string"},
+            "birthday": {"type": "string", "format": "date-time"},
+        },
+    },
+}
+
+PET_OPERATIONS = [
+    {
+        "method": "GET",
+        "nickname": "findPets",
+        "type": "array",
+        "items": {"$ref": "Pet"},
+        "parameters": [
+            {"name": "status", "paramType": "query", "type": "string"},
+        ],
+    },
+    {
+        "method": "GET",
+        "nickname": "getPetById",
+        "type": "Pet",
+        "parameters": [
+            {"name": "petId", "paramType": "path", "type": "integer",
+             "format": "int64", "required": True},
+        ],
+    },
+    {
+        "method": "POST",
+        "nickname": "addPet",
+        "type": "void",
+        "parameters": [
+            {"name": "body", "paramType": "body", "type": "Pet",
+             "required": True},
+        ],
+    },
+]
+
+
+def pet_models():
+    return copy.deepcopy(PET_MODELS)
+
+
+def pet_api_declaration(base_path="http://localhost/api"):
+    return {
+        "swaggerVersion": "1.2",
+        "basePath": base_path,
+        "apis": [
+            {"path": "/pet", "operations": [copy.deepcopy(PET_OPERATIONS[0]),
+                                            copy.deepcopy(PET_OPERATIONS[2])]},
+            {"path": "/pet/{petId}",
+             "operations": [copy.deepcopy(PET_OPERATIONS[1])]},
+        ],
+        "models": pet_models(),
+    }
+
+
+def pet_resource_listing(base_path="http://localhost/api"):
+    return {
+        "swaggerVersion": "1.2",
+        "apis": [{
+            "path": "/pet",
+            "api_declaration": pet_api_declaration(base_path),
+        }],
+    }
+
+
+def pet_json(i, with_dates=False):
+    pet = {
+        "id": i,
+        "category": {"id": i % 7, "name": "category %d" % (i % 7)},
+        "name": "pet %d" % i,
+        "photoUrls": ["http://localhost/photos/%d" % i],
+        "tags": [{"id": 1, "name": "cute"}, {"id": 2, "name": "small"}],
+        "status": "available",
+    }
+    if with_dates:
+        # date-time parsing is slow enough to hide everything else
+        pet["birthday"] = "2014-06-10T23:49:54.728+0000"
+    return pet
+
+
+def pet_list_json(size, with_dates=False):
+    return [pet_json(i, with_dates) for i in xrange(size)]
+
+
+def best_of(func, repeat=5, number=1, setup=None):
+    """Returns the best wall time in seconds of `number` calls to func.
+
+    If setup is given, func is called with a fresh result of setup(), which
+    is not timed.
+    """
+    timings = []
+    for _ in xrange(repeat):
+        args = [(setup(),) if setup else () for _ in xrange(number)]
+        start = time.time()
+        for arg in args:
+            func(*arg)
+        timings.append((time.time() - start) / number)
+    return min(timings)
+
+
+def report(title, rows):
+    """Prints a table of (label, seconds, items) rows
+    """
+    print title
+    for label, seconds, items in rows:
+        print "  %-40s %10.2f ms %12.0f items/s" % (
+            label, seconds * 1000, items / seconds if seconds else 0)
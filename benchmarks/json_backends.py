@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+"""Compares the decode and encode throughput of the installed JSON backends
+of :mod:`swaggerpy.compat`, on the pet spec and on list responses.
+
+The ujson backend encodes with json, see
+:func:`swaggerpy.compat.load_json_backend`.
+"""
+from benchmarks.fixtures import best_of, pet_list_json, pet_resource_listing
+from swaggerpy import compat
+
+
+def installed_backends():
+    for name in compat.JSON_BACKENDS:
+        try:
+            yield compat.load_json_backend(name)
+        except ImportError:
+            print '%s is not installed' % name
+
+
+def main():
+    backends = list(installed_backends())
+    print 'default backend: %s\n' % compat.get_json_backend().name
+    payloads = [
+        ('resource listing', pet_resource_listing(), 100),
+        ('array:Pet response of 1000 items', pet_list_json(1000), 1),
+        ('array:Pet response of 10000 items', pet_list_json(10000), 1),
+    ]
+    for title, value, number in payloads:
+        text = compat.json.dumps(value)
+        print '%s, %.1f kB' % (title, len(text) / 1e3)
+        for backend in backends:
+            for label, func in (('decode', lambda: backend.loads(text)),
+                                ('encode', lambda: backend.dumps(value))):
+                seconds = best_of(func, number=number)
+                print '  %-20s %10.3f ms %10.1f MB/s' % (
+                    '%s %s' % (backend.name, label), seconds * 1000,
+                    len(text) / 1e6 / seconds if seconds else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+# -*- coding: utf-8 -*-
+"""Compares decoding large list responses through the generated per-model
+functions with a generic walk of ``_swagger_types``, which allocates a
+checker and a constructor object for every field of every instance, and the
+single pass decoding of :func:`swaggerpy.response.post_receive` with a check
+pass followed by a construct pass.
+"""
+import copy
+import datetime
+
+import dateutil.parser
+
+from benchmarks.fixtures import best_of, pet_list_json, pet_models, report
+from swaggerpy import swagger_type
+from swaggerpy.client import build_models
+from swaggerpy.response import post_receive, SwaggerResponseConstruct
+from swaggerpy.swagger_type import SwaggerTypeCheck
+
+
+class GenericTypeCheck(object):
+    """Field by field type check, walking the string swagger types.
+    """
+
+    def __init__(self, name, value, type_, models):
+        self.name = name
+        self.value = value
+        self.type_ = type_
+        self.models = models
+        if swagger_type.is_primitive(type_):
+            self.check_primitive()
+        elif swagger_type.is_array(type_):
+            item_type = swagger_type.get_array_item_type(type_)
+            self.value = [
+                GenericTypeCheck("%s's item" % name, item, item_type,
+                                 models).value
+                for item in value]
+        else:
+            self.check_complex()
+
+    def check_primitive(self):
+        ptype = swagger_type.get_primitive_mapping(self.type_)
+        if not isinstance(self.value, ptype):
+            if ptype == datetime.datetime:
+                self.value = dateutil.parser.parse(self.value)
+            else:
+                raise TypeError(self.name)
+
+    def check_complex(self):
+        klass = self.models[self.type_]
+        required = list(klass._required or [])
+        for key in self.value.keys():
+            if key in required:
+                required.remove(key)
+            if key in klass._swagger_types.keys():
+                self.value[key] = GenericTypeCheck(
+                    key, self.value[key], klass._swagger_types[key],
+                    self.models).value
+        if required:
+            raise AssertionError(required)
+
+
+class GenericResponseConstruct(object):
+    """Field by field construction, walking the string swagger types.
+    """
+
+    def __init__(self, value, type_, models):
+        self.value = value
+        self.type_ = type_
+        self.models = models
+
+    def create_object(self):
+        if self.value is None or swagger_type.is_primitive(self.type_):
+            return self.value
+        if swagger_type.is_array(self.type_):
+            item_type = swagger_type.get_array_item_type(self.type_)
+            return [GenericResponseConstruct(item, item_type,
+                                             self.models).create_object()
+                    for item in self.value]
+        klass = self.models[self.type_]
+        instance = klass()
+        instance._raw = self.value
+        for key in self.value.keys():
+            type_ = klass._swagger_types.get(key)
+            if type_ is not None:
+                setattr(instance, key, GenericResponseConstruct(
+                    self.value[key], type_, self.models).create_object())
+        return instance
+
+
+def generic_decode(response, type_, models):
+    response = GenericTypeCheck("Response", response, type_, models).value
+    return GenericResponseConstruct(response, type_, models).create_object()
+
+
+def two_pass_decode(response, type_, models):
+    response = SwaggerTypeCheck("Response", response, type_, models).value
+    return SwaggerResponseConstruct(response, type_, models).create_object()
+
+
+def main():
+    models = build_models(pet_models())
+    type_ = 'array:Pet'
+    compiled_type = swagger_type.compile_type(type_, models)
+    for size in (100, 1000, 10000):
+        payload = pet_list_json(size)
+
+        def setup():
+            return copy.deepcopy(payload)
+
+        rows = [
+            ('generic walk', best_of(
+                lambda body: generic_decode(body, type_, models),
+                setup=setup), size),
+            ('generated functions, two passes', best_of(
+                lambda body: two_pass_decode(body, compiled_type, models),
+                setup=setup), size),
+            ('generated functions, single pass', best_of(
+                lambda body: post_receive(body, compiled_type, models),
+                setup=setup), size),
+        ]
+        report('array:Pet response of %d items' % size, rows)
+
+
+if __name__ == '__main__':
+    main()
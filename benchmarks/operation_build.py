@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+"""Compares building the operations of a 500 operations spec with their
+docstrings generated upfront, as :class:`swaggerpy.client.Operation` did,
+with the docstrings generated on first access of ``__doc__``.
+"""
+import copy
+
+from benchmarks.fixtures import best_of, PET_OPERATIONS, pet_models, report
+from swaggerpy.client import (
+    build_models,
+    create_operation_docstring,
+    Operation,
+)
+
+OPERATIONS = 500
+
+
+def operation_spec(index):
+    """Pet operation, documented like the operations of real specs
+    """
+    operation = copy.deepcopy(PET_OPERATIONS[index % len(PET_OPERATIONS)])
+    operation['nickname'] += str(index)
+    operation['summary'] = 'Summary of operation %d' % index
+    operation['notes'] = 'Notes of operation %d, ' % index * 10
+    for param in operation['parameters']:
+        param['description'] = 'Description of %s' % param['name']
+    operation['responseMessages'] = [
+        {'code': code, 'message': 'Message of %d' % code}
+        for code in (400, 401, 403, 404, 500)]
+    return operation
+
+
+def build_operations(specs, models, eager_docstrings):
+    for operation in specs:
+        built = Operation(u'http://localhost/api/pet/{petId}', operation,
+                          None, models)
+        if eager_docstrings:
+            built.__doc__
+
+
+def main():
+    models = build_models(pet_models())
+    specs = [operation_spec(i) for i in xrange(OPERATIONS)]
+    rows = [
+        ('docstrings upfront', best_of(
+            lambda: build_operations(specs, models, True)), OPERATIONS),
+        ('docstrings on first access', best_of(
+            lambda: build_operations(specs, models, False)), OPERATIONS),
+        ('docstrings only', best_of(
+            lambda: [create_operation_docstring(spec) for spec in specs]),
+         OPERATIONS),
+    ]
+    report('building %d operations' % OPERATIONS, rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+"""Measures the cost of a custom processor on top of the validation of a
+1000 models declaration, applied in its own traversal or fused with
+:class:`swaggerpy.swagger_model.ValidationProcessor` by
+:class:`swaggerpy.processors.FusedProcessor`.
+"""
+from benchmarks.fixtures import best_of, report
+from benchmarks.spec_validation import resource_listing
+from swaggerpy.processors import FusedProcessor, SwaggerProcessor
+from swaggerpy.swagger_model import ValidationProcessor
+
+MODELS = 1000
+
+
+class DescriptionProcessor(SwaggerProcessor):
+    """Defaults the description of models, as templating processors do
+    """
+
+    def process_model(self, resources, resource, model, context):
+        model.setdefault(u'description', model[u'id'])
+
+
+def main():
+    spec = resource_listing(MODELS)
+    rows = [
+        ('validation', best_of(
+            lambda: ValidationProcessor().apply(spec), repeat=3), MODELS),
+        ('custom processor alone', best_of(
+            lambda: DescriptionProcessor().apply(spec), repeat=3), MODELS),
+        ('validation, then custom processor', best_of(
+            lambda: [ValidationProcessor().apply(spec),
+                     DescriptionProcessor().apply(spec)], repeat=3), MODELS),
+        ('fused', best_of(
+            lambda: FusedProcessor([
+                ValidationProcessor(), DescriptionProcessor()]).apply(spec),
+            repeat=3), MODELS),
+    ]
+    report('processing a declaration (items are models)', rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""Compares building the request of an operation call by walking the
+parameter specs on every call, as :func:`validate_and_add_params_to_request`
+does, with the request builder compiled once per operation by
+:func:`swaggerpy.client.build_request_builder`.
+"""
+from benchmarks.fixtures import best_of, pet_models, report
+from swaggerpy import swagger_type
+from swaggerpy.client import (
+    build_models,
+    build_request_builder,
+    validate_and_add_params_to_request,
+)
+
+URI = u'http://localhost/api/store/{storeId}/pet/{petId}'
+
+OPERATION = {
+    "method": "PUT",
+    "nickname": "updateStorePet",
+    "type": "void",
+    "parameters": [
+        {"name": "storeId", "paramType": "path", "type": "string",
+         "required": True},
+        {"name": "petId", "paramType": "path", "type": "integer",
+         "format": "int64", "required": True},
+        {"name": "status", "paramType": "query", "type": "string"},
+        {"name": "tags", "paramType": "query", "type": "string"},
+        {"name": "limit", "paramType": "query", "type": "integer",
+         "defaultValue": 10},
+        {"name": "X-Request-Id", "paramType": "header", "type": "string"},
+        {"name": "body", "paramType": "body", "type": "Category",
+         "required": True},
+    ],
+}
+
+KWARGS = {
+    'storeId': 'main',
+    'petId': 42,
+    'status': 'available',
+    'tags': ['cute', 'small'],
+    'X-Request-Id': 'abc',
+    'body': {'id': 1, 'name': 'cats'},
+}
+
+
+def walk_params(uri, operation, models, kwargs):
+    """Builds the request the way Operation did before request builders
+    """
+    request = {
+        'method': operation[u'method'].encode('utf8'),
+        'url': uri,
+        'params': {},
+        'headers': {},
+    }
+    for param in operation[u'parameters']:
+        value = kwargs.pop(param[u'name'], param.get('defaultValue'))
+        validate_and_add_params_to_request(param, value, request, models)
+    return request
+
+
+def main():
+    models = build_models(pet_models())
+    params = [(param, swagger_type.compile_type(
+        swagger_type.get_swagger_type(param), models))
+        for param in OPERATION[u'parameters']]
+    build_request = build_request_builder(URI, OPERATION, params, models)
+    assert walk_params(URI, OPERATION, models, dict(KWARGS)) == \
+        build_request(dict(KWARGS), {})
+
+    calls = 10000
+    rows = [
+        ('walk parameter specs', best_of(
+            lambda kwargs: walk_params(URI, OPERATION, models, kwargs),
+            number=calls, setup=lambda: dict(KWARGS)), 1),
+        ('compiled request builder', best_of(
+            lambda kwargs: build_request(kwargs, {}),
+            number=calls, setup=lambda: dict(KWARGS)), 1),
+    ]
+    report('request of an operation with %d parameters (per call)' %
+           len(OPERATION[u'parameters']), rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""Measures how validating an api declaration with
+:class:`swaggerpy.swagger_model.ValidationProcessor` scales with the number
+of models, on synthetic declarations of 10 to 10k models, each with a
+listing operation.
+"""
+from benchmarks.fixtures import best_of, report
+from swaggerpy.swagger_model import ValidationProcessor
+
+
+def model(index, models):
+    children = index * 2 if index * 2 < models else 0
+    return {
+        'id': 'Model%d' % index,
+        'properties': {
+            'id': {'type': 'integer', 'format': 'int64'},
+            'name': {'type': 'string'},
+            'parent': {'$ref': 'Model%d' % (index // 2)},
+            'children': {'type': 'array',
+                         'items': {'$ref': 'Model%d' % children}},
+        },
+    }
+
+
+def operation(index):
+    return {
+        'method': 'GET',
+        'nickname': 'listModel%d' % index,
+        'type': 'array',
+        'items': {'$ref': 'Model%d' % index},
+        'parameters': [
+            {'name': 'parent', 'paramType': 'query', 'type': 'integer'},
+            {'name': 'body', 'paramType': 'body', 'type': 'Model%d' % index},
+        ],
+    }
+
+
+def resource_listing(models):
+    """Resource listing of one declaration with models models
+    """
+    return {
+        'swaggerVersion': '1.2',
+        'apis': [{
+            'path': '/models',
+            'api_declaration': {
+                'swaggerVersion': '1.2',
+                'basePath': 'http://localhost/api',
+                'apis': [{'path': '/model%d' % i,
+                          'operations': [operation(i)]}
+                         for i in xrange(models)],
+                'models': dict(('Model%d' % i, model(i, models))
+                               for i in xrange(models)),
+            },
+        }],
+    }
+
+
+def main():
+    rows = []
+    for models in (10, 100, 1000, 10000):
+        spec = resource_listing(models)
+        # Validation only sets the name of properties, so the spec can be
+        # validated again
+        rows.append(('%d models' % models, best_of(
+            lambda: ValidationProcessor().apply(spec), repeat=3), models))
+    report('validation of a declaration (items are models)', rows)
+
+
+if __name__ == '__main__':
+    main()
@@ -9,32 +9,75 @@
 """
 
 from cStringIO import StringIO
-from swaggerpy.compat import json
+from swaggerpy.compat import json, json_loads
 import logging
+import Queue
+import time
+import urlparse
 
 import crochet
 import twisted.internet.error
 import twisted.web.client
 from twisted.internet import reactor
 from twisted.internet.defer import Deferred
+from twisted.internet.defer import DeferredSemaphore
+from twisted.internet.defer import succeed
 from twisted.internet.protocol import Protocol
+from twisted.python.failure import Failure
 from twisted.web.client import Agent
 from twisted.web.client import FileBodyProducer
+from twisted.web.client import HTTPConnectionPool
 from twisted.web.http_headers import Headers
 from yelp_uri import urllib_utf8
 
 from swaggerpy import client
 from swaggerpy import http_client
-from swaggerpy.exception import HTTPError
+from swaggerpy import instrumentation
+from swaggerpy.exception import HTTPError, TimeoutError
 from swaggerpy.multipart_response import create_multipart_content
+from swaggerpy.response import handle_response_errors
 
 log = logging.getLogger(__name__)
 
+# Receiving a streamed body is paused while that many chunks wait to be read
+MAX_PENDING_CHUNKS = 16
+
 
 class AsynchronousHttpClient(http_client.HttpClient):
     """Asynchronous HTTP client implementation.
+
+    Requests go through a pool of persistent connections, which are kept
+    open between requests to the same host, until :meth:`close` is called.
+
+    :param persistent: if False, open a new connection for every request
+    :param max_persistent_per_host: maximum number of idle connections kept
+        open for each host
+    :param idle_timeout: seconds after which an idle connection is closed
+    :param max_connections_per_host: maximum number of concurrent requests to
+        each host, others wait for a request to finish. Unlimited if None.
     """
 
+    sends_eagerly = True
+
+    def __init__(self, persistent=True, max_persistent_per_host=10,
+                 idle_timeout=240, max_connections_per_host=None):
+        self.pool = HTTPConnectionPool(reactor, persistent=persistent)
+        self.pool.maxPersistentPerHost = max_persistent_per_host
+        self.pool.cachedConnectionTimeout = idle_timeout
+        self.agent = Agent(reactor, pool=self.pool)
+        self.max_connections_per_host = max_connections_per_host
+        # Only used in the reactor thread
+        self._host_semaphores = {}
+
+    def cache_key(self):
+        """Clients of the same class and settings are interchangeable, as
+        they have no credentials.
+        """
+        return (type(self), self.pool.persistent,
+                self.pool.maxPersistentPerHost,
+                self.pool.cachedConnectionTimeout,
+                self.max_connections_per_host, self.default_timeout)
+
     def start_request(self, request_params):
         """Sets up the request params as per Twisted Agent needs.
         Sets up crochet and triggers the API request in background
@@ -44,6 +87,19 @@ class AsynchronousHttpClient(http_client.HttpClient):
 
         :return: crochet EventualResult
         """
+        request_params = self.prepare_request(request_params)
+        crochet.setup()
+        body_stream = _BodyStream()
+        return AsyncEventual(
+            self.fetch_deferred(request_params, body_stream), body_stream)
+
+    def prepare_request(self, request_params):
+        """Converts the request params to the arguments of
+        :meth:`twisted.web.client.Agent.request`
+
+        :param request_params: request parameters for API call
+        :type request_params: dict
+        """
         # request_params has mandatory: method, url, params, headers
         request_params = {
             'method': str(request_params.get('method', 'GET')),
@@ -57,20 +113,37 @@ class AsynchronousHttpClient(http_client.HttpClient):
         # crochet only supports bytes for the url
         if isinstance(request_params['uri'], unicode):
             request_params['uri'] = request_params['uri'].encode('utf-8')
-
-        crochet.setup()
-        return self.fetch_deferred(request_params)
+        return request_params
 
     @crochet.run_in_reactor
-    def fetch_deferred(self, request_params):
+    def fetch_deferred(self, request_params, body_stream=None):
         """The main core to start the reacter and run the API
-        in the background. Also the callbacks are registered here
+        in the background.
+
+        :param body_stream: receives the body instead of the returned result
+            if streaming is started, see :meth:`AsyncEventual.stream`
+        :type body_stream: :class:`_BodyStream`
 
         :return: crochet EventualResult
         """
+        return self.request_deferred(request_params, body_stream)
+
+    def request_deferred(self, request_params, body_stream=None):
+        """Runs the API call, from the reactor thread. The callbacks are
+        registered here.
+
+        :param request_params: arguments of
+            :meth:`twisted.web.client.Agent.request`, see
+            :meth:`prepare_request`
+        :param body_stream: receives the body instead of the returned result
+            if streaming is started, see :meth:`AsyncEventual.stream`
+        :type body_stream: :class:`_BodyStream`
+
+        :return: Deferred firing with the :class:`AsyncResponse`
+        """
         finished_resp = Deferred()
-        agent = Agent(reactor)
-        deferred = agent.request(**request_params)
+        deferred, release = self._acquire_connection(request_params['uri'])
+        deferred.addCallback(lambda _: self.agent.request(**request_params))
 
         def response_callback(response):
             """Callback for response received from server, even 4XX, 5XX possible
@@ -78,8 +151,10 @@ class AsynchronousHttpClient(http_client.HttpClient):
             It needs a callback method to be registered to store the response
             body which is provided using deliverBody
             """
-            response.deliverBody(_HTTPBodyFetcher(request_params,
-                                                  response, finished_resp))
+            fetcher = _HTTPBodyFetcher(
+                request_params, response, finished_resp, body_stream)
+            fetcher.lost.addCallback(release)
+            response.deliverBody(fetcher)
         deferred.addCallback(response_callback)
 
         def response_errback(reason):
@@ -88,11 +163,211 @@ class AsynchronousHttpClient(http_client.HttpClient):
             :param reason: The reason why request failed
             :type reason: str
             """
+            release()
+            if body_stream is not None:
+                body_stream.fail(reason)
+                if body_stream.streaming:
+                    return
             finished_resp.errback(reason)
         deferred.addErrback(response_errback)
 
         return finished_resp
 
+    def _acquire_connection(self, uri):
+        """Waits for a connection to the host of the uri to be available, if
+        the connections per host are limited. Called in the reactor thread.
+
+        :returns: a Deferred firing once the connection is available, and the
+            function releasing it
+        """
+        semaphore = None
+        if self.max_connections_per_host:
+            split = urlparse.urlsplit(uri)
+            key = (split.scheme, split.hostname, split.port)
+            semaphore = self._host_semaphores.get(key)
+            if semaphore is None:
+                semaphore = self._host_semaphores[key] = DeferredSemaphore(
+                    self.max_connections_per_host)
+        released = []
+
+        def release(_=None):
+            if semaphore is not None and not released:
+                released.append(True)
+                semaphore.release()
+        if semaphore is None:
+            return succeed(None), release
+        return semaphore.acquire(), release
+
+    def close(self, timeout=None):
+        """Closes the idle connections of the pool, and stops keeping
+        connections open for later requests.
+
+        :param timeout: seconds to wait for the connections to close
+        """
+        crochet.setup()
+        self._close_connections().wait(timeout=timeout)
+
+    @crochet.run_in_reactor
+    def _close_connections(self):
+        self.pool.persistent = False
+        return self.pool.closeCachedConnections()
+
+
+def record_wait(response, operation_id, start):
+    """Callback reporting the wait for a response to the hooks of
+    :mod:`swaggerpy.instrumentation`, which passes the response through.
+    """
+    instrumentation.record_timing(
+        operation_id, instrumentation.WAIT, start)
+    return response
+
+
+class TwistedHttpClient(AsynchronousHttpClient):
+    """HTTP client for code running in the Twisted reactor thread.
+
+    Operations return a Deferred, which fires with the result decoded with
+    the default options of :meth:`swaggerpy.response.HTTPFuture.result`. The
+    request is sent from the reactor thread, without going through crochet.
+    With :func:`twisted.internet.defer.inlineCallbacks`, operations are
+    waited for with ``yield``: ::
+
+        @inlineCallbacks
+        def get_pet_name(swagger_client, pet_id):
+            pet = yield swagger_client.pet.getPetById(petId=pet_id)
+            returnValue(pet.name)
+
+    The api docs are still fetched through crochet by
+    :meth:`swaggerpy.client.SwaggerClient.from_url`, which must not be called
+    from the reactor thread.
+
+    Takes the arguments of :class:`AsynchronousHttpClient`.
+    """
+
+    def create_future(self, request_params, post_receive,
+                      iter_post_receive=None, operation_id=None):
+        """Sends the request, from the reactor thread.
+
+        :return: Deferred firing with the result of post_receive
+        """
+        deferred = self.request_deferred(self.prepare_request(request_params))
+        if operation_id is not None and instrumentation.hooks:
+            # Reported as the wait for the response, from the time it is sent
+            deferred.addCallback(
+                record_wait, operation_id, time.time())
+
+        def receive(response):
+            try:
+                response.raise_for_status()
+            except Exception as e:
+                handle_response_errors(e)
+            return post_receive(response)
+        return deferred.addCallback(receive)
+
+
+class AsyncEventual(object):
+    """Result of :meth:`AsynchronousHttpClient.start_request`, which supports
+    the :class:`crochet.EventualResult` interface and streaming the body of
+    the response.
+
+    :param eventual: result of the request, with the whole body
+    :type eventual: :class:`crochet.EventualResult`
+    :param body_stream: receives the body once streaming is started
+    :type body_stream: :class:`_BodyStream`
+    """
+
+    def __init__(self, eventual, body_stream):
+        self._eventual = eventual
+        self._body_stream = body_stream
+
+    def wait(self, timeout=None):
+        """Waits for the response, with its whole body.
+
+        :param timeout: timeout for the request, in seconds
+        :rtype: :class:`AsyncResponse`
+        :raises: :class:`swaggerpy.exception.TimeoutError` if the response
+            is not received in time
+        """
+        try:
+            return self._eventual.wait(timeout=timeout)
+        except crochet.TimeoutError:
+            raise TimeoutError(
+                "No response received in %s seconds" % timeout)
+
+    def cancel(self):
+        self._eventual.cancel()
+
+    def stream(self, timeout=None):
+        """Waits for the status and headers of the response. Its body is read
+        with ``iter_content``, as it is received.
+
+        The part of the body received before this call is kept in memory,
+        following chunks are only kept until they are read.
+
+        :param timeout: timeout for the response and each chunk, in seconds
+        :rtype: :class:`StreamedAsyncResponse`
+        """
+        reactor.callFromThread(self._body_stream.start)
+        fetcher = self._body_stream.get(timeout)
+        return StreamedAsyncResponse(
+            fetcher.request, fetcher.response, self._body_stream, timeout)
+
+
+class _BodyStream(object):
+    """Hands a response body over from the reactor thread to the thread
+    reading it.
+
+    Once started, the queue holds the :class:`_HTTPBodyFetcher` of the
+    response, then the chunks of its body, and finally None at the end of the
+    body or the :class:`twisted.python.failure.Failure` which stopped it.
+    """
+
+    def __init__(self):
+        self.queue = Queue.Queue()
+        self.streaming = False
+        self.fetcher = None
+        self.failure = None
+
+    def start(self):
+        """Starts streaming, called in the reactor thread
+        """
+        self.streaming = True
+        if self.failure is not None:
+            self.queue.put(self.failure)
+        elif self.fetcher is not None:
+            self.fetcher.start_streaming()
+
+    def fail(self, reason):
+        """Stops streaming on error, called in the reactor thread
+        """
+        self.failure = reason
+        if self.streaming:
+            self.queue.put(reason)
+
+    def get(self, timeout):
+        """Waits for the next item in the queue, called in the reading thread
+
+        :raises: :class:`swaggerpy.exception.TimeoutError` if nothing is
+            received in time
+        """
+        try:
+            item = self.queue.get(timeout=timeout)
+        except Queue.Empty:
+            raise TimeoutError(
+                "Nothing received from the response in %s seconds" % timeout)
+        if isinstance(item, Failure):
+            item.raiseException()
+        fetcher = self.fetcher
+        if fetcher is not None and fetcher.paused and \
+                self.queue.qsize() <= MAX_PENDING_CHUNKS // 2:
+            reactor.callFromThread(fetcher.resume)
+        return item
+
+    def stop(self):
+        """Drops the rest of the body, called in the reactor thread
+        """
+        if self.fetcher is not None:
+            self.fetcher.stop()
+
 
 class AsyncResponse(object):
     """
@@ -104,6 +379,7 @@ class AsyncResponse(object):
         self.status_code = resp.code
         self.headers = dict(resp.headers.getAllRawHeaders())
         self.text = data
+        self.content = data
 
     def raise_for_status(self):
         """Raises stored `HTTPError`, if one occured.
@@ -121,30 +397,122 @@ class AsyncResponse(object):
             raise HTTPError(http_error_msg, response=self)
 
     def json(self, **kwargs):
-        return json.loads(self.text, **kwargs)
+        if kwargs:
+            return json.loads(self.text, **kwargs)
+        return json_loads(self.text)
+
+
+class StreamedAsyncResponse(AsyncResponse):
+    """Response which body is read as it is received, with ``iter_content``
+    like a streamed :class:`requests.Response`.
+    """
+
+    def __init__(self, req, resp, body_stream, timeout):
+        super(StreamedAsyncResponse, self).__init__(req, resp, None)
+        self._body_stream = body_stream
+        self._timeout = timeout
+        self._consumed = False
+
+    def iter_content(self, chunk_size=None):
+        """Yields the chunks of the body, as they are received.
+
+        :param chunk_size: ignored, chunks are yielded as they are received
+        """
+        while not self._consumed:
+            chunk = self._body_stream.get(self._timeout)
+            if chunk is None:
+                self._consumed = True
+            else:
+                yield chunk
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            # Error responses are small, read them for the error message
+            self.text = ''.join(self.iter_content())
+        super(StreamedAsyncResponse, self).raise_for_status()
+
+    def close(self):
+        """Drops the part of the body which was not read
+        """
+        if not self._consumed:
+            self._consumed = True
+            reactor.callFromThread(self._body_stream.stop)
+
+
+def _is_complete(reason):
+    # Accepting PotentialDataLoss for servers with HTTP1.0
+    # and not sending Content-Length in the header
+    return reason.check(twisted.web.client.ResponseDone) or \
+        reason.check(twisted.web.http.PotentialDataLoss)
 
 
 class _HTTPBodyFetcher(Protocol):
     """Class to receive callbacks from Twisted whenever
     response is available.
 
-    Eventually AsyncResponse() is created on receiving complete response
+    Eventually AsyncResponse() is created on receiving complete response,
+    unless the body is streamed to a :class:`_BodyStream`.
     """
 
-    def __init__(self, request, response, finished):
+    def __init__(self, request, response, finished, body_stream=None):
         self.buffer = StringIO()
         self.request = request
         self.response = response
         self.finished = finished
+        self.body_stream = body_stream
+        self.reason = None
+        self.paused = False
+        # Fires once the body is received, or failed
+        self.lost = Deferred()
+        if body_stream is not None:
+            body_stream.fetcher = self
+            if body_stream.streaming:
+                self.start_streaming()
+
+    def start_streaming(self):
+        """Hands the response and what was received of its body over to the
+        body stream.
+        """
+        self.body_stream.queue.put(self)
+        data = self.buffer.getvalue()
+        self.buffer = StringIO()
+        if data:
+            self.send(data)
+        if self.reason is not None:
+            self.end(self.reason)
+
+    def send(self, data):
+        queue = self.body_stream.queue
+        if not self.paused and queue.qsize() + 1 >= MAX_PENDING_CHUNKS:
+            # Flagged before queueing, so that the reader sees it
+            self.paused = True
+            self.transport.pauseProducing()
+        queue.put(data)
+
+    def resume(self):
+        if self.paused and self.reason is None:
+            self.paused = False
+            self.transport.resumeProducing()
+
+    def stop(self):
+        if self.reason is None:
+            self.transport.stopProducing()
+
+    def end(self, reason):
+        self.body_stream.queue.put(None if _is_complete(reason) else reason)
 
     def dataReceived(self, data):
-        self.buffer.write(data)
+        if self.body_stream is not None and self.body_stream.streaming:
+            self.send(data)
+        else:
+            self.buffer.write(data)
 
     def connectionLost(self, reason):
-        # Accepting PotentialDataLoss for servers with HTTP1.0
-        # and not sending Content-Length in the header
-        if reason.check(twisted.web.client.ResponseDone) or \
-                reason.check(twisted.web.http.PotentialDataLoss):
+        self.reason = reason
+        self.lost.callback(None)
+        if self.body_stream is not None and self.body_stream.streaming:
+            self.end(reason)
+        elif _is_complete(reason):
             self.finished.callback(AsyncResponse(
                 self.request, self.response, self.buffer.getvalue()))
         else:
@@ -52,9 +52,13 @@ without caching
 
 """
 
-from swaggerpy.compat import json
+from collections import Mapping
+from swaggerpy.compat import json_dumps, json_loads
+import itertools
 import logging
 import os.path
+import re
+import threading
 import time
 import urllib
 from urlparse import urlparse
@@ -62,12 +66,27 @@ from urlparse import urlparse
 from yelp_uri import urllib_utf8
 
 import swagger_type
-from swaggerpy.http_client import APP_JSON, SynchronousHttpClient
-from swaggerpy.response import HTTPFuture, post_receive
+from swaggerpy import instrumentation
+from swaggerpy.http_client import (
+    APP_JSON,
+    HttpClient,
+    SynchronousHttpClient,
+)
+from swaggerpy.response import (
+    gather,
+    HTTPFuture,
+    iter_post_receive,
+    post_receive,
+)
 from swaggerpy.swagger_model import (
+    bind_model_types,
+    create_flat_dict,
     create_model_type,
     is_file_scheme_uri,
+    LazyModels,
     load_resource_listing,
+    ModelRegistry,
+    VALIDATE_CACHED,
 )
 from swaggerpy.swagger_type import SwaggerTypeCheck
 
@@ -75,6 +94,9 @@ log = logging.getLogger(__name__)
 
 SWAGGER_SPEC_CACHE_TTL = 300
 
+# Maximum number of clients kept by a SwaggerClientCache
+SWAGGER_CLIENT_CACHE_SIZE = 100
+
 
 class CacheEntry(object):
     """An entry in the cache. Each item has it's own ttl.
@@ -88,6 +110,8 @@ class CacheEntry(object):
         self.item = item
         self.ttl = ttl
         self.timestamp = timestamp or time.time()
+        # Position in the order of use of the cache entries
+        self.last_used = 0
 
     def is_stale(self, timestamp=None):
         """Checks if the instance has become stale
@@ -97,27 +121,231 @@ class CacheEntry(object):
         return self.timestamp + self.ttl < current_time
 
 
+class _IdentityKey(object):
+    """Cache key of an unhashable object, equal only to the key of the same
+    object. It keeps the object alive, so its id isn't reused.
+    """
+
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __hash__(self):
+        return id(self.value)
+
+    def __eq__(self, other):
+        return isinstance(other, _IdentityKey) and other.value is self.value
+
+    def __ne__(self, other):
+        return not self == other
+
+
+def make_cache_key(value):
+    """Builds a hashable key of a value, equal to the keys of equal values.
+
+    Dicts, lists, tuples and sets are compared by content, and
+    :class:`swaggerpy.http_client.HttpClient` instances by their
+    :meth:`swaggerpy.http_client.HttpClient.cache_key`. Other objects are
+    compared with their own ``__eq__``, or by identity if they are
+    unhashable.
+    """
+    if isinstance(value, dict):
+        return (dict, tuple(sorted(
+            (make_cache_key(k), make_cache_key(v))
+            for k, v in value.iteritems())))
+    if isinstance(value, (list, tuple)):
+        return (type(value), tuple(make_cache_key(item) for item in value))
+    if isinstance(value, (set, frozenset)):
+        return (frozenset, frozenset(make_cache_key(item) for item in value))
+    if isinstance(value, HttpClient):
+        return (HttpClient, value.cache_key())
+    try:
+        hash(value)
+    except TypeError:
+        return _IdentityKey(value)
+    return value
+
+
 class SwaggerClientCache(object):
     """Cache to store swagger clients and refetch the api-docs if the client
     becomes stale
+
+    Concurrent calls for the same client only build it once. With
+    background_refresh, a stale client keeps being returned while a single
+    thread builds the new one, which then replaces it.
+
+    At most max_size clients are kept. When a new client doesn't fit, the
+    stale clients which were not used since they became stale are dropped
+    first, then the least recently used ones.
+
+    :param max_size: maximum number of cached clients
+    :type  max_size: int
+    :param background_refresh: if True, stale clients are refreshed in a
+        background thread instead of by the caller. Clients asked with a ttl
+        of 0 or less are always built by the caller.
+    :type  background_refresh: boolean
+    :param serve_stale_on_error: if True, a stale client whose refresh
+        failed is served for another ttl. Otherwise it is dropped, and the
+        next call builds the client again.
+    :type  serve_stale_on_error: boolean
     """
 
-    def __init__(self):
+    def __init__(self, max_size=SWAGGER_CLIENT_CACHE_SIZE,
+                 background_refresh=True, serve_stale_on_error=True):
         self.cache = dict()
+        self.max_size = max_size
+        self.background_refresh = background_refresh
+        self.serve_stale_on_error = serve_stale_on_error
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._lock = threading.Lock()
+        self._clock = itertools.count(1)
+        # key -> Event set once the client being built for the key is done
+        self._building = {}
 
     def __contains__(self, key):
-        return key in self.cache and not self.cache[key].is_stale()
+        entry = self.cache.get(key)
+        return entry is not None and not entry.is_stale()
+
+    def __len__(self):
+        return len(self.cache)
 
     def __call__(self, *args, **kwargs):
         # timeout is backwards compatible with 0.7
         ttl = kwargs.pop('ttl', kwargs.pop('timeout', SWAGGER_SPEC_CACHE_TTL))
-        key = repr(args) + repr(sorted(kwargs.iteritems()))
-
-        if key not in self:
-            self.cache[key] = CacheEntry(
-                self.build_client(*args, **kwargs), ttl)
-
-        return self.cache[key].item
+        key = make_cache_key((args, kwargs))
+
+        entry = self.cache.get(key)
+        if entry is not None and entry.is_stale():
+            # A ttl of 0 or less turns caching off, so the client is built
+            # by the caller on every call
+            if self.background_refresh and ttl > 0:
+                self.refresh_in_background(key, ttl, args, kwargs)
+            else:
+                entry = None
+        if entry is None:
+            with self._lock:
+                self.misses += 1
+            entry = self.build_entry(key, ttl, args, kwargs)
+        else:
+            with self._lock:
+                self.hits += 1
+        entry.last_used = next(self._clock)
+        return entry.item
+
+    def stats(self):
+        """Returns the counters of the cache
+
+        :returns: dict with the number of cached clients (``size``), of
+            calls which returned a cached client (``hits``) or built one
+            (``misses``), and of clients dropped because the cache was full
+            (``evictions``) or because they were stale (``expirations``)
+        """
+        return {
+            'size': len(self.cache),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+        }
+
+    def sweep(self, timestamp=None):
+        """Drops the stale clients which are not being refreshed, meaning
+        they were not used since they became stale.
+        """
+        current_time = timestamp or time.time()
+        with self._lock:
+            self._sweep(current_time)
+
+    def _sweep(self, current_time):
+        for key, entry in self.cache.items():
+            if entry.is_stale(current_time) and key not in self._building:
+                del self.cache[key]
+                self.expirations += 1
+
+    def _add(self, key, entry):
+        with self._lock:
+            entry.last_used = next(self._clock)
+            self.cache[key] = entry
+            if len(self.cache) <= self.max_size:
+                return
+            self._sweep(time.time())
+            while len(self.cache) > self.max_size:
+                lru_key = min(self.cache,
+                              key=lambda k: self.cache[k].last_used)
+                del self.cache[lru_key]
+                self.evictions += 1
+
+    def build_entry(self, key, ttl, args, kwargs):
+        """Builds the client of a key, or waits for the thread already
+        building it.
+
+        :returns: the new :class:`CacheEntry`, or the stale one if the build
+            failed and serve_stale_on_error is set
+        """
+        done, building = self._start_building(key)
+        if not building:
+            done.wait()
+            entry = self.cache.get(key)
+            if entry is not None:
+                return entry
+            # The build failed, try again to raise its error to this caller
+            return self.build_entry(key, ttl, args, kwargs)
+        return self._build_entry(key, ttl, args, kwargs, done)
+
+    def refresh_in_background(self, key, ttl, args, kwargs):
+        """Starts a thread building the client of a key, unless the client
+        is already being built.
+        """
+        done, building = self._start_building(key)
+        if not building:
+            return
+
+        def refresh():
+            try:
+                self._build_entry(key, ttl, args, kwargs, done)
+            except Exception:
+                log.exception(u"Refresh of the client failed, dropping the "
+                              u"stale client")
+        thread = threading.Thread(target=refresh)
+        thread.daemon = True
+        thread.start()
+
+    def _start_building(self, key):
+        """
+        :returns: the Event set once the client of key is built, and whether
+            the caller must build it
+        """
+        with self._lock:
+            done = self._building.get(key)
+            if done is not None:
+                return done, False
+            done = self._building[key] = threading.Event()
+            return done, True
+
+    def _build_entry(self, key, ttl, args, kwargs, done):
+        try:
+            entry = CacheEntry(self.build_client(*args, **kwargs), ttl)
+            self._add(key, entry)
+            return entry
+        except Exception:
+            stale = self.cache.get(key)
+            if stale is None or not self.serve_stale_on_error:
+                with self._lock:
+                    self.cache.pop(key, None)
+                raise
+            log.exception(u"Refresh of the client failed, serving the stale "
+                          u"client for another %s seconds", ttl)
+            stale.timestamp = time.time()
+            return stale
+        finally:
+            with self._lock:
+                del self._building[key]
+            done.set()
 
     def build_client(self, api_docs, *args, **kwargs):
         if isinstance(api_docs, basestring):
@@ -159,64 +387,193 @@ def get_client(*args, **kwargs):
     return cache(*args, **kwargs)
 
 
+class operation_docstring(object):
+    """``__doc__`` of :class:`Operation`: the class docstring on the class,
+    and on instances the docstring of their operation, see
+    :func:`create_operation_docstring`. It is generated on first access,
+    which is rare outside of a REPL, and kept.
+    """
+
+    def __init__(self, class_doc):
+        self.class_doc = class_doc
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self.class_doc
+        if instance._doc is None:
+            instance._doc = create_operation_docstring(instance._json)
+        return instance._doc
+
+
 class Operation(object):
-    """Perform a request by taking the kwargs passed to the call and
+    __doc__ = operation_docstring(
+        """Perform a request by taking the kwargs passed to the call and
     constructing an HTTP request.
-    """
 
-    def __init__(self, uri, operation, http_client, models):
+    If validate is False, the parameters of the calls and their responses
+    are not type checked by default. Calls override it with
+    ``_request_options={'validate': ...}``, and results with
+    ``result(validate=...)``.
+
+    While hooks are registered in :mod:`swaggerpy.instrumentation`, the
+    phases of calls are timed and reported with the name of the resource.
+    """)
+
+    def __init__(self, uri, operation, http_client, models, validate=True,
+                 resource=None):
         self._uri = uri
         self._json = operation
+        # Identifies the operation to instrumentation hooks
+        self._operation_id = (resource, operation[u'nickname'])
         self._http_client = http_client
         self._models = models
-        self.__doc__ = create_operation_docstring(operation)
+        self._validate = validate
+        self._response_type = swagger_type.compile_type(
+            swagger_type.get_swagger_type(operation), models)
+        self._params = [
+            (param, swagger_type.compile_type(
+                swagger_type.get_swagger_type(param), models))
+            for param in operation.get(u'parameters', [])]
+        self._build_request = build_request_builder(
+            uri, operation, self._params, models)
+        # Decoders of the responses, built on first use by post_receive
+        self._decoders = {}
+        self._doc = None
 
     def __repr__(self):
         return u"%s(%s)" % (self.__class__.__name__, self._json[u'nickname'])
 
     def _construct_request(self, **kwargs):
         _request_options = kwargs.pop('_request_options', {}) or {}
+        return self._build_request(
+            kwargs, _request_options.get('headers', {}) or {},
+            _request_options.get('validate', self._validate))
 
-        request = {}
-        # The requests library expects native strings. Without this, POST
-        # with a binary file upload throws a UnicodeDecodeError.
-        request['method'] = self._json[u'method'].encode('utf8')
-        request['url'] = self._uri
-        request['params'] = {}
-        request['headers'] = _request_options.get('headers', {}) or {}
-
-        for param in self._json.get(u'parameters', []):
-            value = kwargs.pop(param[u'name'], param.get('defaultValue'))
-            validate_and_add_params_to_request(param, value, request,
-                                               self._models)
-        if kwargs:
-            raise TypeError(u"'%s' does not have parameters %r" % (
-                self._json[u'nickname'], kwargs.keys()))
-        return request
+    def _timed_post_receive(self, response, content, **kwargs):
+        """Like :func:`swaggerpy.response.post_receive` of the response
+        body, reporting the timings of its phases to the hooks.
+        """
+        operation_id = self._operation_id
+        instrumentation.record_payload(
+            operation_id, instrumentation.RESPONSE_BODY,
+            response.text if content is None else content)
+        start = time.time()
+        value = parse_response(response, content)
+        start = instrumentation.record_timing(
+            operation_id, instrumentation.PARSE, start)
+        if kwargs.get('raw_response'):
+            return value
+        phase = instrumentation.DECODE if kwargs['validate'] else \
+            instrumentation.CONSTRUCT
+        result = post_receive(
+            value, self._response_type, self._models, **kwargs)
+        instrumentation.record_timing(operation_id, phase, start)
+        return result
 
     def __call__(self, **kwargs):
         log.debug(u"%s?%r" % (
             self._json[u'nickname'],
             urllib_utf8.urlencode(kwargs)))
+        # Calls are only timed while hooks are registered
+        timed = bool(instrumentation.hooks)
+        if timed:
+            start = time.time()
         request = self._construct_request(**kwargs)
+        if timed:
+            start = instrumentation.record_timing(
+                self._operation_id, instrumentation.REQUEST, start)
+            instrumentation.record_payload(
+                self._operation_id, instrumentation.REQUEST_BODY,
+                request.get('data'))
 
         def response_future(response, **kwargs):
             # Assume status is OK, an exception would have been raised already
-            if not response.text:
+            content = getattr(response, 'content', None)
+            if not (response.text if content is None else content):
                 return None
 
+            kwargs.setdefault('validate', self._validate)
+            kwargs['decoders'] = self._decoders
+            if instrumentation.hooks:
+                return self._timed_post_receive(response, content, **kwargs)
             return post_receive(
-                response.json(),
-                swagger_type.get_swagger_type(self._json),
+                parse_response(response, content),
+                self._response_type,
                 self._models,
                 **kwargs)
-        return HTTPFuture(self._http_client, request, response_future)
+
+        def iter_response_future(chunks, **kwargs):
+            kwargs.setdefault('validate', self._validate)
+            kwargs['decoders'] = self._decoders
+            return iter_post_receive(
+                chunks,
+                self._response_type,
+                self._models,
+                **kwargs)
+        if isinstance(self._http_client, HttpClient):
+            future = self._http_client.create_future(
+                request, response_future, iter_response_future,
+                self._operation_id)
+        else:
+            future = HTTPFuture(self._http_client, request, response_future,
+                                iter_response_future, self._operation_id)
+        if timed and getattr(self._http_client, 'sends_eagerly', False):
+            instrumentation.record_timing(
+                self._operation_id, instrumentation.SEND, start)
+        return future
 
 
-def build_models(model_dicts):
-    return dict(
-        (name, create_model_type(model_def))
+def parse_response(response, content):
+    """Parses the JSON body of a response.
+
+    :param content: the ``content`` of the response, None for responses of
+        custom http clients which only provide ``text`` and ``json()``
+    """
+    if content is None:
+        return response.json()
+    return json_loads(content)
+
+
+def build_models(model_dicts, compact=False):
+    models = dict(
+        (name, create_model_type(model_def, compact, build_functions=False))
         for name, model_def in model_dicts.iteritems())
+    bind_model_types(models)
+    return models
+
+
+class LazyMapping(Mapping):
+    """Mapping whose values are built on their first access, from the spec
+    of their key.
+
+    :param specs: dict which maps each key to its spec
+    :param build: function building a value from its spec
+    """
+
+    def __init__(self, specs, build):
+        self._specs = specs
+        self._build = build
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key):
+        value = self._values.get(key)
+        if value is None:
+            spec = self._specs[key]
+            with self._lock:
+                value = self._values.get(key)
+                if value is None:
+                    value = self._values[key] = self._build(spec)
+        return value
+
+    def __iter__(self):
+        return iter(self._specs)
+
+    def __len__(self):
+        return len(self._specs)
+
+    def __contains__(self, key):
+        return key in self._specs
 
 
 def get_resource_url(base_path, url_base, resource_base_path):
@@ -234,15 +591,23 @@ def get_resource_url(base_path, url_base, resource_base_path):
 
 class Resource(object):
     """Swagger resource, described in an API declaration.
+
+    :param name: name of the resource
+    :param operations: mapping of nickname to :class:`Operation`
+    :param models: :class:`swaggerpy.swagger_model.LazyModels` of the api
+        declaration
     """
 
-    def __init__(self, name, operations):
+    def __init__(self, name, operations, models=None):
         log.debug(u"Building resource '%s'" % name)
         self._name = name
         self._operations = operations
+        self._models = models
 
     @classmethod
-    def from_api_doc(cls, api_doc, http_client, base_path, url_base=None):
+    def from_api_doc(cls, api_doc, http_client, base_path, url_base=None,
+                     compact_models=False, validate=True,
+                     model_registry=None):
         """
         :param api_doc: api doc which defines this resource
         :type  api_doc: :class:`dict`
@@ -251,24 +616,36 @@ class Resource(object):
                 the path provided in the api spec
         :param url_base: a url used as the base for resource definitions
                 that include a relative basePath
+        :param compact_models: if True, build models with ``__slots__`` which
+                don't keep the raw response, see
+                :func:`swaggerpy.swagger_model.create_model_type`
+        :param validate: if False, don't type check the parameters and
+                responses of the operations, see :class:`Operation`
+        :param model_registry: model types shared with other resources
+        :type  model_registry: :class:`swaggerpy.swagger_model.ModelRegistry`
         """
         declaration = api_doc['api_declaration']
-        models = build_models(declaration.get('models', {}))
-
-        def build_operation(api_obj, operation):
-            log.debug(u"Building operation %s.%s" % (
-                api_obj.get('name'), operation['nickname']))
+        # Models and operations are built on first use
+        models = LazyModels(declaration.get('models', {}), compact_models,
+                            model_registry)
 
+        def get_url(api_obj):
             resource_base_path = declaration.get('basePath')
             url = get_resource_url(base_path, url_base, resource_base_path)
-            url = url.rstrip('/') + api_obj['path']
-            return Operation(url, operation, http_client, models)
+            return url.rstrip('/') + api_obj['path']
+
+        def build_operation(spec):
+            url, operation = spec
+            log.debug(u"Building operation %s.%s" % (
+                api_doc['name'], operation['nickname']))
+            return Operation(url, operation, http_client, models, validate,
+                             api_doc['name'])
 
-        operations = dict(
-            (oper['nickname'], build_operation(api, oper))
+        operations = LazyMapping(dict(
+            (oper['nickname'], (get_url(api), oper))
             for api in declaration['apis']
-            for oper in api['operations'])
-        return cls(api_doc['name'], operations)
+            for oper in api['operations']), build_operation)
+        return cls(api_doc['name'], operations, models)
 
     def __repr__(self):
         return u"%s(%s)" % (self.__class__.__name__, self._name)
@@ -293,11 +670,18 @@ class SwaggerClient(object):
 
     :param api_url: the url for the swagger api docs, only used for the repr.
     :param resources: a list of :Resource: objects used to perform requests
+    :param compact_models: whether the models of the resources are compact,
+        kept by snapshots of the client
+    :param validate: whether the operations of the resources validate their
+        calls, kept by snapshots of the client
     """
 
-    def __init__(self, api_url, resources):
+    def __init__(self, api_url, resources, compact_models=False,
+                 validate=True):
         self._api_url = api_url
         self._resources = resources
+        self._compact_models = compact_models
+        self._validate = validate
 
     @classmethod
     def from_url(
@@ -305,7 +689,11 @@ class SwaggerClient(object):
             url,
             http_client=None,
             api_base_path=None,
-            request_options=None):
+            request_options=None,
+            compact_models=False,
+            spec_cache=None,
+            validate=True,
+            validation_mode=VALIDATE_CACHED):
         """
         Build a :class:`SwaggerClient` from a url to api docs describing the
         api.
@@ -318,15 +706,32 @@ class SwaggerClient(object):
         :type  api_base_path: str
         :param request_options: extra values to pass with api docs requests
         :type  request_options: dict
+        :param compact_models: if True, models use ``__slots__`` and don't keep
+            the raw response
+        :type  compact_models: boolean
+        :param spec_cache: on-disk cache of the api docs, revalidated with
+            conditional requests
+        :type  spec_cache: :class:`swaggerpy.spec_cache.SpecCache`
+        :param validate: if False, don't type check the parameters and
+            responses of the operations, for trusted callers
+        :type  validate: boolean
+        :param validation_mode: how the api docs are validated: ``full``
+            on every load, ``cached`` once per content version of the api
+            docs, or ``off``
+        :type  validation_mode: str
         """
         log.debug(u"Loading from %s" % url)
         http_client = http_client or SynchronousHttpClient()
 
         return cls.from_resource_listing(
-            load_resource_listing(url, http_client, None, request_options),
+            load_resource_listing(url, http_client, None, request_options,
+                                  spec_cache=spec_cache,
+                                  validation_mode=validation_mode),
             http_client=http_client,
             api_base_path=api_base_path,
-            url=url)
+            url=url,
+            compact_models=compact_models,
+            validate=validate)
 
     @classmethod
     def from_resource_listing(
@@ -334,7 +739,9 @@ class SwaggerClient(object):
             resource_listing,
             http_client=None,
             api_base_path=None,
-            url=None):
+            url=None,
+            compact_models=False,
+            validate=True):
         """
         Build a :class:`SwaggerClient` from swagger api docs
 
@@ -345,6 +752,12 @@ class SwaggerClient(object):
         :type  api_base_path: str
         :param url: the url used to retrieve the resource listing
         :type  url: str
+        :param compact_models: if True, models use ``__slots__`` and don't keep
+            the raw response
+        :type  compact_models: boolean
+        :param validate: if False, don't type check the parameters and
+            responses of the operations, for trusted callers
+        :type  validate: boolean
         """
         url = url or resource_listing.get(u'url')
         log.debug(u"Using resources from %s" % url)
@@ -358,12 +771,33 @@ class SwaggerClient(object):
             http_client or SynchronousHttpClient(),
             map(append_name_to_api, resource_listing['apis']),
             api_base_path,
-            url_base)
-        return cls(url, resources)
+            url_base,
+            compact_models,
+            validate)
+        return cls(url, resources, compact_models, validate)
 
     def __repr__(self):
         return u"%s(%s)" % (self.__class__.__name__, self._api_url)
 
+    def gather(self, futures, max_concurrency=10, **kwargs):
+        """Waits for the results of many operations, concurrently.
+
+        Example: ::
+
+            pets = swagger_client.gather(
+                [swagger_client.pet.getPetById(petId=i) for i in pet_ids],
+                max_concurrency=20, timeout=2)
+
+        See :func:`swaggerpy.response.gather`.
+
+        :param futures: list of :class:`swaggerpy.response.HTTPFuture`
+        :param max_concurrency: maximum number of requests at once
+        :param kwargs: arguments of :meth:`HTTPFuture.result`
+        :returns: list of the results, in the order of the futures. For failed
+            calls, the exception is returned instead of the result.
+        """
+        return gather(futures, max_concurrency, **kwargs)
+
     def __getattr__(self, item):
         """
         :param item: name of the resource to return
@@ -378,11 +812,18 @@ class SwaggerClient(object):
         return self._resources.keys()
 
 
-def build_resources_from_spec(http_client, apis, api_base_path, url_base):
-    return dict(
-        (api_doc['name'],
-         Resource.from_api_doc(api_doc, http_client, api_base_path, url_base))
-        for api_doc in apis)
+def build_resources_from_spec(http_client, apis, api_base_path, url_base,
+                              compact_models=False, validate=True):
+    """Returns the mapping of name to :class:`Resource` of the apis, where
+    each resource is built on first access. Identical models of the
+    resources share their type.
+    """
+    model_registry = ModelRegistry()
+    return LazyMapping(
+        dict((api_doc['name'], api_doc) for api_doc in apis),
+        lambda api_doc: Resource.from_api_doc(
+            api_doc, http_client, api_base_path, url_base, compact_models,
+            validate, model_registry))
 
 
 def append_name_to_api(api_entry):
@@ -434,22 +875,23 @@ def create_operation_docstring(json_):
         Raises:
                 400: Invalid status value
     """
-    docstring = ""
+    parts = []
     if json_.get('summary'):
-        docstring += ("[%s] %s\n\n" % (json_['method'], json_.get('summary')))
-    docstring += (json_["notes"] + "\n") if json_.get("notes") else ''
+        parts.append("[%s] %s\n\n" % (json_['method'], json_.get('summary')))
+    if json_.get("notes"):
+        parts.append(json_["notes"] + "\n")
 
     if json_["parameters"]:
-        docstring += "Args:\n"
-        for param in json_["parameters"]:
-            docstring += _build_param_docstring(param)
+        parts.append("Args:\n")
+        parts.extend(_build_param_docstring(param)
+                     for param in json_["parameters"])
     if json_.get('type'):
-        docstring += "Returns:\n\t%s\n" % json_["type"]
+        parts.append("Returns:\n\t%s\n" % json_["type"])
     if json_.get('responseMessages'):
-        docstring += "Raises:\n"
-        for msg in json_.get('responseMessages'):
-            docstring += "\t%s: %s\n" % (msg.get("code"), msg.get("message"))
-    return docstring
+        parts.append("Raises:\n")
+        parts.extend("\t%s: %s\n" % (msg.get("code"), msg.get("message"))
+                     for msg in json_.get('responseMessages'))
+    return "".join(parts)
 
 
 def handle_form_param(name, value, type_, request):
@@ -474,38 +916,11 @@ def add_param_to_req(param, value, request):
     :param value: value for the param given in the API call
     :param request: request object to be populated
     """
-    pname = param['name']
-    type_ = swagger_type.get_swagger_type(param)
-    param_req_type = param['paramType']
+    build_param_adder(param)(value, request, None)
 
-    if param_req_type == u'path':
-        request['url'] = request['url'].replace(
-            u'{%s}' % pname,
-            urllib.quote(unicode(value)))
-    elif param_req_type == u'query':
-        request['params'][pname] = value
-    elif param_req_type == u'body':
-        if not swagger_type.is_primitive(type_):
-            # If not primitive, body has to be 'dict'
-            # (or has already been converted to dict from model)
-            request['headers']['content-type'] = APP_JSON
-            request['data'] = json.dumps(value)
-        else:
-            request['data'] = stringify_body(value)
-    elif param_req_type == 'form':
-        handle_form_param(pname, value, type_, request)
-    elif param_req_type == 'header':
-        if pname in request['headers']:
-            log.warn(u'Header {0}:{1} has been overridden by {0}:{2}'.format(
-                pname, value, request['headers'][pname]))
-        else:
-            request['headers'][pname] = value
-    else:
-        raise AssertionError(
-            u"Unsupported Parameter type: %s" % param_req_type)
 
-
-def validate_and_add_params_to_request(param, value, request, models):
+def validate_and_add_params_to_request(param, value, request, models,
+                                       type_=None):
     """Validates if a required param is given
     And wraps 'add_param_to_req' to populate a valid request
 
@@ -515,29 +930,34 @@ def validate_and_add_params_to_request(param, value, request, models):
     :param request: request object to be populated
     :param models: models tuple containing all complex model types
     :type models: namedtuple
+    :param type_: compiled type of the param, compiled from param if not given
+    :type type_: :class:`swaggerpy.swagger_type.TypeDescriptor`
     """
     # If param not given in args, and not required, just ignore.
     if not param.get('required') and value is None:
         return
 
     pname = param['name']
-    type_ = swagger_type.get_swagger_type(param)
+    if type_ is None:
+        type_ = swagger_type.compile_type(
+            swagger_type.get_swagger_type(param), models)
     param_req_type = param['paramType']
 
     if param_req_type == 'path':
         # Parameters in path need to be primitive/array types
-        if swagger_type.is_complex(type_):
+        if type_.kind is not swagger_type.PRIMITIVE and \
+           type_.kind is not swagger_type.ARRAY:
             raise TypeError("Param %s in path can only be primitive/list" %
                             pname)
     elif param_req_type == 'query':
         # Parameters in query need to be only primitive types
-        if not swagger_type.is_primitive(type_):
+        if type_.kind is not swagger_type.PRIMITIVE:
             raise TypeError("Param %s in query can only be primitive" % pname)
 
     # TODO: this needs to move to add_param_to_req, and change logic
     # Allow lists for query params even if type is primitive
     if isinstance(value, list) and param_req_type == 'query':
-        type_ = swagger_type.ARRAY + swagger_type.COLON + type_
+        type_ = swagger_type.array_of(type_)
 
     # Check the parameter value against its type
     # And store the refined value back
@@ -555,9 +975,246 @@ def validate_and_add_params_to_request(param, value, request, models):
             raise TypeError(u"Missing required parameter '%s'" % pname)
 
 
+# Path parameter slot of a url, eg. "{petId}"
+PATH_SLOT_RE = re.compile(r'(\{[^{}]*\})')
+
+
+def build_request_builder(uri, operation, params, models):
+    """Builds the function creating the request of an operation call.
+
+    Everything depending only on the operation is done once here: the url is
+    split around its path parameter slots, and each parameter gets its own
+    function validating its value and adding it to the request, see
+    :func:`build_param_handler`.
+
+    The returned function has the signature ``build_request(kwargs,
+    headers, validate=True)``, where kwargs are the parameter values of the
+    call and headers the dict of request headers. It consumes kwargs. If
+    validate is False, the values are not type checked.
+
+    :param uri: url of the operation, with path parameter slots
+    :param operation: operation spec
+    :type operation: dict
+    :param params: list of the parameter specs of the operation, with their
+        compiled types
+    :param models: dict which maps model name to the generated model type
+    """
+    # The requests library expects native strings. Without this, POST
+    # with a binary file upload throws a UnicodeDecodeError.
+    method = operation[u'method'].encode('utf8')
+    nickname = operation[u'nickname']
+    url_parts = PATH_SLOT_RE.split(uri)
+    path_slots = {}
+    for index, part in enumerate(url_parts):
+        if index % 2:
+            path_slots.setdefault(part[1:-1], []).append(index)
+
+    handlers = []
+    has_path_params = False
+    for param, type_ in params:
+        slots = ()
+        if param['paramType'] == u'path':
+            slots = path_slots.get(param['name'], ())
+            has_path_params = has_path_params or bool(slots)
+        handlers.append((
+            param[u'name'], param.get('defaultValue'),
+            build_param_handler(param, type_, models, slots),
+            build_param_handler(param, type_, models, slots, False)))
+    if not has_path_params:
+        url_parts = None
+
+    def build_request(kwargs, headers, validate=True):
+        request = {
+            'method': method,
+            'url': uri,
+            'params': {},
+            'headers': headers,
+        }
+        parts = url_parts and list(url_parts)
+        if validate:
+            for name, default, handle, _ in handlers:
+                handle(kwargs.pop(name, default), request, parts)
+        else:
+            for name, default, _, handle in handlers:
+                handle(kwargs.pop(name, default), request, parts)
+        if kwargs:
+            raise TypeError(u"'%s' does not have parameters %r" % (
+                nickname, kwargs.keys()))
+        if parts is not None:
+            request['url'] = u''.join(parts)
+        return request
+    return build_request
+
+
+def build_param_handler(param, type_, models, slots=(), validate=True):
+    """Builds the function validating the value of a parameter and adding it
+    to a request, like :func:`validate_and_add_params_to_request`.
+
+    The returned function has the signature ``handle(value, request,
+    url_parts)``, see :func:`build_param_adder`.
+
+    If validate is False, the value is trusted: only missing required
+    parameters are reported, and model instances are flattened to dicts
+    without being type checked.
+
+    :param param: swagger spec details of a param
+    :type param: dict
+    :param type_: compiled type of the param
+    :type type_: :class:`swaggerpy.swagger_type.TypeDescriptor`
+    :param models: dict which maps model name to the generated model type
+    :param slots: indexes of the slots of a path param in the url parts
+    :param validate: if False, don't type check the value
+    :type validate: boolean
+    """
+    pname = param['name']
+    required = param.get('required')
+    param_req_type = param['paramType']
+    add = build_param_adder(param, slots)
+    if not validate:
+        flatten = None
+        if param_req_type == u'body' and \
+                type_.kind is not swagger_type.PRIMITIVE:
+            flatten = flatten_models
+
+        def handle_trusted(value, request, url_parts):
+            if value is None:
+                if required:
+                    raise TypeError(
+                        u"Missing required parameter '%s'" % pname)
+                return
+            if flatten is not None:
+                value = flatten(value)
+            add(value, request, url_parts)
+        return handle_trusted
+
+    check = swagger_type.build_type_checker(type_, pname)
+    check_list = None
+    type_error = None
+    if param_req_type == 'path':
+        # Parameters in path need to be primitive/array types
+        if type_.kind is not swagger_type.PRIMITIVE and \
+           type_.kind is not swagger_type.ARRAY:
+            type_error = "Param %s in path can only be primitive/list" % pname
+    elif param_req_type == 'query':
+        # Parameters in query need to be only primitive types
+        if type_.kind is not swagger_type.PRIMITIVE:
+            type_error = "Param %s in query can only be primitive" % pname
+        else:
+            # Allow lists for query params even if type is primitive
+            check_list = swagger_type.build_type_checker(
+                swagger_type.array_of(type_), pname)
+
+    def handle(value, request, url_parts):
+        # If param not given in args, and not required, just ignore.
+        if value is None and not required:
+            return
+        if type_error is not None:
+            raise TypeError(type_error)
+        if check_list is not None and isinstance(value, list):
+            value = check_list(value, models, False)
+        else:
+            value = check(value, models, False)
+        if value is not None:
+            add(value, request, url_parts)
+        elif required:
+            raise TypeError(u"Missing required parameter '%s'" % pname)
+    return handle
+
+
+def flatten_models(value):
+    """Converts the model instances in value, or in the list value, to dicts
+    which can be serialized to JSON, see
+    :func:`swaggerpy.swagger_model.create_flat_dict`.
+    """
+    if isinstance(value, list):
+        return [flatten_models(item) for item in value]
+    if isinstance(value, dict):
+        return value
+    return create_flat_dict(value)
+
+
+def build_param_adder(param, slots=()):
+    """Builds the function adding the value of a parameter to a request,
+    like :func:`add_param_to_req`, routed once by the parameter type.
+
+    The returned function has the signature ``add(value, request,
+    url_parts)``. Path parameters are set in the given slots of url_parts,
+    or replaced in request['url'] if url_parts is None.
+
+    :param param: swagger spec details of a param
+    :type param: dict
+    :param slots: indexes of the slots of a path param in the url parts
+    """
+    pname = param['name']
+    type_ = swagger_type.get_swagger_type(param)
+    param_req_type = param['paramType']
+
+    if param_req_type == u'path':
+        placeholder = u'{%s}' % pname
+
+        def add_path(value, request, url_parts):
+            # If list in path, Turn list items into comma separated values
+            if isinstance(value, list):
+                value = u",".join(str(x) for x in value)
+            value = urllib.quote(unicode(value))
+            if url_parts is None:
+                request['url'] = request['url'].replace(placeholder, value)
+                return
+            for index in slots:
+                url_parts[index] = value
+        return add_path
+
+    if param_req_type == u'query':
+        def add_query(value, request, url_parts):
+            request['params'][pname] = value
+        return add_query
+
+    if param_req_type == u'body':
+        if not swagger_type.is_primitive(type_):
+            def add_json_body(value, request, url_parts):
+                # If not primitive, body has to be 'dict'
+                # (or has already been converted to dict from model)
+                request['headers']['content-type'] = APP_JSON
+                request['data'] = json_dumps(value)
+            return add_json_body
+
+        def add_body(value, request, url_parts):
+            request['data'] = stringify_body(value)
+        return add_body
+
+    if param_req_type == u'form':
+        if swagger_type.is_file(type_):
+            key = 'files'
+        elif swagger_type.is_primitive(type_):
+            key = 'data'
+        else:
+            key = None
+
+        def add_form(value, request, url_parts):
+            if key is None:
+                raise AssertionError(
+                    u"%s neither primitive nor File" % pname)
+            request.setdefault(key, {})[pname] = value
+        return add_form
+
+    if param_req_type == u'header':
+        def add_header(value, request, url_parts):
+            if pname in request['headers']:
+                log.warn(u'Header {0}:{1} has been overridden by {0}:{2}'
+                         .format(pname, value, request['headers'][pname]))
+            else:
+                request['headers'][pname] = value
+        return add_header
+
+    def add_unsupported(value, request, url_parts):
+        raise AssertionError(
+            u"Unsupported Parameter type: %s" % param_req_type)
+    return add_unsupported
+
+
 def stringify_body(value):
     """Json dump the value to string if not already in string
     """
     if not value or isinstance(value, basestring):
         return value
-    return json.dumps(value)
+    return json_dumps(value)
@@ -1,5 +1,117 @@
+"""Compatibility layer over the available JSON libraries.
+
+:func:`json_loads` and :func:`json_dumps` use the fastest JSON backend found
+at import time. It can be overridden with the ``SWAGGERPY_JSON_BACKEND``
+environment variable, or with :func:`set_json_backend`.
+"""
+from functools import partial
+import os
 
 try:
     import simplejson as json
 except ImportError:
     import json  # noqa
+
+
+# Backends, from the fastest to the slowest
+JSON_BACKENDS = ('ujson', 'simplejson', 'json')
+
+
+class JSONBackend(object):
+    """A JSON library, with the functions swaggerpy uses.
+
+    :param name: name of the backend, see :data:`JSON_BACKENDS`
+    :param loads: function parsing a JSON str or unicode
+    :param dumps: function serializing an object to a JSON str
+    :param accelerated: whether the library uses C speedups
+    """
+
+    def __init__(self, name, loads, dumps, accelerated=True):
+        self.name = name
+        self.loads = loads
+        self.dumps = dumps
+        self.accelerated = accelerated
+
+    def __repr__(self):
+        return "%s(%s)" % (self.__class__.__name__, self.name)
+
+
+def load_json_backend(name):
+    """Imports a JSON backend.
+
+    :param name: name of the backend, see :data:`JSON_BACKENDS`
+    :rtype: :class:`JSONBackend`
+    :raises: ImportError if the library is not installed
+    """
+    if name == 'ujson':
+        import json as json_
+        import ujson
+        # ujson silently serializes unknown objects, like datetimes, instead
+        # of raising a TypeError: only use it to parse. Without precise_float
+        # it rounds floats differently from the json module.
+        return JSONBackend(
+            name, partial(ujson.loads, precise_float=True), json_.dumps)
+    if name == 'simplejson':
+        import simplejson
+        return JSONBackend(name, simplejson.loads, simplejson.dumps,
+                           simplejson._import_c_make_encoder() is not None)
+    if name == 'json':
+        import json as json_
+        return JSONBackend(name, json_.loads, json_.dumps)
+    raise ValueError("Unknown JSON backend %r, expected one of %s" % (
+        name, ', '.join(JSON_BACKENDS)))
+
+
+def find_json_backend():
+    """Returns the fastest JSON backend installed.
+
+    Libraries running without their C speedups are only used if no other
+    library is available.
+
+    :rtype: :class:`JSONBackend`
+    """
+    found = []
+    for name in JSON_BACKENDS:
+        try:
+            found.append(load_json_backend(name))
+        except ImportError:
+            continue
+    accelerated = [backend for backend in found if backend.accelerated]
+    return (accelerated or found)[0]
+
+
+def set_json_backend(name):
+    """Selects the JSON backend used by :func:`json_loads` and
+    :func:`json_dumps`.
+
+    :param name: name of the backend, see :data:`JSON_BACKENDS`
+    :raises: ImportError if the library is not installed
+    """
+    global _json_backend
+    _json_backend = load_json_backend(name)
+
+
+def get_json_backend():
+    """Returns the JSON backend in use
+
+    :rtype: :class:`JSONBackend`
+    """
+    return _json_backend
+
+
+def json_loads(data):
+    """Parses a JSON str or unicode with the selected backend
+    """
+    return _json_backend.loads(data)
+
+
+def json_dumps(obj):
+    """Serializes an object to a JSON str with the selected backend
+    """
+    return _json_backend.dumps(obj)
+
+
+if os.environ.get('SWAGGERPY_JSON_BACKEND'):
+    _json_backend = load_json_backend(os.environ['SWAGGERPY_JSON_BACKEND'])
+else:
+    _json_backend = find_json_backend()
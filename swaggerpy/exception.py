@@ -21,6 +21,17 @@ class HTTPError(IOError):
         super(HTTPError, self).__init__(*args, **kwargs)
 
 
+class TimeoutError(IOError):
+    """Error raised when a deadline expires
+    """
+
+
+class SnapshotVersionError(ValueError):
+    """Error raised when a client snapshot was written by another version of
+    swaggerpy
+    """
+
+
 class CancelledError():
     """Error raised when result() is called from HTTPFuture
     and call was actually cancelled
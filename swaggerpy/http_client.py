@@ -12,7 +12,11 @@ import logging
 import urlparse
 
 import requests
+import requests.adapters
 import requests.auth
+from requests.packages.urllib3.util.retry import Retry
+
+from swaggerpy.response import HTTPFuture
 
 
 log = logging.getLogger(__name__)
@@ -25,6 +29,15 @@ class HttpClient(object):
     """Interface for a minimal HTTP client.
     """
 
+    #: Timeout in seconds of operations which don't set one, the default of
+    #: :meth:`swaggerpy.response.HTTPFuture.result` is used if None
+    default_timeout = None
+
+    #: Whether :meth:`start_request` sends the request, rather than the wait
+    #: for its response. The ``send`` phase of
+    #: :mod:`swaggerpy.instrumentation` is only timed if True.
+    sends_eagerly = False
+
     def request(self, method, url, params=None, data=None):
         """Issue an HTTP request.
 
@@ -73,6 +86,34 @@ class HttpClient(object):
         raise NotImplementedError(
             u"%s: Method not implemented", self.__class__.__name__)
 
+    def cache_key(self):
+        """Returns the key of the client in a
+        :class:`swaggerpy.client.SwaggerClientCache`. Clients with equal keys
+        share the cached :class:`swaggerpy.client.SwaggerClient`.
+
+        By default a client is only equal to itself, as its credentials and
+        settings are unknown.
+
+        :returns: a hashable object
+        """
+        return self
+
+    def create_future(self, request_params, post_receive,
+                      iter_post_receive=None, operation_id=None):
+        """Starts the request of an operation call.
+
+        :param request_params: Complete request data.
+        :type request_params: dict
+        :param post_receive: function decoding the response
+        :param iter_post_receive: function decoding a streamed response
+        :param operation_id: (resource name, nickname) of the operation,
+            for :mod:`swaggerpy.instrumentation`
+        :returns: what the operation call returns, by default a
+            :class:`swaggerpy.response.HTTPFuture`
+        """
+        return HTTPFuture(self, request_params, post_receive,
+                          iter_post_receive, operation_id)
+
     def __repr__(self):
         return "{0}()".format(type(self))
 
@@ -149,11 +190,49 @@ class ApiKeyAuthenticator(Authenticator):
 
 class SynchronousHttpClient(HttpClient):
     """Synchronous HTTP client implementation.
+
+    Connections are kept in a pool for each host, which can be sized for
+    clients shared by many threads, see :meth:`pool_stats`.
+
+    :param pool_connections: number of hosts for which a pool is kept
+    :param pool_maxsize: maximum number of connections kept in the pool of
+        each host
+    :param pool_block: if True, limit the connections to each host to
+        pool_maxsize, threads wait for a connection to be free. Otherwise
+        extra connections are opened, and closed after their request.
+    :param max_retries: number of retries on connection errors, or a
+        :class:`requests.packages.urllib3.util.retry.Retry`. Failed reads
+        are only retried for idempotent methods.
+    :param backoff_factor: retries wait ``backoff_factor * 2 ** (retry - 1)``
+        seconds, after the first retry
+    :param retry_statuses: HTTP statuses which are retried too, e.g. 503
+    :param default_timeout: timeout in seconds of requests which don't set
+        one, or a (connect, read) tuple
     """
 
-    def __init__(self):
+    def __init__(self, pool_connections=requests.adapters.DEFAULT_POOLSIZE,
+                 pool_maxsize=requests.adapters.DEFAULT_POOLSIZE,
+                 pool_block=False, max_retries=0, backoff_factor=0,
+                 retry_statuses=None, default_timeout=None):
         self.session = requests.Session()
         self.authenticator = None
+        self.default_timeout = default_timeout
+        if not isinstance(max_retries, Retry):
+            max_retries = Retry(
+                total=max_retries,
+                backoff_factor=backoff_factor,
+                status_forcelist=retry_statuses,
+                # once retries are exhausted, return the last response
+                # instead of raising a RetryError
+                raise_on_status=False,
+                # like requests, only retry reads if asked to
+                read=False if not max_retries else None)
+        for prefix in ('http://', 'https://'):
+            self.session.mount(prefix, requests.adapters.HTTPAdapter(
+                pool_connections=pool_connections,
+                pool_maxsize=pool_maxsize,
+                max_retries=max_retries,
+                pool_block=pool_block))
 
     def start_request(self, request_params):
         """
@@ -162,7 +241,8 @@ class SynchronousHttpClient(HttpClient):
         """
         return SynchronousEventual(
             self.session,
-            self.authenticated_request(request_params))
+            self.authenticated_request(request_params),
+            self.default_timeout)
 
     def set_basic_auth(self, host, username, password):
         self.authenticator = BasicAuthenticator(
@@ -181,26 +261,86 @@ class SynchronousHttpClient(HttpClient):
 
         return request
 
+    def pool_stats(self):
+        """Returns the state of the connection pool of each host, to tell
+        whether the pools are large enough for the threads using the client.
+
+        For each ``scheme://host:port``, a dict of:
+
+        * ``maxsize``: the maximum number of connections kept in the pool
+        * ``idle``: the number of open connections waiting in the pool
+        * ``connections``: the number of connections opened so far. When
+          the pool has none to give, an extra connection is opened and
+          closed after its request: if it keeps growing while requests are
+          sent, maxsize is too small.
+        * ``requests``: the number of requests sent so far
+
+        :rtype: dict
+        """
+        stats = {}
+        for prefix in ('http://', 'https://'):
+            pools = self.session.get_adapter(prefix).poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None or pool.pool is None:
+                    continue
+                # Pools are keyed by a PoolKey of all their settings in
+                # recent urllib3 versions
+                stats['%s://%s:%s' % (pool.scheme, pool.host, pool.port)] = {
+                    'maxsize': pool.pool.maxsize,
+                    'idle': sum(1 for conn in list(pool.pool.queue)
+                                if conn is not None),
+                    'connections': pool.num_connections,
+                    'requests': pool.num_requests,
+                }
+        return stats
+
+    def close(self):
+        """Closes the connections of the pools
+        """
+        self.session.close()
+
 
 class SynchronousEventual(object):
     """An adapter which supports the :class:`crochet.EventualResult` interface
     for the :class:`SynchronousHttpClient` class.
     """
 
-    def __init__(self, session, request):
+    def __init__(self, session, request, default_timeout=None):
         self.session = session
         self.request = request
+        self.default_timeout = default_timeout
 
     def wait(self, timeout=None):
         """Perform the request.
 
-        :param timeout: timeout for the request, in seconds
+        :param timeout: timeout for the request, in seconds. The client's
+            default timeout is used if None.
         """
+        if timeout is None:
+            timeout = self.default_timeout
         request = self.request
         log.debug(u"%s %s(%r)", request.method, request.url, request.params)
         return self.session.send(
             self.session.prepare_request(request),
             timeout=timeout)
 
+    def stream(self, timeout=None):
+        """Perform the request, without reading the body. The returned
+        response must be closed once its body was read with ``iter_content``.
+
+        :param timeout: timeout for the connection and each read, in seconds.
+            The client's default timeout is used if None.
+        """
+        if timeout is None:
+            timeout = self.default_timeout
+        request = self.request
+        log.debug(u"%s %s(%r) streamed", request.method, request.url,
+                  request.params)
+        return self.session.send(
+            self.session.prepare_request(request),
+            timeout=timeout,
+            stream=True)
+
     def cancel(self):
         pass
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""Hooks receiving the timings and payload sizes of operation calls.
+
+Hooks are registered for the whole process with :func:`add_hook`. While no
+hook is registered, operation calls are not timed at all.
+
+The phases of a call are:
+
+- ``request``: building the request from the parameters of the call
+- ``send``: starting the request with the http client, only for clients
+  which send requests before their response is waited for, see
+  :attr:`swaggerpy.http_client.HttpClient.sends_eagerly`. Other clients
+  send the request in the ``wait`` phase.
+- ``wait``: waiting for the response, in
+  :meth:`swaggerpy.response.HTTPFuture.result`
+- ``parse``: parsing the JSON body of the response
+- ``decode``: validating the body and building its models, which is done in
+  a single traversal
+- ``construct``: building the models of a trusted body, when the result is
+  not validated
+"""
+import logging
+import time
+
+# Phases of an operation call
+REQUEST = 'request'
+SEND = 'send'
+WAIT = 'wait'
+PARSE = 'parse'
+DECODE = 'decode'
+CONSTRUCT = 'construct'
+PHASES = (REQUEST, SEND, WAIT, PARSE, DECODE, CONSTRUCT)
+
+# Payloads of an operation call
+REQUEST_BODY = 'request'
+RESPONSE_BODY = 'response'
+
+# Registered hooks. Replaced, never modified, so calls read it without lock
+hooks = ()
+
+log = logging.getLogger(__name__)
+
+
+class OperationHook(object):
+    """Receives the timings and payload sizes of operation calls.
+
+    Hooks are called from the threads making the calls and waiting for
+    their results. Exceptions raised by hooks are logged, and do not fail
+    the calls.
+    """
+
+    def on_timing(self, resource, nickname, phase, seconds):
+        """Called at the end of each phase of a call.
+
+        :param resource: name of the resource of the operation
+        :param nickname: nickname of the operation
+        :param phase: one of :data:`PHASES`
+        :param seconds: duration of the phase
+        :type seconds: float
+        """
+        pass
+
+    def on_payload(self, resource, nickname, payload, size):
+        """Called with the size of the request and response bodies.
+
+        Form parameters and empty bodies are not reported.
+
+        :param resource: name of the resource of the operation
+        :param nickname: nickname of the operation
+        :param payload: :data:`REQUEST_BODY` or :data:`RESPONSE_BODY`
+        :param size: size of the body, in bytes
+        :type size: int
+        """
+        pass
+
+
+def add_hook(hook):
+    """Registers a hook, for the calls of all clients.
+
+    :type hook: :class:`OperationHook`
+    """
+    global hooks
+    hooks = hooks + (hook,)
+
+
+def remove_hook(hook):
+    """Unregisters a hook.
+
+    :type hook: :class:`OperationHook`
+    :raises: ValueError if the hook is not registered
+    """
+    global hooks
+    if hook not in hooks:
+        raise ValueError("%r is not registered" % (hook,))
+    hooks = tuple(registered for registered in hooks if registered is not hook)
+
+
+def record_timing(operation, phase, start):
+    """Reports the time elapsed since start to the hooks.
+
+    :param operation: (resource name, nickname) of the operation
+    :param phase: one of :data:`PHASES`
+    :param start: start of the phase, from :func:`time.time`
+    :returns: the end of the phase, to start the next one
+    """
+    end = time.time()
+    resource, nickname = operation
+    for hook in hooks:
+        try:
+            hook.on_timing(resource, nickname, phase, end - start)
+        except Exception:
+            log.exception(u"%r failed to record the %s timing of %s.%s",
+                          hook, phase, resource, nickname)
+    return end
+
+
+def record_payload(operation, payload, body):
+    """Reports the size of a body to the hooks.
+
+    :param operation: (resource name, nickname) of the operation
+    :param payload: :data:`REQUEST_BODY` or :data:`RESPONSE_BODY`
+    :param body: the body, only reported if it is a non empty string
+    """
+    if not body or not isinstance(body, basestring):
+        return
+    resource, nickname = operation
+    size = len(body)
+    for hook in hooks:
+        try:
+            hook.on_payload(resource, nickname, payload, size)
+        except Exception:
+            log.exception(u"%r failed to record the %s payload of %s.%s",
+                          hook, payload, resource, nickname)
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright (c) 2014, Yelp, Inc.
+#
+
+"""Incremental decoding of JSON array bodies.
+
+Responses of operations with an ``array`` type can be large. Instead of
+buffering the whole body and parsing it at once, the body is split into the
+top level items of the array as chunks arrive, and each item is parsed on
+its own. Only the item being received is kept in memory.
+"""
+import re
+
+from swaggerpy.compat import json_loads
+
+
+# Structural characters, outside and inside of JSON strings
+_TOKEN_RE = re.compile(r'[][{}",]')
+_STRING_RE = re.compile(r'["\\]')
+
+
+class JSONArrayDecoder(object):
+    """Splits a JSON array, fed chunk by chunk, into its parsed items.
+
+    Example: ::
+
+        decoder = JSONArrayDecoder()
+        decoder.feed('[{"id": 1}, {"i')  # [{'id': 1}]
+        decoder.feed('d": 2}]')           # [{'id': 2}]
+        decoder.close()
+
+    :raises: ValueError if the body is not a JSON array
+    """
+
+    def __init__(self):
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._done = False
+        self._count = 0
+        # Parts of the item being received, from previous chunks
+        self._pending = []
+
+    def feed(self, data):
+        """Decodes a chunk of the body.
+
+        :param data: next chunk of the body
+        :type data: str
+        :returns: list of the items completed by this chunk
+        """
+        items = []
+        start = 0
+        pos = 0
+        end = len(data)
+        while pos < end:
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                    pos += 1
+                    continue
+                match = _STRING_RE.search(data, pos)
+                if match is None:
+                    break
+                pos = match.end()
+                if match.group() == '"':
+                    self._in_string = False
+                else:
+                    self._escaped = True
+                continue
+
+            match = _TOKEN_RE.search(data, pos)
+            if match is None:
+                if self._depth == 0:
+                    self._check_outside(data[pos:])
+                break
+            token = match.group()
+            if self._depth == 0:
+                self._check_outside(data[pos:match.start()])
+                if self._done or token != '[':
+                    self._check_outside(token)
+                start = match.end()
+            elif token == '"':
+                self._in_string = True
+            elif token in '[{':
+                pass
+            elif self._depth == 1 and token == ',':
+                items.append(self._item(data[start:match.start()], True))
+                start = match.end()
+            elif self._depth == 1 and token == ']':
+                items.extend(self._last_item(data[start:match.start()]))
+                self._done = True
+            pos = match.end()
+            if token in '[{':
+                self._depth += 1
+            elif token in ']}':
+                self._depth -= 1
+
+        if self._depth > 0:
+            self._pending.append(data[start:])
+        return items
+
+    def close(self):
+        """Checks that the whole array was received.
+
+        An empty body is accepted, like an empty response is decoded to None.
+        """
+        if self._depth > 0 or self._in_string:
+            raise ValueError("JSON array is truncated")
+
+    def _check_outside(self, text):
+        if text.strip():
+            raise ValueError("Expected a JSON array, found %r" % text[:20])
+
+    def _item(self, text, required):
+        self._pending.append(text)
+        text = ''.join(self._pending)
+        self._pending = []
+        if not required and not self._count and not text.strip():
+            return None
+        self._count += 1
+        return json_loads(text)
+
+    def _last_item(self, text):
+        item = self._item(text, False)
+        if self._count == 0:
+            return []
+        return [item]
+
+
+def iter_json_array(chunks):
+    """Yields the parsed items of a JSON array, received in chunks.
+
+    :param chunks: iterable of the chunks of the body
+    :raises: ValueError if the body is not a JSON array
+    """
+    decoder = JSONArrayDecoder()
+    for chunk in chunks:
+        for item in decoder.feed(chunk):
+            yield item
+    decoder.close()
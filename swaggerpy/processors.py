@@ -77,13 +77,156 @@ class ParsingContext(object):
         self.id_stack.pop()
 
 
+# Hooks of SwaggerProcessor, in traversal order
+HOOKS = (
+    u'process_resource_listing',
+    u'process_resource_listing_api',
+    u'process_api_declaration',
+    u'process_resource_api',
+    u'process_operation',
+    u'process_parameter',
+    u'process_response_message',
+    u'process_model',
+    u'process_property',
+)
+
+# Deepest level of the traversal: resources, resource, api, operation,
+# parameter
+MAX_DEPTH = 5
+
+
+class TraversalContext(ParsingContext):
+    """Context of a :class:`SwaggerProcessor` traversal.
+
+    The traversal only records the objects it visits, by level. The stacks
+    of a :class:`ParsingContext` are built from them when read, typically
+    when a :class:`SwaggerError` is reported. Hooks can still push and pop
+    objects of their own.
+    """
+
+    # Field identifying the objects of each type
+    ID_FIELDS = {
+        u'listing_api': u'path',
+        u'api': u'path',
+        u'operation': u'nickname',
+        u'parameter': u'name',
+        u'response_message': u'code',
+        u'model': u'id',
+        u'prop': u'name',
+    }
+
+    def __init__(self):
+        self.depth = 0
+        self.types = [None] * MAX_DEPTH
+        self.objects = [None] * MAX_DEPTH
+        self.ids = [None] * MAX_DEPTH
+
+    def visit(self, depth, obj_type, json, id_string=None):
+        """Records the object visited at a level, which ends the deeper
+        levels.
+
+        :param depth: level of the object, 0 for the resource listing
+        :type obj_type: str
+        :param obj_type: Specifies type of object json represents
+        :type json: dict
+        :param json: Current Jsonified object.
+        :type id_string: str
+        :param id_string: Identifier of the given json, by default its
+            field of :attr:`ID_FIELDS`.
+        """
+        self.depth = depth + 1
+        self.types[depth] = obj_type
+        self.objects[depth] = json
+        self.ids[depth] = id_string
+
+    def push_str(self, obj_type, json, id_string):
+        """Pushes a new object into the context, after the current level.
+
+        :type obj_type: str
+        :param obj_type: Specifies type of object json represents
+        :type json: dict
+        :param json: Current Jsonified object.
+        :type id_string: str
+        :param id_string: Identifier of the given json.
+        """
+        if self.depth == len(self.types):
+            self.types.append(None)
+            self.objects.append(None)
+            self.ids.append(None)
+        self.visit(self.depth, obj_type, json, id_string)
+
+    def pop(self):
+        """Pops the most recent object out of the context
+        """
+        if self.depth == 0:
+            raise IndexError(u"pop from an empty context")
+        self.depth -= 1
+
+    @property
+    def type_stack(self):
+        return self.types[:self.depth]
+
+    @property
+    def id_stack(self):
+        return [
+            id_string if id_string is not None else
+            unicode(json.get(self.ID_FIELDS[obj_type]))
+            for obj_type, json, id_string in izip(
+                self.type_stack, self.objects, self.ids)]
+
+    @property
+    def args(self):
+        args = dict(izip(self.type_stack, self.objects))
+        args[u'context'] = self
+        return args
+
+    def __repr__(self):
+        zipped = izip(self.type_stack, self.id_stack)
+        strs = [u"%s=%s" % (t, i) for (t, i) in zipped]
+        return u"ParsingContext(stack=%r)" % strs
+
+    def is_empty(self):
+        """Tests whether context is empty.
+
+        :return: True if empty, False otherwise.
+        """
+        return self.depth == 0
+
+
+def model_id_set(model_ids):
+    """Returns the model ids of a declaration as a frozenset, for membership
+    tests.
+
+    :param model_ids: dict with the ``model_ids`` of the declaration
+    :rtype: frozenset
+    """
+    ids = model_ids.get('_model_id_set')
+    if ids is None:
+        ids = frozenset(model_ids.get('model_ids', ()))
+    return ids
+
+
 class SwaggerProcessor(object):
     """Post processing interface for Swagger API's.
 
     This processor can add fields to model objects for additional
     information to use in the templates.
+
+    The traversal only descends into the parts of the spec which have an
+    overridden hook: a processor of models does not walk the operations.
+    The ``context`` given to hooks is a :class:`TraversalContext`.
     """
 
+    def overrides(self, hook):
+        """Tests whether this processor overrides a hook of
+        :class:`SwaggerProcessor`.
+
+        :param hook: name of the hook, one of :data:`HOOKS`
+        :rtype: bool
+        """
+        return getattr(type(self), hook).im_func is not \
+            getattr(SwaggerProcessor, hook).im_func
+
     def pre_apply(self, resources):
         """Apply this processor to a Swagger definition before loading resources.
 
@@ -92,16 +235,18 @@ class SwaggerProcessor(object):
         :param resources: Top level Swagger definition.
         :type  resources: dict
         """
-        context = ParsingContext()
+        context = TraversalContext()
         resources_url = resources.get(u'url') or u'json:resource_listing'
-        context.push_str(u'resources', resources, resources_url)
-        self.process_resource_listing(**context.args)
-        for listing_api in resources[u'apis']:
-            context.push(u'listing_api', listing_api, u'path')
-            self.process_resource_listing_api(**context.args)
-            context.pop()
-        context.pop()
-        assert context.is_empty(), u"Expected %r to be empty" % context
+        context.visit(0, u'resources', resources, resources_url)
+        if self.overrides(u'process_resource_listing'):
+            self.process_resource_listing(
+                resources=resources, context=context)
+        if self.overrides(u'process_resource_listing_api'):
+            for listing_api in resources[u'apis']:
+                context.visit(1, u'listing_api', listing_api)
+                self.process_resource_listing_api(
+                    resources=resources, listing_api=listing_api,
+                    context=context)
 
     def apply(self, resources):
         """Apply this processor to a loaded Swagger definition.
@@ -111,53 +256,94 @@ class SwaggerProcessor(object):
         :param resources: Top level Swagger definition.
         :type  resources: dict
         """
-        context = ParsingContext()
+        overrides = self.overrides
+        listing_api_hook = overrides(u'process_resource_listing_api')
+        declaration_hook = overrides(u'process_api_declaration')
+        api_hook = overrides(u'process_resource_api')
+        operation_hook = overrides(u'process_operation')
+        parameter_hook = overrides(u'process_parameter')
+        response_hook = overrides(u'process_response_message')
+        model_hook = overrides(u'process_model')
+        property_hook = overrides(u'process_property')
+        walk_apis = api_hook or operation_hook or parameter_hook or \
+            response_hook
+        walk_operations = operation_hook or parameter_hook or response_hook
+        walk_models = model_hook or property_hook
+
+        context = TraversalContext()
         resources_url = resources.get(u'url') or u'json:resource_listing'
-        context.push_str(u'resources', resources, resources_url)
-        self.process_resource_listing(**context.args)
+        context.visit(0, u'resources', resources, resources_url)
+        if overrides(u'process_resource_listing'):
+            self.process_resource_listing(
+                resources=resources, context=context)
         for listing_api in resources[u'apis']:
-            context.push(u'listing_api', listing_api, u'path')
-            self.process_resource_listing_api(**context.args)
-            context.pop()
+            if listing_api_hook:
+                context.visit(1, u'listing_api', listing_api)
+                self.process_resource_listing_api(
+                    resources=resources, listing_api=listing_api,
+                    context=context)
 
+            resource = listing_api[u'api_declaration']
             api_url = listing_api.get(u'url') or u'json:api_declaration'
-            context.push_str(u'resource', listing_api[u'api_declaration'],
-                             api_url)
-            models = listing_api[u'api_declaration'].get(u'models', {})
-            self.process_api_declaration(**context.args)
-            for api in listing_api[u'api_declaration'][u'apis']:
-                context.push(u'api', api, u'path')
-                self.process_resource_api(**context.args)
-                for operation in api[u'operations']:
-                    context.push(u'operation', operation, u'nickname')
-                    context.push(u'model_ids', {'model_ids': models.keys()},
-                                 u'model_ids')
-                    self.process_operation(**context.args)
-                    for parameter in operation.get(u'parameters', []):
-                        context.push(u'parameter', parameter, u'name')
-                        self.process_parameter(**context.args)
-                        context.pop()
-                    for response in operation.get(u'responseMessages', []):
-                        context.push(u'response_message', response, u'code')
-                        self.process_response_message(**context.args)
-                        context.pop()
-                    context.pop()
-                    context.pop()
-                context.pop()
-            for (name, model) in models.items():
-                context.push(u'model', model, u'id')
-                self.process_model(**context.args)
-                for (name, prop) in model[u'properties'].items():
-                    context.push(u'prop', prop, u'name')
-                    context.push(u'model_ids', {'model_ids': models.keys()},
-                                 u'model_ids')
-                    self.process_property(**context.args)
-                    context.pop()
-                    context.pop()
-                context.pop()
-            context.pop()
-        context.pop()
-        assert context.is_empty(), u"Expected %r to be empty" % context
+            context.visit(1, u'resource', resource, api_url)
+            models = resource.get(u'models', {})
+            # Built once per declaration, and shared by all its operations
+            # and properties
+            model_ids = {'model_ids': models.keys(),
+                         '_model_id_set': frozenset(models)}
+            if declaration_hook:
+                self.process_api_declaration(
+                    resources=resources, resource=resource, context=context)
+            if walk_apis:
+                for api in resource[u'apis']:
+                    context.visit(2, u'api', api)
+                    if api_hook:
+                        self.process_resource_api(
+                            resources=resources, resource=resource, api=api,
+                            context=context)
+                    if not walk_operations:
+                        continue
+                    for operation in api[u'operations']:
+                        context.visit(3, u'operation', operation)
+                        if operation_hook:
+                            self.process_operation(
+                                resources=resources, resource=resource,
+                                api=api, operation=operation,
+                                context=context, model_ids=model_ids)
+                        if parameter_hook:
+                            for parameter in operation.get(
+                                    u'parameters', []):
+                                context.visit(4, u'parameter', parameter)
+                                self.process_parameter(
+                                    resources=resources, resource=resource,
+                                    api=api, operation=operation,
+                                    parameter=parameter, context=context,
+                                    model_ids=model_ids)
+                        if response_hook:
+                            for response in operation.get(
+                                    u'responseMessages', []):
+                                context.visit(
+                                    4, u'response_message', response)
+                                self.process_response_message(
+                                    resources=resources, resource=resource,
+                                    api=api, operation=operation,
+                                    response_message=response,
+                                    context=context, model_ids=model_ids)
+            if walk_models:
+                for model in models.values():
+                    context.visit(2, u'model', model)
+                    if model_hook:
+                        self.process_model(
+                            resources=resources, resource=resource,
+                            model=model, context=context)
+                    if not property_hook:
+                        continue
+                    for prop in model[u'properties'].values():
+                        context.visit(3, u'prop', prop)
+                        self.process_property(
+                            resources=resources, resource=resource,
+                            model=model, prop=prop, context=context,
+                            model_ids=model_ids)
 
     def process_resource_listing(self, resources, context):
         """Post process a resources.json object.
@@ -266,3 +452,57 @@ class SwaggerProcessor(object):
         :param context: Current context in the API.
         """
         pass
+
+
+def fused_hook(hook):
+    """Builds the hook of :class:`FusedProcessor` which calls the hook of
+    each of its processors which overrides it.
+    """
+    def fused(self, **kwargs):
+        for processor_hook in self.hooks[hook]:
+            processor_hook(**kwargs)
+    fused.__name__ = str(hook)
+    return fused
+
+
+class FusedProcessor(SwaggerProcessor):
+    """Applies several processors in a single traversal of the spec.
+
+    At each object, the hooks of the processors are called in the order of
+    the processors. The traversal descends into the parts of the spec which
+    any of them processes.
+
+    :param processors: list of :class:`SwaggerProcessor`
+    """
+
+    def __init__(self, processors):
+        self.processors = processors
+        self.hooks = dict(
+            (hook, [getattr(processor, hook) for processor in processors
+                    if processor.overrides(hook)])
+            for hook in HOOKS)
+        for hook, processor_hooks in self.hooks.items():
+            if len(processor_hooks) == 1:
+                # Spares a call per visit to hooks of a single processor
+                setattr(self, hook, processor_hooks[0])
+
+    def overrides(self, hook):
+        return bool(self.hooks[hook])
+
+
+for _hook in HOOKS:
+    setattr(FusedProcessor, _hook, fused_hook(_hook))
+
+
+def fuse_processors(processors):
+    """Returns a processor which applies processors in one traversal.
+
+    :param processors: list of :class:`SwaggerProcessor`
+    :returns: the only processor, a :class:`FusedProcessor`, or None
+        without processors
+    """
+    if not processors:
+        return None
+    if len(processors) == 1:
+        return processors[0]
+    return FusedProcessor(processors)
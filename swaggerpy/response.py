@@ -7,12 +7,19 @@
 """Code for checking the response from API. If correct, it proceeds to convert
 it into Python class types
 """
+import Queue
+import threading
+import time
+
 import swagger_type
-from swagger_type import SwaggerTypeCheck
+from swaggerpy import instrumentation
 from swaggerpy.exception import CancelledError
+from swaggerpy.json_stream import iter_json_array
 
 
 DEFAULT_TIMEOUT_S = 5.0
+# Size of the chunks read from streamed responses, in bytes
+STREAM_CHUNK_SIZE = 64 * 1024
 
 
 # TODO: why is this messing with exceptions? It's not going to work with all
@@ -29,15 +36,25 @@ def handle_response_errors(e):
 class HTTPFuture(object):
     """A future which inputs HTTP params"""
 
-    def __init__(self, http_client, request_params, post_receive):
+    def __init__(self, http_client, request_params, post_receive,
+                 iter_post_receive=None, operation_id=None):
         """Kicks API call for Asynchronous client
 
         :param http_client: a :class:`swaggerpy.http_client.HttpClient`
         :param request_params: dict containing API request parameters
         :param post_receive: function to callback on finish
+        :param iter_post_receive: function to callback with the chunks of a
+            streamed response, see :meth:`iter_result`
+        :param operation_id: (resource name, nickname) of the operation, to
+            report the wait for the response to
+            :mod:`swaggerpy.instrumentation` hooks
         """
         self._http_client = http_client
+        self._operation_id = operation_id
         self._post_receive = post_receive
+        self._iter_post_receive = iter_post_receive
+        self._default_timeout = getattr(
+            http_client, 'default_timeout', None) or DEFAULT_TIMEOUT_S
         # A request is an EventualResult in the async client
         self._request = self._http_client.start_request(request_params)
         self._cancelled = False
@@ -59,18 +76,33 @@ class HTTPFuture(object):
         If API was cancelled earlier, CancelledError is raised
         If everything goes fine, callback registered is triggered with response
 
-        :param timeout: timeout in seconds to wait for response
+        :param timeout: timeout in seconds to wait for response, defaults to
+            the ``default_timeout`` of the http client, or 5 seconds
         :type timeout: integer
         :param allow_null: if True, allow null fields in response
         :type allow_null: boolean
         :param raw_response: if True, return raw response w/o any validations
         :type raw_response: boolean
+        :param lazy: if True, validate and decode the fields of models only
+            when they are first read
+        :type lazy: boolean
+        :param validate: if False, build the models without type checking
+            the response, defaults to the ``validate`` of the operation
+        :type validate: boolean
+        :raises: :class:`swaggerpy.exception.TimeoutError` with the
+            asynchronous client, if the response is not received in time
         """
-        timeout = kwargs.pop('timeout', DEFAULT_TIMEOUT_S)
+        timeout = kwargs.pop('timeout', self._default_timeout)
 
         if self.cancelled():
             raise CancelledError()
-        response = self._request.wait(timeout=timeout)
+        if self._operation_id is not None and instrumentation.hooks:
+            start = time.time()
+            response = self._request.wait(timeout=timeout)
+            instrumentation.record_timing(
+                self._operation_id, instrumentation.WAIT, start)
+        else:
+            response = self._request.wait(timeout=timeout)
         try:
             response.raise_for_status()
         except Exception as e:
@@ -78,6 +110,106 @@ class HTTPFuture(object):
 
         return self._post_receive(response, **kwargs)
 
+    def iter_result(self, **kwargs):
+        """Blocking call to wait for a streamed API response, for operations
+        returning an array. The body is decoded while it is received, and the
+        items are yielded one at a time, so memory doesn't grow with the size
+        of the response.
+
+        Takes the same arguments as :meth:`result`, but timeout applies to
+        receiving each chunk of the body.
+
+        Errors in the HTTP status are raised by this call, errors in the body
+        are raised while iterating.
+        """
+        timeout = kwargs.pop('timeout', self._default_timeout)
+
+        if self.cancelled():
+            raise CancelledError()
+        if self._iter_post_receive is None:
+            raise TypeError("This request does not support streaming")
+        response = self._request.stream(timeout=timeout)
+        try:
+            response.raise_for_status()
+        except Exception as e:
+            response.close()
+            handle_response_errors(e)
+
+        try:
+            items = self._iter_post_receive(
+                response.iter_content(STREAM_CHUNK_SIZE), **kwargs)
+        except Exception:
+            response.close()
+            raise
+        return _closing_iter(response, items)
+
+
+def gather(futures, max_concurrency=10, **kwargs):
+    """Waits for the results of many futures, concurrently.
+
+    Up to max_concurrency results are waited for at once, each in its own
+    thread. With :class:`swaggerpy.http_client.SynchronousHttpClient` the
+    requests are only sent then, so they run concurrently too, and share the
+    connection pool of the client: keep max_concurrency below its
+    ``pool_maxsize``.
+
+    :param futures: list of :class:`HTTPFuture`
+    :param max_concurrency: maximum number of threads waiting for results
+    :param kwargs: arguments of :meth:`HTTPFuture.result`, for each future
+    :returns: list of the results, in the order of the futures. For failed
+        calls, the exception is returned instead of the result.
+    """
+    return map_concurrently(
+        lambda future: future.result(**kwargs), futures, max_concurrency)
+
+
+def map_concurrently(func, items, max_concurrency):
+    """Calls func on each item, on up to max_concurrency threads.
+
+    :returns: list of the results, in the order of the items. For failed
+        calls, the exception is returned instead of the result.
+    :raises: ValueError if max_concurrency is lower than 1
+    """
+    if max_concurrency < 1:
+        raise ValueError(
+            "max_concurrency must be at least 1, got %r" % max_concurrency)
+    items = list(items)
+    results = [None] * len(items)
+    pending = Queue.Queue()
+    for index in xrange(len(items)):
+        pending.put(index)
+
+    def run():
+        while True:
+            try:
+                index = pending.get_nowait()
+            except Queue.Empty:
+                return
+            try:
+                results[index] = func(items[index])
+            except Exception as e:
+                results[index] = e
+
+    threads = [threading.Thread(target=run)
+               for _ in xrange(min(max_concurrency, len(items)))]
+    for thread in threads:
+        thread.daemon = True
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def _closing_iter(response, items):
+    """Yields the items, then releases the streamed response, also if the
+    iteration is stopped early.
+    """
+    try:
+        for item in items:
+            yield item
+    finally:
+        response.close()
+
 
 def post_receive(response, type_, models, **kwargs):
     """Convert the response body to swagger models.
@@ -114,22 +246,189 @@ def post_receive(response, type_, models, **kwargs):
     :param response: response body
     :type response: dict
     :param type_: expected swagger type
-    :type type_: str or unicode
+    :type type_: str or unicode or
+        :class:`swaggerpy.swagger_type.TypeDescriptor`
     :param models: namedtuple which maps complex type string to py type
     :type models: namedtuple
+    :param validate: if False, the response is trusted and the models are
+        built without type checking it: date and date-time strings are kept
+        as they are.
+    :type validate: boolean
+    :param decoders: dict caching the decode functions of type_, see
+        :func:`get_response_decoder`
+    :type decoders: dict
     """
     allow_null = kwargs.pop('allow_null', False)
+    lazy = kwargs.pop('lazy', False)
+    validate = kwargs.pop('validate', True)
+    decoders = kwargs.pop('decoders', None)
 
     if kwargs.pop('raw_response', False):
         return response
 
-    response = SwaggerTypeCheck(
-        "Response",
-        response,
-        type_,
-        models,
-        allow_null).value
-    return SwaggerResponseConstruct(response, type_, models).create_object()
+    decode = get_response_decoder(type_, models, validate, lazy, decoders)
+    return decode(response, models, allow_null)
+
+
+def iter_post_receive(chunks, type_, models, **kwargs):
+    """Convert a streamed response body to swagger models, item by item.
+
+    Like :func:`post_receive`, for responses of an ``array`` type.
+
+    :param chunks: iterable of the chunks of the response body
+    :param type_: expected swagger type
+    :type type_: str or unicode or
+        :class:`swaggerpy.swagger_type.TypeDescriptor`
+    :param models: namedtuple which maps complex type string to py type
+    :type models: namedtuple
+    :returns: iterator over the decoded items
+    """
+    allow_null = kwargs.pop('allow_null', False)
+    lazy = kwargs.pop('lazy', False)
+    validate = kwargs.pop('validate', True)
+    decoders = kwargs.pop('decoders', None)
+    type_ = swagger_type.compile_type(type_, models)
+    if type_.kind is not swagger_type.ARRAY:
+        raise TypeError("Only responses of an array type can be streamed, "
+                        "found %s" % type_.name)
+
+    if kwargs.pop('raw_response', False):
+        return iter_json_array(chunks)
+
+    decode = get_response_decoder(
+        type_, models, validate, lazy, decoders, item=True)
+    return (decode(item, models, allow_null)
+            for item in iter_json_array(chunks))
+
+
+def get_response_decoder(type_, models, validate, lazy, decoders=None,
+                         item=False):
+    """Returns the function decoding responses of a type, with the signature
+    ``decode(value, models, allow_null)``.
+
+    Building it compiles the type into closures, so operations keep their
+    decoders in a dict, where they are built on first use for each
+    combination of options.
+
+    :param type_: expected swagger type
+    :type type_: str or unicode or
+        :class:`swaggerpy.swagger_type.TypeDescriptor`
+    :param models: namedtuple which maps complex type string to py type
+    :param validate: if False, the function only builds the models, see
+        :func:`build_type_constructor`
+    :param lazy: if True, models are decoded into lazy instances
+    :param decoders: optional dict caching the decoders of type_
+    :param item: if True, the function decodes the items of an array type
+    """
+    key = (validate, lazy, item)
+    decode = decoders.get(key) if decoders is not None else None
+    if decode is not None:
+        return decode
+
+    type_ = swagger_type.compile_type(type_, models)
+    name = "Response"
+    if item:
+        type_ = type_.item
+        name = "Response's item"
+    if validate:
+        decode = build_type_decoder(type_, name, lazy)
+    else:
+        construct = build_type_constructor(type_)
+
+        def decode(value, models, allow_null):
+            return construct(value, models)
+    if decoders is not None:
+        decoders[key] = decode
+    return decode
+
+
+def _construct_as_is(value, models):
+    return value
+
+
+def build_type_constructor(type_):
+    """Builds the construct function for a compiled type.
+
+    The returned function has the signature ``construct(value, models)`` and
+    behaves like :class:`SwaggerResponseConstruct`, assuming the value is
+    already checked and valid.
+
+    :param type_: type of the values to construct
+    :type type_: :class:`swaggerpy.swagger_type.TypeDescriptor`
+    """
+    kind = type_.kind
+    if kind is swagger_type.PRIMITIVE or kind is swagger_type.VOID:
+        return _construct_as_is
+
+    if kind is swagger_type.ARRAY:
+        construct_item = build_type_constructor(type_.item)
+        if construct_item is _construct_as_is:
+            return lambda value, models: (
+                None if value is None else list(value))
+        return lambda value, models: None if value is None else [
+            construct_item(item, models) for item in value]
+
+    model = type_.model
+
+    def construct_complex(value, models):
+        if value is None:
+            return None
+        klass = model or models[type_.name]
+        return klass._from_dict(value, models)
+    return construct_complex
+
+
+def build_type_decoder(type_, name, lazy=False):
+    """Builds the decode function for a compiled type.
+
+    The returned function has the signature ``decode(value, models,
+    allow_null)``. It validates the value like
+    :class:`swaggerpy.swagger_type.SwaggerTypeCheck` and builds the python
+    objects like :class:`SwaggerResponseConstruct`, in a single traversal.
+
+    :param type_: type of the values to decode
+    :type type_: :class:`swaggerpy.swagger_type.TypeDescriptor`
+    :param name: name of the field, used for error logging
+    :type name: str
+    :param lazy: if True, models are decoded into lazy instances, see
+        :class:`swaggerpy.swagger_model.LazyModel`
+    :type lazy: boolean
+    """
+    kind = type_.kind
+    if kind is swagger_type.PRIMITIVE or kind is swagger_type.VOID:
+        # Primitives are built as they are checked
+        return swagger_type.build_type_checker(type_, name)
+
+    if kind is swagger_type.ARRAY:
+        decode_item = build_type_decoder(type_.item, "%s's item" % name, lazy)
+
+        def decode_array(value, models, allow_null):
+            if value.__class__ is list:
+                return [decode_item(item, models, allow_null)
+                        for item in value]
+            if value is None:
+                if allow_null:
+                    return value
+                raise TypeError("Array found as null")
+            raise TypeError("%r should be an array instead of %s" %
+                            (value, value.__class__.__name__))
+        return decode_array
+
+    model = type_.model
+    if lazy:
+        def decode_lazy_complex(value, models, allow_null):
+            if allow_null and value is None:
+                return value
+            klass = model or models[type_.name]
+            return klass._decode_lazy(value, models, allow_null)
+        return decode_lazy_complex
+
+    def decode_complex(value, models, allow_null):
+        if allow_null and value is None:
+            return value
+        klass = model or models[type_.name]
+        return klass._decode(value, models, allow_null)
+    return decode_complex
 
 
 class SwaggerResponseConstruct(object):
@@ -140,12 +439,13 @@ class SwaggerResponseConstruct(object):
         :param _response: JSON response
         :type _response: dict
         :param type_: type against which the response is to be validated
-        :type type_: str or unicode
+        :type type_: str or unicode or
+            :class:`swaggerpy.swagger_type.TypeDescriptor`
         :param models: namedtuple which maps complex type string to py type
         :type models: namedtuple
         """
         self._response = response
-        self._type = type_
+        self._type = swagger_type.compile_type(type_, models)
         self._models = models
 
     def create_object(self):
@@ -157,9 +457,10 @@ class SwaggerResponseConstruct(object):
         """
         if self._response is None:
             return
-        if swagger_type.is_primitive(self._type) or self._type == 'void':
+        kind = self._type.kind
+        if kind is swagger_type.PRIMITIVE or kind is swagger_type.VOID:
             return self._response
-        if swagger_type.is_array(self._type):
+        if kind is swagger_type.ARRAY:
             return self._create_array_object()
         return self._create_complex_object()
 
@@ -167,29 +468,12 @@ class SwaggerResponseConstruct(object):
         """Creates array item objects by recursive call to create_object()
         Assume the response is validated and correct
         """
-        array_item_type = swagger_type.get_array_item_type(self._type)
-        return [SwaggerResponseConstruct(item,
-                                         array_item_type,
-                                         self._models
-                                         ).create_object()
-                for item in self._response]
+        construct_item = build_type_constructor(self._type.item)
+        return [construct_item(item, self._models) for item in self._response]
 
     def _create_complex_object(self):
-        """Creates empty instance of complex object and then fills it with attrs
+        """Creates instance of complex object from its generated constructor
         Assume the response is validated and correct
         """
-        klass = self._models[self._type]
-        instance = klass()
-        setattr(instance, '_raw', self._response)
-        for key in self._response.keys():
-            type_ = klass._swagger_types.get(key)
-            if type_ is None:
-                # Ignore unrecognized keys.  They will still be accessible in
-                # the '_raw' field if needed.
-                continue
-            swagger_response = SwaggerResponseConstruct(self._response[key],
-                                                        type_,
-                                                        self._models)
-            val = swagger_response.create_object()
-            setattr(instance, key, val)
-        return instance
+        klass = self._type.model or self._models[self._type.name]
+        return klass._from_dict(self._response, self._models)
@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright (c) 2014, Yelp, Inc.
+#
+
+"""Snapshots of built clients, for a fast process startup.
+
+Building a :class:`swaggerpy.client.SwaggerClient` downloads and validates
+the api docs, then resolves the url of every operation. A snapshot keeps the
+result: the model definitions and the operation tables of each resource.
+Loading it only generates the model types, without any request or
+validation.
+
+.. code-block:: python
+
+        client = SwaggerClient.from_url(api_docs_url)
+        save_snapshot(client, '/var/cache/pets.snapshot')
+
+        # In each worker
+        client = load_snapshot('/var/cache/pets.snapshot')
+
+A snapshot is only loaded by the version of swaggerpy which wrote it, other
+versions raise a :class:`swaggerpy.exception.SnapshotVersionError`.
+"""
+import cPickle as pickle
+
+import swaggerpy
+from swaggerpy.client import LazyMapping, Operation, Resource, SwaggerClient
+from swaggerpy.exception import SnapshotVersionError
+from swaggerpy.http_client import SynchronousHttpClient
+from swaggerpy.swagger_model import LazyModels, ModelRegistry
+
+# Bumped when the layout of ClientSnapshot changes
+SNAPSHOT_FORMAT_VERSION = 2
+
+
+class ClientSnapshot(object):
+    """Picklable description of a built client.
+
+    :param api_url: url of the api docs of the client
+    :param resources: list of ``(name, models, operations)`` for each
+        resource, where models is a list of ``(name, model_json)`` and
+        operations a list of ``(uri, operation_json)``
+    :param compact_models: whether the client has compact models
+    :param validate: whether the operations of the client validate calls
+    """
+
+    def __init__(self, api_url, resources, compact_models=False,
+                 validate=True):
+        self.api_url = api_url
+        self.resources = resources
+        self.compact_models = compact_models
+        self.validate = validate
+
+    @classmethod
+    def from_client(cls, client):
+        """
+        :type client: :class:`swaggerpy.client.SwaggerClient`
+        :rtype: :class:`ClientSnapshot`
+        """
+        resources = []
+        for name, resource in client._resources.iteritems():
+            models = resource._models
+            operations = [
+                (operation._uri, operation._json)
+                for operation in resource._operations.itervalues()]
+            resources.append((
+                name, models.definitions.items(), operations))
+        return cls(client._api_url, resources, client._compact_models,
+                   client._validate)
+
+    def build(self, http_client=None):
+        """Builds the client described by the snapshot.
+
+        :param http_client: an HTTP client used to perform requests
+        :type  http_client: :class:`swaggerpy.http_client.HttpClient`
+        :rtype: :class:`swaggerpy.client.SwaggerClient`
+        """
+        http_client = http_client or SynchronousHttpClient()
+        model_registry = ModelRegistry()
+        resources = {}
+        for name, model_defs, operations in self.resources:
+            models = LazyModels(
+                dict(model_defs), self.compact_models, model_registry)
+            resources[name] = Resource(name, LazyMapping(
+                dict((operation_json['nickname'], (uri, operation_json))
+                     for uri, operation_json in operations),
+                lambda spec, models=models, name=name: Operation(
+                    spec[0], spec[1], http_client, models, self.validate,
+                    name)), models)
+        return SwaggerClient(self.api_url, resources, self.compact_models,
+                             self.validate)
+
+
+def dump_snapshot(client, fp):
+    """Writes the snapshot of a client to a binary file object.
+
+    :type client: :class:`swaggerpy.client.SwaggerClient`
+    """
+    # The header is a pickle of its own, so that the version is checked
+    # before unpickling the snapshot
+    pickle.dump((SNAPSHOT_FORMAT_VERSION, swaggerpy.version), fp,
+                pickle.HIGHEST_PROTOCOL)
+    pickle.dump(ClientSnapshot.from_client(client), fp,
+                pickle.HIGHEST_PROTOCOL)
+
+
+def load_snapshot_file(fp, http_client=None):
+    """Builds a client from a snapshot read from a binary file object.
+
+    :param http_client: an HTTP client used to perform requests
+    :type  http_client: :class:`swaggerpy.http_client.HttpClient`
+    :rtype: :class:`swaggerpy.client.SwaggerClient`
+    :raises: :class:`swaggerpy.exception.SnapshotVersionError` if the
+        snapshot was written by another version of swaggerpy
+    """
+    header = pickle.load(fp)
+    expected = (SNAPSHOT_FORMAT_VERSION, swaggerpy.version)
+    if header != expected:
+        raise SnapshotVersionError(
+            "Snapshot has (format, swaggerpy version) %r, expected %r" % (
+                header, expected))
+    return pickle.load(fp).build(http_client)
+
+
+def save_snapshot(client, path):
+    """Writes the snapshot of a client to a file, see :func:`dump_snapshot`
+    """
+    with open(path, 'wb') as fp:
+        dump_snapshot(client, fp)
+
+
+def load_snapshot(path, http_client=None):
+    """Builds a client from a snapshot file, see :func:`load_snapshot_file`
+    """
+    with open(path, 'rb') as fp:
+        return load_snapshot_file(fp, http_client)
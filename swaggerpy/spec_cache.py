@@ -0,0 +1,145 @@
+# -*- coding: utf-8 -*-
+
+#
+# Copyright (c) 2014, Yelp, Inc.
+#
+
+"""On-disk cache of processed api docs.
+
+Each document of a spec, the resource listing and its api declarations, is
+stored with its ``ETag`` and ``Last-Modified`` validators. Once an entry is
+older than ``max_age``, the documents are revalidated with conditional
+requests: if every one of them answers ``304 Not Modified``, the processed
+resource listing is reused as is.
+
+.. code-block:: python
+
+        spec_cache = SpecCache('/var/cache/swaggerpy', max_age=60)
+        client = SwaggerClient.from_url(api_docs_url, spec_cache=spec_cache)
+"""
+import errno
+import hashlib
+import logging
+import os
+import tempfile
+import time
+
+from swaggerpy.compat import json_dumps, json_loads
+
+log = logging.getLogger(__name__)
+
+# Bumped when the layout of the cache entries changes
+CACHE_FORMAT_VERSION = 2
+
+
+class SpecCache(object):
+    """Stores processed resource listings in a directory, one file per url.
+
+    :param directory: directory of the cache files, created if missing
+    :param max_age: seconds during which an entry is used without being
+        revalidated. With the default of 0, every load sends conditional
+        requests.
+    :type  max_age: int
+    """
+
+    def __init__(self, directory, max_age=0):
+        self.directory = directory
+        self.max_age = max_age
+
+    def __repr__(self):
+        return "%s(%r, max_age=%r)" % (
+            self.__class__.__name__, self.directory, self.max_age)
+
+    def get_path(self, url):
+        return os.path.join(
+            self.directory, hashlib.sha1(url).hexdigest() + '.json')
+
+    def load(self, url):
+        """Reads the entry of a resource listing url.
+
+        Unreadable entries, and entries written by another version of
+        swaggerpy, are ignored.
+
+        :returns: dict with the ``timestamp`` of the entry, the cached
+            ``documents`` by url, the ``resource_listing`` and whether it
+            was ``validated``, or None if there is no entry
+        """
+        try:
+            with open(self.get_path(url)) as fp:
+                entry = json_loads(fp.read())
+        except IOError as e:
+            if e.errno != errno.ENOENT:
+                log.warning(u"Can't read spec cache of %s: %s", url, e)
+            return None
+        except ValueError as e:
+            log.warning(u"Corrupt spec cache of %s: %s", url, e)
+            return None
+        if entry.get('version') != CACHE_FORMAT_VERSION or \
+                entry.get('url') != url:
+            return None
+        return entry
+
+    def save(self, url, documents, resource_listing, timestamp=None,
+             validated=False):
+        """Writes the entry of a resource listing url. The file is replaced
+        atomically, so that concurrent processes never read a partial entry.
+
+        :param documents: mapping of the url of each document to a dict with
+            its ``body``, ``etag`` and ``last_modified``
+        :param resource_listing: resource listing, with its api declarations
+        :param validated: whether the resource listing passed validation
+        """
+        entry = {
+            'version': CACHE_FORMAT_VERSION,
+            'url': url,
+            'timestamp': timestamp or time.time(),
+            'documents': documents,
+            'resource_listing': resource_listing,
+            'validated': validated,
+        }
+        try:
+            if not os.path.isdir(self.directory):
+                os.makedirs(self.directory)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory)
+            with os.fdopen(fd, 'w') as fp:
+                fp.write(json_dumps(entry))
+            os.rename(tmp_path, self.get_path(url))
+        except (IOError, OSError) as e:
+            log.warning(u"Can't write spec cache of %s: %s", url, e)
+
+    def is_fresh(self, entry, timestamp=None):
+        """Checks if an entry can be used without revalidation
+        """
+        current_time = timestamp or time.time()
+        return entry['timestamp'] + self.max_age > current_time
+
+
+def get_validators(response):
+    """Returns the ``ETag`` and ``Last-Modified`` headers of a response, or
+    None for missing headers.
+    """
+    headers = dict((name.lower(), value)
+                   for name, value in response.headers.items())
+
+    def get(name):
+        value = headers.get(name)
+        # The asynchronous client returns lists of values
+        if isinstance(value, list):
+            return value[0] if value else None
+        return value
+
+    return get('etag'), get('last-modified')
+
+
+def add_conditional_headers(request_options, document):
+    """Returns a copy of request_options, with the headers making a request
+    conditional on the cached document being modified.
+    """
+    headers = dict(request_options.get('headers') or {})
+    if document.get('etag'):
+        headers['If-None-Match'] = document['etag']
+    if document.get('last_modified'):
+        headers['If-Modified-Since'] = document['last_modified']
+    request_options = dict(request_options)
+    request_options['headers'] = headers
+    return request_options
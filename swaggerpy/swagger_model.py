@@ -1,20 +1,47 @@
 # -*- coding: utf-8 -*-
+from collections import Mapping, OrderedDict
 import contextlib
-from copy import copy
+from copy import copy, deepcopy
 from functools import partial
+import hashlib
 import logging
 import os
+import re
+import threading
+import time
 import urllib
 import urlparse
 
+from swaggerpy import response
 from swaggerpy import swagger_type
-from swaggerpy.compat import json
-from swaggerpy.exception import SwaggerError
+from swaggerpy.compat import json, json_loads
+from swaggerpy.exception import SwaggerError, TimeoutError
 from swaggerpy.http_client import SynchronousHttpClient
-from swaggerpy.processors import SwaggerProcessor
+from swaggerpy.processors import model_id_set, SwaggerProcessor
+from swaggerpy.spec_cache import add_conditional_headers, get_validators
 
 SWAGGER_VERSIONS = [u"1.2"]
 
+# Validation modes of load_resource_listing: validate every load, validate
+# each content version of a spec once per process, or never validate
+VALIDATE_FULL = 'full'
+VALIDATE_CACHED = 'cached'
+VALIDATE_OFF = 'off'
+VALIDATION_MODES = (VALIDATE_FULL, VALIDATE_CACHED, VALIDATE_OFF)
+
+# Types allowed for properties and parameters besides models, and for
+# operations
+PROPERTY_TYPES = frozenset(swagger_type.primitive_types())
+OPERATION_TYPES = PROPERTY_TYPES | frozenset([u'void'])
+
+# Number of content hashes of validated specs remembered by VALIDATE_CACHED
+MAX_VALIDATED_SPECS = 64
+
+# Content hashes of the specs which passed validation, see spec_hash, least
+# recently used first
+_validated_specs = OrderedDict()
+_validated_specs_lock = threading.Lock()
+
 log = logging.getLogger(__name__)
 
 
@@ -23,6 +50,23 @@ class ValidationProcessor(SwaggerProcessor):
     """A processor that validates the Swagger model.
     """
 
+    # (model_ids, parameter types, operation types) of the last declaration
+    _allowed_types = None
+
+    def get_allowed_types(self, model_ids):
+        """Returns the sets of types allowed for parameters and for
+        operations, which are built once per api declaration.
+
+        :param model_ids: dict with the ``model_ids`` of the declaration
+        :returns: tuple of frozensets
+        """
+        allowed_types = self._allowed_types
+        if allowed_types is None or allowed_types[0] is not model_ids:
+            ids = model_id_set(model_ids)
+            allowed_types = self._allowed_types = (
+                model_ids, PROPERTY_TYPES | ids, OPERATION_TYPES | ids)
+        return allowed_types[1:]
+
     def process_resource_listing(self, resources, context):
         required_fields = [u'apis', u'swaggerVersion']
         validate_required_fields(resources, required_fields, context)
@@ -62,9 +106,8 @@ class ValidationProcessor(SwaggerProcessor):
                           model_ids):
         required_fields = [u'method', u'nickname', u'parameters', u'type']
         validate_required_fields(operation, required_fields, context)
-        allowed_types = (swagger_type.primitive_types() +
-                         model_ids.get('model_ids') + ['void'])
-        validate_type_or_ref(operation, model_ids, allowed_types, [], context)
+        _, allowed_types = self.get_allowed_types(model_ids)
+        validate_type_or_ref(operation, model_ids, allowed_types, (), context)
         validate_params_body_or_form(operation)
 
     def process_parameter(self, resources, resource, api, operation, parameter,
@@ -72,9 +115,8 @@ class ValidationProcessor(SwaggerProcessor):
         # TODO: check `consumes` in schema has proper header as per paramType
         required_fields = [u'name', u'paramType', u'type']
         validate_required_fields(parameter, required_fields, context)
-        allowed_types = (swagger_type.primitive_types() +
-                         model_ids.get('model_ids'))
-        validate_type_or_ref(parameter, model_ids, allowed_types, [], context)
+        allowed_types, _ = self.get_allowed_types(model_ids)
+        validate_type_or_ref(parameter, model_ids, allowed_types, (), context)
 
     def process_response_message(self, resources, resource, api, operation,
                                  response_message, context, model_ids):
@@ -94,10 +136,8 @@ class ValidationProcessor(SwaggerProcessor):
         required_fields = []
         validate_required_fields(prop, required_fields, context)
         # explicit validate special case: type OR ref must exist
-        allowed_types = swagger_type.primitive_types()
-        allowed_refs = model_ids.get('model_ids')
-        validate_type_or_ref(prop, model_ids, allowed_types,
-                             allowed_refs, None)
+        validate_type_or_ref(prop, model_ids, PROPERTY_TYPES,
+                             model_id_set(model_ids), None)
 
 
 def is_file_scheme_uri(url):
@@ -127,7 +167,7 @@ class FileEventual(object):
 
     def wait(self, timeout=None):
         with contextlib.closing(urllib.urlopen(self.get_path())) as fp:
-            return self.FileResponse(json.load(fp))
+            return self.FileResponse(json_loads(fp.read()))
 
     def cancel(self):
         pass
@@ -155,47 +195,196 @@ def load_resource_listing(
         url,
         http_client,
         base_url=None,
-        request_options=None):
+        request_options=None,
+        max_concurrency=10,
+        spec_cache=None,
+        validation_mode=VALIDATE_CACHED,
+        processors=()):
     """Load a complete swagger api spec and return all schemas compiled
     into a single dict.
 
+    The api declarations are fetched concurrently, on up to max_concurrency
+    threads. The ``timeout`` request option, 5 seconds by default, is the
+    deadline for loading the whole spec.
+
+    With a spec_cache, documents which were not modified since they were
+    cached are not downloaded again, and if none was modified, the cached
+    validated spec is reused.
+
+    In the default ``cached`` validation mode, a spec is validated by
+    :class:`ValidationProcessor` the first time its content is loaded in
+    the process, or stored in the spec_cache, and later loads of the same
+    content, by :func:`spec_hash`, skip validation. ``full`` validates every
+    load, ``off`` never does.
+
+    Additional processors are applied to every loaded spec after its
+    validation, also when it comes from the spec_cache.
+
     :param url: url to the swagger spec (file or http)
     :param http_client: a :class:`swaggerpy.http_client.HttpClient` for
         performing the requests to fetch api documents.
     :param base_url: optional url to use as the base url for api doc paths
     :param request_options: mapping of additional fields to specify in
         the http request to fetch resources.
+    :param max_concurrency: maximum number of api declarations fetched at once
+    :param spec_cache: optional :class:`swaggerpy.spec_cache.SpecCache`
+    :param validation_mode: one of :data:`VALIDATION_MODES`
+    :param processors: list of :class:`swaggerpy.processors.SwaggerProcessor`
+        applied after the validation, in their order
+    :raises: :class:`swaggerpy.exception.TimeoutError` if the spec is not
+        loaded before the deadline
     """
+    if validation_mode not in VALIDATION_MODES:
+        raise ValueError("Unknown validation mode %r, expected one of %s" % (
+            validation_mode, ', '.join(VALIDATION_MODES)))
     request_options = request_options or {}
     timeout = request_options.get('timeout', 5)
+    deadline = time.time() + timeout
     base_url = base_url or url
-    processor = ValidationProcessor()
 
-    def get_eventual_for_api(api):
-        return start_request(
-            http_client,
-            urlparse.urljoin(base_url + '/', api['path'].strip('/')),
-            request_options)
+    def validate(resource_listing, validated):
+        """Validates the resource listing, unless validation_mode lets it
+        skip validation, and returns whether it is validated.
+        """
+        if validation_mode == VALIDATE_OFF or \
+                validation_mode == VALIDATE_CACHED and validated:
+            set_property_names(resource_listing)
+            return validated
+        content_hash = None
+        if validation_mode == VALIDATE_CACHED:
+            content_hash = spec_hash(resource_listing)
+            if is_validated_spec(content_hash):
+                set_property_names(resource_listing)
+                return True
+        ValidationProcessor().apply(resource_listing)
+        if content_hash is not None:
+            add_validated_spec(content_hash)
+        return True
+
+    def process(resource_listing):
+        for processor in processors:
+            processor.pre_apply(resource_listing)
+            processor.apply(resource_listing)
+        return resource_listing
+
+    if spec_cache is None or is_file_scheme_uri(url):
+        cache_entry = None
+    else:
+        cache_entry = spec_cache.load(url) or {'documents': {}}
+        if 'timestamp' in cache_entry and spec_cache.is_fresh(cache_entry):
+            resource_listing = cache_entry['resource_listing']
+            validated = validate(resource_listing, cache_entry['validated'])
+            if validated and not cache_entry['validated']:
+                spec_cache.save(url, cache_entry['documents'],
+                                resource_listing, cache_entry['timestamp'],
+                                validated)
+            return process(resource_listing)
+    # Documents by url, once fetched or revalidated
+    documents = {}
+
+    def fetch(url):
+        remaining = deadline - time.time()
+        if remaining <= 0:
+            raise TimeoutError(
+                "Loading the api docs took more than %s seconds, %s was not "
+                "fetched" % (timeout, url))
+        if cache_entry is None:
+            return start_request(
+                http_client, url, request_options).wait(
+                    timeout=remaining).json()
+
+        cached = cache_entry['documents'].get(url)
+        options = request_options
+        if cached is not None:
+            options = add_conditional_headers(request_options, cached)
+        resp = start_request(http_client, url, options).wait(
+            timeout=remaining)
+        if cached is not None and resp.status_code == 304:
+            documents[url] = cached
+        else:
+            etag, last_modified = get_validators(resp)
+            documents[url] = {'body': resp.json(), 'etag': etag,
+                              'last_modified': last_modified}
+        # Processing modifies the documents, keep the cached ones intact
+        return deepcopy(documents[url]['body'])
+
+    def get_api_doc(api):
+        return fetch(urlparse.urljoin(base_url + '/', api['path'].strip('/')))
 
     def add_api_docs(resource_listing):
-        # Start all async requests
-        eventuals = map(get_eventual_for_api, resource_listing['apis'])
-        for api, eventual in zip(resource_listing['apis'], eventuals):
-            api['api_declaration'] = eventual.wait(timeout=timeout).json()
+        api_docs = response.map_concurrently(
+            get_api_doc, resource_listing['apis'], max_concurrency)
+        for api, api_doc in zip(resource_listing['apis'], api_docs):
+            if isinstance(api_doc, Exception):
+                raise api_doc
+            api['api_declaration'] = api_doc
 
-    resource_listing = start_request(
-        http_client,
-        url,
-        request_options
-    ).wait(timeout=timeout).json()
+    resource_listing = fetch(url)
 
-    processor.pre_apply(resource_listing)
+    if validation_mode != VALIDATE_OFF:
+        ValidationProcessor().pre_apply(resource_listing)
 
     # TODO: is this url used ?
     resource_listing['url'] = url
     add_api_docs(resource_listing)
-    processor.apply(resource_listing)
-    return resource_listing
+
+    validated = False
+    if cache_entry is not None and \
+            'resource_listing' in cache_entry and \
+            all(cache_entry['documents'].get(doc_url) is document
+                for doc_url, document in documents.iteritems()):
+        # Nothing was modified, reuse the validation of the cached spec
+        resource_listing = cache_entry['resource_listing']
+        validated = cache_entry['validated']
+
+    validated = validate(resource_listing, validated)
+    if cache_entry is not None:
+        spec_cache.save(url, documents, resource_listing, validated=validated)
+    return process(resource_listing)
+
+
+def spec_hash(resource_listing):
+    """Returns the content hash of a resource listing, along with its api
+    declarations.
+
+    :rtype: str
+    """
+    return hashlib.sha1(
+        json.dumps(resource_listing, sort_keys=True)).hexdigest()
+
+
+def is_validated_spec(content_hash):
+    """Checks whether a spec with this content hash passed validation, and
+    marks it as recently used.
+    """
+    with _validated_specs_lock:
+        if content_hash not in _validated_specs:
+            return False
+        del _validated_specs[content_hash]
+        _validated_specs[content_hash] = True
+        return True
+
+
+def add_validated_spec(content_hash):
+    """Remembers that a spec with this content hash passed validation,
+    forgetting the least recently used hashes beyond MAX_VALIDATED_SPECS.
+    """
+    with _validated_specs_lock:
+        _validated_specs.pop(content_hash, None)
+        _validated_specs[content_hash] = True
+        while len(_validated_specs) > MAX_VALIDATED_SPECS:
+            _validated_specs.popitem(last=False)
+
+
+def set_property_names(resource_listing):
+    """Sets the name of each model property into the property, as
+    :class:`ValidationProcessor` does, for specs which are not validated.
+    """
+    for listing_api in resource_listing[u'apis']:
+        models = listing_api[u'api_declaration'].get(u'models', {})
+        for model in models.itervalues():
+            for prop_name, prop in model[u'properties'].iteritems():
+                prop[u'name'] = prop_name
 
 
 def validate_required_fields(json, required_fields, context):
@@ -216,11 +405,12 @@ def validate_required_fields(json, required_fields, context):
 
 # TODO: Adding the file scheme here just adds complexity to start_request()
 # Is there a better way to handle this?
-def load_file(resource_listing_file, http_client=None):
+def load_file(resource_listing_file, http_client=None, processors=()):
     """Loads a resource listing file.
 
     :param http_client: HTTP client interface.
     :param resource_listing_file: File name for a resource listing.
+    :param processors: additional processors applied to the spec
     :return: Processed object model from
     :raise: IOError: On error reading api-docs.
     """
@@ -229,7 +419,8 @@ def load_file(resource_listing_file, http_client=None):
     # When loading from files, everything is relative to the resource listing
     dir_path = os.path.dirname(file_path)
     base_url = urlparse.urljoin(u'file:', urllib.pathname2url(dir_path))
-    return load_url(url, http_client=http_client, base_url=base_url)
+    return load_url(url, http_client=http_client, base_url=base_url,
+                    processors=processors)
 
 
 def load_url(url, http_client=None, **kwargs):
@@ -255,19 +446,33 @@ class docstring_property(object):
         return self.func()
 
 
-def create_model_type(model):
+IDENTIFIER_RE = re.compile(r'^[A-Za-z_][A-Za-z0-9_]*$')
+
+
+def create_model_type(model, compact=False, build_functions=True):
     """Create a dynamic class from the model data defined in the swagger spec.
 
     The docstring for this class is dynamically generated because generating
     the docstring is relatively expensive, and would only be used in rare
     cases for interactive debugging in a REPL.
 
+    In compact mode the class stores its properties in ``__slots__`` instead
+    of a per-instance ``__dict__``, and instances don't keep the raw JSON, so
+    their '_raw' is None. This cuts the memory of large responses. Models
+    whose property names can't be slots fall back to a regular class.
+
     :param model: Resource model :class:`dict` with keys `id` and `properties`
+    :param compact: if True, generate a class with ``__slots__``
+    :type compact: boolean
+    :param build_functions: if False, the validate and decode functions are
+        not generated. :func:`bind_model_types` generates them.
+    :type build_functions: boolean
     :returns: dynamic type created with attributes, docstrings attached
     :rtype: type
     """
     props = model['properties']
     name = str(model['id'])
+    swagger_types = swagger_type.get_swagger_types(props)
 
     methods = dict(
         __doc__=docstring_property(partial(create_model_docstring, props)),
@@ -276,10 +481,418 @@ def create_model_type(model):
         __repr__=lambda self: create_model_repr(self),
         __dir__=lambda self: props.keys(),
         _flat_dict=lambda self: create_flat_dict(self),
-        _swagger_types=swagger_type.get_swagger_types(props),
+        _swagger_model=model,
+        _swagger_types=swagger_types,
+        _swagger_descriptors=swagger_type.compile_types(swagger_types),
         _required=model.get('required'),
+        _compact=False,
     )
-    return type(name, (object,), methods)
+    if compact:
+        if all(IDENTIFIER_RE.match(prop) and prop not in methods and
+               prop != '_raw' for prop in props):
+            methods['__slots__'] = tuple(str(prop) for prop in props)
+            methods['_raw'] = None
+            methods['_compact'] = True
+        else:
+            log.debug(u"Properties of %s can't be slots, model isn't compact",
+                      name)
+    model_type = type(name, (object,), methods)
+    if build_functions:
+        build_model_functions(model_type)
+    return model_type
+
+
+def bind_model_types(models):
+    """Binds the compiled property types of each model to the model classes
+    they refer to, so nested models are resolved without a lookup.
+
+    :param models: dict which maps model name to the generated model type
+    :type models: dict
+    """
+    for model in models.itervalues():
+        model._swagger_descriptors = swagger_type.compile_types(
+            model._swagger_types, models)
+        build_model_functions(model)
+
+
+def model_key(name, definitions, compact=False):
+    """Returns the canonical hash of a model: of its definition and of the
+    definitions of all the models it refers to, directly or not.
+
+    :param name: name of the model
+    :param definitions: dict which maps model name to its model spec
+    :param compact: if True, the model is generated with ``__slots__``
+    :rtype: str
+    """
+    closure = {}
+    names = [name]
+    while names:
+        model_name = names.pop()
+        if model_name in closure or model_name not in definitions:
+            continue
+        definition = closure[model_name] = definitions[model_name]
+        for type_ in swagger_type.get_swagger_types(
+                definition['properties']).itervalues():
+            descriptor = swagger_type.compile_type(type_)
+            while descriptor.kind is swagger_type.ARRAY:
+                descriptor = descriptor.item
+            if descriptor.kind is swagger_type.COMPLEX:
+                names.append(descriptor.name)
+    return hashlib.sha1(
+        json.dumps([name, compact, closure], sort_keys=True)).hexdigest()
+
+
+class ModelRegistry(object):
+    """Model types shared by the resources of a client, by
+    :func:`model_key`.
+
+    Models defined the same way in several api declarations, like an
+    ``Error`` model, share one generated type, and their instances are
+    instances of the models of each resource.
+    """
+
+    def __init__(self):
+        # Held while generating the types of any LazyModels using the
+        # registry
+        self.lock = threading.RLock()
+        self._types = {}
+
+    def __len__(self):
+        return len(self._types)
+
+    def get(self, key):
+        return self._types.get(key)
+
+    def add(self, key, model):
+        self._types[key] = model
+
+
+class LazyModels(Mapping):
+    """Mapping of model name to generated model type, where each type is
+    generated on its first lookup, see :func:`create_model_type`.
+
+    The models referred to by the properties of a model are generated along
+    with it, so looked up types are always bound like with
+    :func:`bind_model_types`. Types become visible to other threads only
+    once all of them are complete.
+
+    :param definitions: dict which maps model name to its model spec
+    :param compact: if True, generate classes with ``__slots__``
+    :type compact: boolean
+    :param registry: if given, types are shared with the other LazyModels
+        of the registry
+    :type registry: :class:`ModelRegistry`
+    """
+
+    def __init__(self, definitions, compact=False, registry=None):
+        self.definitions = definitions
+        self.compact = compact
+        self.registry = registry
+        self._types = {}
+        # Types being generated by the thread holding the lock, and their
+        # registry keys
+        self._pending = None
+        self._pending_keys = None
+        if registry is not None:
+            self._lock = registry.lock
+        else:
+            self._lock = threading.RLock()
+
+    def __getitem__(self, name):
+        model = self._types.get(name)
+        if model is not None:
+            return model
+        with self._lock:
+            return self._create(name)
+
+    def _create(self, name):
+        model = self._types.get(name)
+        if model is None and self._pending is not None:
+            model = self._pending.get(name)
+        if model is not None:
+            return model
+        definition = self.definitions[name]
+        key = None
+        if self.registry is not None:
+            key = model_key(name, self.definitions, self.compact)
+            model = self.registry.get(key)
+            if model is not None:
+                # Registered types are complete
+                self._types[name] = model
+                return model
+        outermost = self._pending is None
+        if outermost:
+            self._pending = {}
+            self._pending_keys = []
+        try:
+            model = create_model_type(definition, self.compact,
+                                      build_functions=False)
+            self._pending[name] = model
+            # Looks up, and so generates, the referred models
+            model._swagger_descriptors = swagger_type.compile_types(
+                model._swagger_types, self)
+            build_model_functions(model)
+            if key is not None:
+                self._pending_keys.append((key, model))
+            if outermost:
+                self._types.update(self._pending)
+                for pending_key, pending_model in self._pending_keys:
+                    self.registry.add(pending_key, pending_model)
+        finally:
+            if outermost:
+                self._pending = None
+                self._pending_keys = None
+        return model
+
+    def __iter__(self):
+        return iter(self.definitions)
+
+    def __len__(self):
+        return len(self.definitions)
+
+    def __contains__(self, name):
+        return name in self.definitions
+
+
+# Defaults of these types are immutable, so they can be shared by instances
+_SHARED_DEFAULT_TYPES = frozenset([int, long, float, bool, str, unicode])
+
+
+def build_model_functions(model):
+    """Generates the validate, construct and decode functions specialized for
+    the fields of a generated model type, see :func:`build_model_validator`,
+    :func:`build_model_constructor` and :func:`build_model_decoder`.
+
+    :param model: generated model type
+    :type model: type
+    """
+    model._validate = staticmethod(build_model_validator(model))
+    model._from_dict = staticmethod(build_model_constructor(model))
+    model._decode = staticmethod(build_model_decoder(model))
+    model._decode_lazy = staticmethod(build_model_lazy_decoder(model))
+
+
+def build_model_validator(model):
+    """Builds the function validating a JSON dict against the model.
+
+    The function has the signature ``validate(value, models, allow_null)``,
+    converts the fields of value in place and returns it. The checkers for
+    each field are built once here.
+
+    :param model: generated model type
+    :type model: type
+    """
+    checkers = dict(
+        (name, swagger_type.build_type_checker(type_, name))
+        for name, type_ in model._swagger_descriptors.iteritems())
+    required = tuple(model._required or ())
+
+    def validate(value, models, allow_null):
+        if isinstance(value, model):
+            value = value._flat_dict()
+        # The only valid type from this point on is JSON dict
+        if not isinstance(value, dict):
+            raise TypeError("Type for %s is expected to be object" % value)
+        for key, check in checkers.iteritems():
+            # Unrecognized keys are ignored
+            if key in value:
+                value[key] = check(value[key], models, allow_null)
+        missing = [key for key in required if key not in value]
+        if missing:
+            raise AssertionError("These required fields not present: %s" %
+                                 missing)
+        return value
+    return validate
+
+
+def is_compact_model_type(model):
+    """checks whether the generated model type stores its properties in slots
+    :rtype: boolean
+    """
+    return model._compact
+
+
+def build_instance_factory(model):
+    """Builds the function creating an instance of the model from a dict of
+    its attributes, without going through the model ctor.
+
+    :param model: generated model type
+    :type model: type
+    """
+    if is_compact_model_type(model):
+        setters = [vars(model)[name].__set__ for name in model.__slots__]
+        slots = zip(model.__slots__, setters)
+
+        def new_compact_instance(attrs):
+            instance = object.__new__(model)
+            for name, set_slot in slots:
+                set_slot(instance, attrs[name])
+            return instance
+        return new_compact_instance
+
+    def new_instance(attrs):
+        instance = object.__new__(model)
+        instance.__dict__ = attrs
+        return instance
+    return new_instance
+
+
+def build_default_attrs(model):
+    """Builds the function returning a fresh dict of the default values the
+    model ctor assigns to each field. Immutable defaults are computed once.
+
+    :param model: generated model type
+    :type model: type
+    """
+    defaults = {}
+    default_factories = []
+    for name, type_ in model._swagger_descriptors.iteritems():
+        if type_.py_type is None or type_.py_type in _SHARED_DEFAULT_TYPES:
+            defaults[name] = type_.default()
+        else:
+            default_factories.append((name, type_.default))
+
+    def default_attrs():
+        attrs = defaults.copy()
+        for name, factory in default_factories:
+            attrs[name] = factory()
+        return attrs
+    return default_attrs
+
+
+def build_model_constructor(model):
+    """Builds the function creating a model instance from a JSON dict.
+
+    The function has the signature ``from_dict(value, models)`` and assumes
+    value is already validated. Fields missing from value get the same
+    defaults as the model ctor and value itself is kept in '_raw'.
+
+    :param model: generated model type
+    :type model: type
+    """
+    constructors = dict(
+        (name, response.build_type_constructor(type_))
+        for name, type_ in model._swagger_descriptors.iteritems())
+    default_attrs = build_default_attrs(model)
+    new_instance = build_instance_factory(model)
+
+    def from_dict(value, models):
+        attrs = default_attrs()
+        # Unrecognized keys are ignored, they are still accessible in '_raw'
+        attrs['_raw'] = value
+        for key, construct in constructors.iteritems():
+            if key in value:
+                attrs[key] = construct(value[key], models)
+        return new_instance(attrs)
+    return from_dict
+
+
+def build_model_decoder(model):
+    """Builds the function validating a JSON dict against the model and
+    creating the model instance from it in the same pass.
+
+    The function has the signature ``decode(value, models, allow_null)``.
+    Unlike :func:`build_model_validator` the value is not modified, so '_raw'
+    holds the JSON dict as it was received.
+
+    :param model: generated model type
+    :type model: type
+    """
+    decoders = dict(
+        (name, response.build_type_decoder(type_, name))
+        for name, type_ in model._swagger_descriptors.iteritems())
+    required = tuple(model._required or ())
+    default_attrs = build_default_attrs(model)
+    new_instance = build_instance_factory(model)
+
+    def decode(value, models, allow_null):
+        if isinstance(value, model):
+            value = value._flat_dict()
+        # The only valid type from this point on is JSON dict
+        if not isinstance(value, dict):
+            raise TypeError("Type for %s is expected to be object" % value)
+        attrs = default_attrs()
+        # Unrecognized keys are ignored, they are still accessible in '_raw'
+        attrs['_raw'] = value
+        for key, decode_field in decoders.iteritems():
+            if key in value:
+                attrs[key] = decode_field(value[key], models, allow_null)
+        missing = [key for key in required if key not in value]
+        if missing:
+            raise AssertionError("These required fields not present: %s" %
+                                 missing)
+        return new_instance(attrs)
+    return decode
+
+
+class LazyModel(object):
+    """Base of the lazy variants of generated model types.
+
+    A lazy instance only keeps the JSON dict it is built from. Each field is
+    validated and decoded when it is first read, then cached on the instance
+    as a regular attribute, so later reads cost nothing extra.
+    """
+
+    __slots__ = ()
+
+    def __getattr__(self, name):
+        # Only called for attributes which are not set yet
+        decode = self._lazy_decoders.get(name)
+        if decode is None:
+            raise AttributeError("%r object has no attribute %r" % (
+                self.__class__.__name__, name))
+        value, models, allow_null = self._pending
+        if name in value:
+            attr = decode(value[name], models, allow_null)
+        else:
+            attr = self._swagger_descriptors[name].default()
+        setattr(self, name, attr)
+        return attr
+
+    def _load_fields(self):
+        """Decodes all the fields which have not been read yet
+        """
+        for name in self._swagger_types:
+            getattr(self, name)
+
+
+def build_model_lazy_decoder(model):
+    """Builds the function creating a lazy instance of the model from a JSON
+    dict, see :class:`LazyModel`.
+
+    The function has the signature ``decode_lazy(value, models,
+    allow_null)``. Only the type of value and the presence of the required
+    fields are checked upfront, type errors in fields are raised when they
+    are read. Nested models are lazy as well.
+
+    :param model: generated model type
+    :type model: type
+    """
+    lazy_model = type(model.__name__, (LazyModel, model), dict(
+        __slots__=('_pending',),
+        _lazy_decoders=dict(
+            (name, response.build_type_decoder(type_, name, lazy=True))
+            for name, type_ in model._swagger_descriptors.iteritems()),
+    ))
+    required = tuple(model._required or ())
+    keep_raw = not is_compact_model_type(model)
+
+    def decode_lazy(value, models, allow_null):
+        if isinstance(value, model):
+            value = value._flat_dict()
+        # The only valid type from this point on is JSON dict
+        if not isinstance(value, dict):
+            raise TypeError("Type for %s is expected to be object" % value)
+        missing = [key for key in required if key not in value]
+        if missing:
+            raise AssertionError("These required fields not present: %s" %
+                                 missing)
+        instance = object.__new__(lazy_model)
+        instance._pending = (value, models, allow_null)
+        if keep_raw:
+            instance._raw = value
+        return instance
+    return decode_lazy
 
 
 def set_props(model, **kwargs):
@@ -290,21 +903,18 @@ def set_props(model, **kwargs):
        :param kwargs: attributes to override default values of constructor
        :type kwargs: dict
     """
-    types = getattr(model, '_swagger_types')
-    arg_keys = kwargs.keys()
-    for property_name, property_swagger_type in types.iteritems():
-        swagger_py_type = swagger_type.swagger_to_py_type(
-            property_swagger_type)
+    types = model._swagger_descriptors
+    for property_name, property_type in types.iteritems():
         # Assign all property values specified in kwargs
-        if property_name in arg_keys:
-            property_value = kwargs[property_name]
-            arg_keys.remove(property_name)
+        if property_name in kwargs:
+            property_value = kwargs.pop(property_name)
         else:
             # If not in kwargs, provide a default value to the type
-            property_value = swagger_type.get_instance(swagger_py_type)
+            property_value = property_type.default()
         setattr(model, property_name, property_value)
-    if arg_keys:
-        raise AttributeError(" %s are not defined for %s." % (arg_keys, model))
+    if kwargs:
+        raise AttributeError(" %s are not defined for %s." % (
+            kwargs.keys(), model))
 
 
 def create_model_docstring(props):
@@ -357,20 +967,38 @@ def create_model_docstring(props):
     return docstring
 
 
+def get_attrs(value):
+    """Returns the attributes of an object as a dict: its __dict__, or the
+    assigned slots of a compact model instance.
+
+    :returns: dict of attributes, None if value has neither
+    """
+    if isinstance(value, LazyModel):
+        value._load_fields()
+    if hasattr(value, '__dict__'):
+        return value.__dict__
+    if hasattr(value, '_swagger_types') and \
+            is_compact_model_type(value.__class__):
+        return dict((name, getattr(value, name))
+                    for name in value._swagger_types if hasattr(value, name))
+    return None
+
+
 def compare(first, second):
     """Compares the two types for equivalence.
 
     If a type composes another model types, .__dict__ recurse on those
     and compares again on those dict values
     """
-    if not hasattr(second, '__dict__'):
+    second_attrs = get_attrs(second)
+    if second_attrs is None:
         return False
 
     # Ignore any '_raw' keys
     def norm_dict(d):
         return dict((k, d[k]) for k in d if k != '_raw')
 
-    return norm_dict(first.__dict__) == norm_dict(second.__dict__)
+    return norm_dict(get_attrs(first)) == norm_dict(second_attrs)
 
 
 def create_flat_dict(model):
@@ -396,10 +1024,11 @@ def create_flat_dict(model):
                  ]
          }
     """
-    if not hasattr(model, '__dict__'):
+    attrs = get_attrs(model)
+    if attrs is None:
         return model
-    model_dict = copy(model.__dict__)
-    for k, v in model.__dict__.iteritems():
+    model_dict = copy(attrs)
+    for k, v in attrs.iteritems():
         if isinstance(v, list):
             model_dict[k] = [create_flat_dict(x) for x in v if x is not None]
         elif v is None:
@@ -446,15 +1075,15 @@ def validate_type_or_ref(json, model_ids, allowed_types,
     """Validates that either type OR ref is present in the json
 
        :param json: dict to check whether type or ref is present
-       :param model_ids: list of allowed $ref ids (all models)
-       :param allowed_types: list of all kind of types allowed
-       :param allowed_refs: list of all kind of refs allowed
+       :param model_ids: dict with the allowed $ref ids (all models)
+       :param allowed_types: set of all kind of types allowed
+       :param allowed_refs: set of all kind of refs allowed
        :param context: only used for Request Operation and Paramter
     """
     if json.get(u'type') in swagger_type.CONTAINER_TYPES:
         validate_required_fields(json, [u'items'], context)
         # OVerride allowed_refs to add model_ids if empty
-        allowed_refs = model_ids.get('model_ids')
+        allowed_refs = model_id_set(model_ids)
         return validate_type_or_ref(json[u'items'], model_ids,
                                     allowed_types, allowed_refs, context)
     if json.get(u'type') not in allowed_types and \
@@ -462,8 +1091,8 @@ def validate_type_or_ref(json, model_ids, allowed_types,
         # Show more detailed error with context, if present
         if context:
             raise SwaggerError("%s not in allowed types: %s" % (
-                json.get(u'type'), allowed_types), context)
+                json.get(u'type'), sorted(allowed_types)), context)
         else:
             raise TypeError("%s not in allowed types: %s" % (
-                json.get(u'type') or
-                json.get(u'$ref'), allowed_types + allowed_refs))
+                json.get(u'type') or json.get(u'$ref'),
+                sorted(set(allowed_types) | set(allowed_refs))))
@@ -3,6 +3,7 @@
 """
 
 import datetime
+import weakref
 
 import dateutil.parser
 
@@ -49,6 +50,13 @@ COLON = ':'
 
 DATETIME_TYPES = set([datetime.datetime, datetime.date])
 
+# Kinds of a compiled :class:`TypeDescriptor`
+VOID = 'void'
+
+PRIMITIVE = 'primitive'
+
+COMPLEX = 'complex'
+
 
 def get_instance(py_type):
     """Factory method to get default constructor invoked for the type
@@ -89,6 +97,11 @@ def primitive_types():
     return SWAGGER_PRIMITIVE_TYPE_TO_SWAGGER_FORMAT.keys()
 
 
+_PRIMITIVE_FORMATS = frozenset(primitive_formats())
+
+_PRIMITIVES = frozenset(primitive_types()) | _PRIMITIVE_FORMATS
+
+
 def extract_format(_type_format):
     """returns the Format extracted from Type:Format
     Type:Format is the convention followed for type conversion to string
@@ -107,7 +120,7 @@ def get_primitive_mapping(type_):
     :type  type_: str or unicode
     :rtype: type eg. int, string
     """
-    if type_ in primitive_formats():
+    if type_ in _PRIMITIVE_FORMATS:
         type_ = extract_format(type_)
     return SWAGGER_TO_PY_TYPE_MAPPING[type_]
 
@@ -116,7 +129,7 @@ def is_primitive(type_):
     """checks whether the swagger type is primitive
     :rtype: boolean
     """
-    return type_ in (primitive_types() + primitive_formats())
+    return type_ in _PRIMITIVES
 
 
 def is_file(type_):
@@ -245,6 +258,218 @@ def get_swagger_types(props):
     return swagger_types
 
 
+class TypeDescriptor(object):
+    """Compiled form of a swagger internal type string.
+
+    Descriptors are immutable and interned, so they should only be created
+    through :func:`compile_type` and may be compared by identity.
+
+    :param name: swagger internal type, eg. "array:integer:int64"
+    :param kind: one of VOID, PRIMITIVE, ARRAY or COMPLEX
+    :param py_type: python type used to build a default value, None for
+        complex and void types
+    :param check_type: python type (or tuple of types) a primitive value is
+        checked against
+    :param item: descriptor of the item type for arrays
+    :param model: model class for complex types, once bound to the models
+    """
+
+    __slots__ = ('name', 'kind', 'py_type', 'check_type', 'item', 'model',
+                 '__weakref__')
+
+    def __init__(self, name, kind, py_type=None, check_type=None, item=None,
+                 model=None):
+        init = super(TypeDescriptor, self).__setattr__
+        init('name', name)
+        init('kind', kind)
+        init('py_type', py_type)
+        init('check_type', check_type)
+        init('item', item)
+        init('model', model)
+
+    def __setattr__(self, name, value):
+        raise AttributeError("%r is immutable" % self)
+
+    def __repr__(self):
+        return "%s(%s)" % (self.__class__.__name__, self.name)
+
+    def default(self):
+        """Default value of the type, used by the generated model ctor
+        """
+        return get_instance(self.py_type)
+
+
+# type string -> descriptor not bound to any model class
+_TYPE_CACHE = {}
+
+# (type string, model class or bound item descriptor) -> bound descriptor.
+# Weak so that model classes of discarded clients can be collected.
+_BOUND_TYPE_CACHE = weakref.WeakValueDictionary()
+
+
+def _compile_unbound(type_):
+    if type_ == VOID:
+        return TypeDescriptor(type_, VOID)
+    if is_array(type_):
+        item = compile_type(get_array_item_type(type_))
+        return TypeDescriptor(type_, ARRAY, list, list, item)
+    if is_primitive(type_):
+        return TypeDescriptor(type_, PRIMITIVE, swagger_to_py_type(type_),
+                              get_primitive_mapping(type_))
+    return TypeDescriptor(type_, COMPLEX)
+
+
+def _bound(descriptor, item=None, model=None):
+    """returns the interned copy of descriptor bound to the item or model
+    """
+    key = (descriptor.name, model if item is None else item)
+    bound = _BOUND_TYPE_CACHE.get(key)
+    if bound is None:
+        bound = TypeDescriptor(descriptor.name, descriptor.kind,
+                               descriptor.py_type, descriptor.check_type,
+                               item, model)
+        _BOUND_TYPE_CACHE[key] = bound
+    return bound
+
+
+def _bind(descriptor, models):
+    """Binds complex types, possibly nested in arrays, to their model class.
+    Types referring to unknown models are left unbound.
+    """
+    if descriptor.kind is COMPLEX:
+        model = models.get(descriptor.name)
+        if model is None:
+            return descriptor
+        return _bound(descriptor, model=model)
+    elif descriptor.kind is ARRAY:
+        item = _bind(descriptor.item, models)
+        if item is descriptor.item:
+            return descriptor
+        return _bound(descriptor, item=item)
+    return descriptor
+
+
+def compile_type(type_, models=None):
+    """Compiles a swagger internal type string into a :class:`TypeDescriptor`
+
+    Compilation is done once per type string, later calls return the same
+    interned descriptor.
+
+    :param type_: swagger internal type, eg. "array:integer:int64". An already
+        compiled descriptor is returned as is.
+    :type type_: str or unicode or :class:`TypeDescriptor`
+    :param models: dict which maps complex type string to model class, used
+        to bind complex types to their class
+    :type models: dict
+    :rtype: :class:`TypeDescriptor`
+    """
+    if isinstance(type_, TypeDescriptor):
+        return type_
+    descriptor = _TYPE_CACHE.get(type_)
+    if descriptor is None:
+        descriptor = _TYPE_CACHE[type_] = _compile_unbound(type_)
+    if models:
+        return _bind(descriptor, models)
+    return descriptor
+
+
+def compile_types(swagger_types, models=None):
+    """Compiles a dict of swagger internal types, see :func:`compile_type`
+
+    :param swagger_types: dict of property name to swagger internal type
+    :type swagger_types: dict
+    :rtype: dict
+    """
+    return dict((name, compile_type(type_, models))
+                for name, type_ in swagger_types.iteritems())
+
+
+def array_of(item):
+    """returns the array descriptor whose items are of the given descriptor
+
+    :param item: descriptor of the array item type
+    :type item: :class:`TypeDescriptor`
+    :rtype: :class:`TypeDescriptor`
+    """
+    array = compile_type(ARRAY + COLON + item.name)
+    if array.item is item:
+        return array
+    return _bound(array, item=item)
+
+
+def _parse_datetime(value):
+    return dateutil.parser.parse(value)
+
+
+def _parse_date(value):
+    return dateutil.parser.parse(value).date()
+
+
+def build_type_checker(type_, name):
+    """Builds the check function for a compiled type.
+
+    The returned function has the signature ``check(value, models,
+    allow_null)`` and behaves like :class:`SwaggerTypeCheck`: it returns the
+    checked value, converting date and date-time strings, and raises
+    TypeError/AssertionError if validation fails. All the decisions depending
+    only on the type are taken here, once, instead of on every value.
+
+    :param type_: type against which values are to be validated
+    :type type_: :class:`TypeDescriptor`
+    :param name: name of the field, used for error logging
+    :type name: str
+    """
+    kind = type_.kind
+    if kind is VOID:
+        # Ignore any check if type is 'void'
+        return lambda value, models, allow_null: value
+
+    if kind is PRIMITIVE:
+        ptype = type_.check_type
+        # convert string datetime to python datetime format
+        convert = {datetime.datetime: _parse_datetime,
+                   datetime.date: _parse_date}.get(ptype)
+
+        def check_primitive(value, models, allow_null):
+            if isinstance(value, ptype) or allow_null and value is None:
+                return value
+            if convert is not None:
+                return convert(value)
+            # For all the other cases, raise Type mismatch
+            raise TypeError("%s's value: %s should be in types %r" % (
+                name, value, ptype))
+        return check_primitive
+
+    if kind is ARRAY:
+        check_item = build_type_checker(type_.item, "%s's item" % name)
+
+        def check_array(value, models, allow_null):
+            if value.__class__ is list:
+                return [check_item(item, models, allow_null)
+                        for item in value]
+            if value is None:
+                if allow_null:
+                    return value
+                raise TypeError("Array found as null")
+            raise TypeError("%r should be an array instead of %s" %
+                            (value, value.__class__.__name__))
+        return check_array
+
+    model = type_.model
+
+    def check_complex(value, models, allow_null):
+        if allow_null and value is None:
+            return value
+        klass = model
+        if klass is None:
+            # Ignore check if models tuple is not provided
+            if not models:
+                return value
+            klass = models[type_.name]
+        return klass._validate(value, models, allow_null)
+    return check_complex
+
+
 class SwaggerTypeCheck(object):
     """Initialization of the class checks for the validity
     of the value to the type.
@@ -260,7 +485,7 @@ class SwaggerTypeCheck(object):
         :param value: JSON value
         :type value: dict
         :param type_: type against which the value is to be validated
-        :type type_: str or unicode
+        :type type_: str or unicode or :class:`TypeDescriptor`
         :param models: namedtuple which maps complex type string to py type
         :type models: namedtuple
         :param allow_null: if True, ignores null values from type check
@@ -268,7 +493,7 @@ class SwaggerTypeCheck(object):
         """
         self.name = name
         self.value = value
-        self._type = type_
+        self._type = compile_type(type_, models)
         self.models = models
         self.allow_null = allow_null
         self._check_value_format()
@@ -276,25 +501,26 @@ class SwaggerTypeCheck(object):
     def _check_value_format(self):
         """Check the value as per the type of the value
         """
-        if self._type == 'void':
+        kind = self._type.kind
+        if kind is VOID:
             # Ignore any check if type is 'void'
             return
         elif self.allow_null and self.value is None:
             return
-        elif is_primitive(self._type):
+        elif kind is PRIMITIVE:
             self._check_primitive_type()
-        elif is_array(self._type):
+        elif kind is ARRAY:
             self._check_array_type()
         else:
             # Ignore check if models tuple is not provided
-            if self.models:
+            if self.models or self._type.model is not None:
                 self._check_complex_type()
 
     def _check_primitive_type(self):
         """Validate value is of primitive type
         Also converts swagger type to py type if needed e.g. datetime
         """
-        ptype = get_primitive_mapping(self._type)
+        ptype = self._type.check_type
         if not isinstance(self.value, ptype):
             # convert string datetime to python datetime format
             if ptype == datetime.datetime:
@@ -315,35 +541,14 @@ class SwaggerTypeCheck(object):
         if self.value.__class__ is not list:
             raise TypeError("%r should be an array instead of %s" %
                             (self.value, self.value.__class__.__name__))
-        array_item_type = get_array_item_type(self._type)
-        self.value = [SwaggerTypeCheck(
-            "%s's item" % self.name,
-            item, array_item_type, self.models, self.allow_null).value
-            for item in self.value]
+        check_item = build_type_checker(self._type.item,
+                                        "%s's item" % self.name)
+        self.value = [check_item(item, self.models, self.allow_null)
+                      for item in self.value]
 
     def _check_complex_type(self):
         """Checks all the fields in the complex type are of proper type
         All the required fields are present and no extra field is present
         """
-        klass = self.models[self._type]
-        if isinstance(self.value, klass):
-            self.value = self.value._flat_dict()
-        # The only valid type from this point on is JSON dict
-        if not isinstance(self.value, dict):
-            raise TypeError("Type for %s is expected to be object" %
-                            self.value)
-        required = list(klass._required) if klass._required else []
-        for key in self.value.keys():
-            if key in required:
-                required.remove(key)
-            if key not in klass._swagger_types.keys():
-                # Ignore unrecognized keys
-                continue
-            self.value[key] = SwaggerTypeCheck(key,
-                                               self.value[key],
-                                               klass._swagger_types[key],
-                                               self.models,
-                                               self.allow_null).value
-        if required:
-            raise AssertionError("These required fields not present: %s" %
-                                 required)
+        klass = self._type.model or self.models[self._type.name]
+        self.value = klass._validate(self.value, self.models, self.allow_null)
@@ -17,8 +17,10 @@ from collections import namedtuple
 from mock import patch, Mock
 from ordereddict import OrderedDict
 
+import crochet
 from crochet._eventloop import EventualResult
 from twisted.internet.defer import Deferred
+from twisted.python.failure import Failure
 from twisted.web.http_headers import Headers
 
 import swaggerpy.async_http_client
@@ -127,6 +129,14 @@ class AsyncHttpClientTest(unittest.TestCase):
             resp = eventual.wait(timeout=5)
             self.assertEqual(2, resp.code)
 
+    def test_wait_timeout_raises_swaggerpy_timeout_error(self):
+        eventual = Mock(spec=EventualResult)
+        eventual.wait.side_effect = crochet.TimeoutError()
+        async_eventual = swaggerpy.async_http_client.AsyncEventual(
+            eventual, swaggerpy.async_http_client._BodyStream())
+        self.assertRaises(swaggerpy.exception.TimeoutError,
+                          async_eventual.wait, timeout=1)
+
     def test_url_encode_async_request(self):
         Response = namedtuple("MyResponse",
                               "version code phrase headers length deliverBody")
@@ -149,7 +159,7 @@ class AsyncHttpClientTest(unittest.TestCase):
                 1, 2, 3, 4, 5, 6)
 
             async_client = swaggerpy.async_http_client.AsynchronousHttpClient()
-            async_client.start_request(req)
+            eventual = async_client.start_request(req)
 
             mock_fetch_deferred.assert_called_once_with(
                 {
@@ -157,7 +167,8 @@ class AsyncHttpClientTest(unittest.TestCase):
                     'method': 'GET',
                     'bodyProducer': None,
                     'uri': 'foo?bar=%E9%85%92%E5%A0%B4'
-                }
+                },
+                eventual._body_stream,
             )
 
     def test_start_request_with_only_url(self):
@@ -167,14 +178,102 @@ class AsyncHttpClientTest(unittest.TestCase):
         # difficult to mock
         async_client.fetch_deferred = Mock()
 
-        async_client.start_request(dict(url=url))
+        eventual = async_client.start_request(dict(url=url))
 
         async_client.fetch_deferred.assert_called_once_with({
             'headers': Headers({}),
             'method': 'GET',
             'bodyProducer': None,
             'uri': url + '?',
-        })
+        }, eventual._body_stream)
+
+
+class ConnectionPoolTest(unittest.TestCase):
+
+    def fetch(self, async_client, uri):
+        fetch_deferred = swaggerpy.async_http_client.AsynchronousHttpClient.\
+            fetch_deferred.wrapped_function
+        return fetch_deferred(async_client, {'method': 'GET', 'uri': uri})
+
+    def test_pool_is_configured(self):
+        async_client = swaggerpy.async_http_client.AsynchronousHttpClient(
+            persistent=False, max_persistent_per_host=3, idle_timeout=20)
+        self.assertFalse(async_client.pool.persistent)
+        self.assertEqual(3, async_client.pool.maxPersistentPerHost)
+        self.assertEqual(20, async_client.pool.cachedConnectionTimeout)
+        self.assertEqual(async_client.pool, async_client.agent._pool)
+
+    def test_requests_are_limited_per_host(self):
+        async_client = swaggerpy.async_http_client.AsynchronousHttpClient(
+            max_connections_per_host=1)
+        responses = [Deferred(), Deferred(), Deferred()]
+        async_client.agent = Mock(**{'request.side_effect': responses})
+
+        self.fetch(async_client, 'http://foo/1')
+        self.fetch(async_client, 'http://foo/2')
+        self.fetch(async_client, 'http://bar/1')
+        self.assertEqual(
+            ['http://foo/1', 'http://bar/1'],
+            [c[1]['uri'] for c in async_client.agent.request.call_args_list])
+
+        # The connection is released once the body is received
+        response = Mock(**{'code': 200, 'headers': Headers({})})
+        responses[0].callback(response)
+        self.assertEqual(2, async_client.agent.request.call_count)
+        fetcher = response.deliverBody.call_args[0][0]
+        fetcher.connectionLost(Mock(**{'check.return_value': True}))
+        self.assertEqual(3, async_client.agent.request.call_count)
+        self.assertEqual('http://foo/2',
+                         async_client.agent.request.call_args[1]['uri'])
+
+    def test_connection_is_released_on_error(self):
+        async_client = swaggerpy.async_http_client.AsynchronousHttpClient(
+            max_connections_per_host=1)
+        responses = [Deferred(), Deferred()]
+        async_client.agent = Mock(**{'request.side_effect': responses})
+
+        finished = self.fetch(async_client, 'http://foo/1')
+        self.fetch(async_client, 'http://foo/2')
+        finished.addErrback(lambda _: None)
+        responses[0].errback(ValueError("Connection refused"))
+        self.assertEqual(2, async_client.agent.request.call_count)
+
+
+class TwistedHttpClientTest(unittest.TestCase):
+
+    def setUp(self):
+        self.http_client = swaggerpy.async_http_client.TwistedHttpClient()
+        self.response = Deferred()
+        self.http_client.agent = Mock(
+            **{'request.return_value': self.response})
+
+    def receive(self, code, body):
+        response = Mock(**{'code': code, 'headers': Headers({})})
+        self.response.callback(response)
+        fetcher = response.deliverBody.call_args[0][0]
+        fetcher.dataReceived(body)
+        fetcher.connectionLost(Mock(**{'check.return_value': True}))
+
+    def test_create_future_returns_deferred_with_result(self):
+        results = []
+        deferred = self.http_client.create_future(
+            {'method': 'GET', 'url': 'http://foo/pet'},
+            lambda response: response.json())
+        deferred.addCallback(results.append)
+        self.assertEqual('http://foo/pet?',
+                         self.http_client.agent.request.call_args[1]['uri'])
+        self.receive(200, '{"id": 1}')
+        self.assertEqual([{"id": 1}], results)
+
+    def test_create_future_fails_on_error_status(self):
+        errors = []
+        deferred = self.http_client.create_future(
+            {'method': 'GET', 'url': 'http://foo/pet'}, Mock())
+        deferred.addErrback(errors.append)
+        self.receive(404, 'Not found')
+        errors[0].trap(swaggerpy.exception.HTTPError)
+        self.assertEqual('404 Client Error : Not found',
+                         str(errors[0].value))
 
 
 class HTTPBodyFetcherTest(unittest.TestCase):
@@ -204,6 +303,79 @@ class HTTPBodyFetcherTest(unittest.TestCase):
         errback.assert_called_once_with(reason)
 
 
+class StreamedHTTPBodyFetcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.body_stream = swaggerpy.async_http_client._BodyStream()
+        self.http_body_fetcher = swaggerpy.async_http_client._HTTPBodyFetcher(
+            'req', 'resp', Mock(), self.body_stream)
+        self.http_body_fetcher.transport = Mock()
+
+    def test_data_received_before_streaming_is_handed_over(self):
+        self.http_body_fetcher.dataReceived("hello")
+        self.body_stream.start()
+        self.http_body_fetcher.dataReceived("World")
+        self.assertEqual(self.http_body_fetcher, self.body_stream.get(0))
+        self.assertEqual("hello", self.body_stream.get(0))
+        self.assertEqual("World", self.body_stream.get(0))
+
+    def test_success_connection_lost_ends_stream(self):
+        self.body_stream.start()
+        reason = Mock(**{'check.return_value': True})
+        self.http_body_fetcher.connectionLost(reason)
+        self.body_stream.get(0)
+        self.assertEqual(None, self.body_stream.get(0))
+        self.assertFalse(self.http_body_fetcher.finished.callback.called)
+
+    def test_error_connection_lost_is_raised_by_stream(self):
+        self.body_stream.start()
+        self.http_body_fetcher.connectionLost(
+            Failure(ValueError("Connection lost")))
+        self.body_stream.get(0)
+        self.assertRaises(ValueError, self.body_stream.get, 0)
+        self.assertFalse(self.http_body_fetcher.finished.errback.called)
+
+    def test_receiving_is_paused_while_too_many_chunks_wait(self):
+        self.body_stream.start()
+        transport = self.http_body_fetcher.transport
+        max_chunks = swaggerpy.async_http_client.MAX_PENDING_CHUNKS
+        for _ in xrange(max_chunks):
+            self.http_body_fetcher.dataReceived("x")
+        transport.pauseProducing.assert_called_once_with()
+        self.assertTrue(self.http_body_fetcher.paused)
+        self.http_body_fetcher.resume()
+        transport.resumeProducing.assert_called_once_with()
+        self.assertFalse(self.http_body_fetcher.paused)
+
+    def test_get_times_out(self):
+        self.assertRaises(swaggerpy.exception.TimeoutError,
+                          self.body_stream.get, 0)
+
+
+class StreamedAsyncResponseTest(unittest.TestCase):
+
+    def test_iter_content_yields_chunks_until_end_of_body(self):
+        body_stream = swaggerpy.async_http_client._BodyStream()
+        for chunk in ('["a",', ' "b"]', None):
+            body_stream.queue.put(chunk)
+        resp = Mock(**{'code': 200, 'headers': Headers({})})
+        async_resp = swaggerpy.async_http_client.StreamedAsyncResponse(
+            None, resp, body_stream, 1)
+        self.assertEqual(['["a",', ' "b"]'], list(async_resp.iter_content()))
+        self.assertEqual([], list(async_resp.iter_content()))
+
+    def test_raise_for_status_reads_error_body(self):
+        body_stream = swaggerpy.async_http_client._BodyStream()
+        for chunk in ('Not', ' found', None):
+            body_stream.queue.put(chunk)
+        resp = Mock(**{'code': 404, 'headers': Headers({})})
+        async_resp = swaggerpy.async_http_client.StreamedAsyncResponse(
+            None, resp, body_stream, 1)
+        self.assertRaises(swaggerpy.exception.HTTPError,
+                          async_resp.raise_for_status)
+        self.assertEqual('Not found', async_resp.text)
+
+
 class AsyncResponseTest(unittest.TestCase):
 
     def test_build_async_response(self):
@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 import datetime
 import tempfile
+import threading
+import time
 import unittest
 
 import httpretty
@@ -8,9 +10,13 @@ import requests
 from mock import Mock, patch
 
 from swaggerpy import client
+from swaggerpy import response
+from swaggerpy import swagger_type
 from swaggerpy.async_http_client import AsynchronousHttpClient
 from swaggerpy.client import (
     add_param_to_req,
+    build_models,
+    build_request_builder,
     SwaggerClient,
     SwaggerClientCache,
     validate_and_add_params_to_request,
@@ -38,6 +44,10 @@ class ValidateParamTest(unittest.TestCase):
             mock_add_param.assert_called_once_with(param, False, mock_request)
 
 
+def key(*args, **kwargs):
+    return client.make_cache_key((args, kwargs))
+
+
 class SwaggerClientCacheTest(unittest.TestCase):
 
     def setUp(self):
@@ -49,13 +59,13 @@ class SwaggerClientCacheTest(unittest.TestCase):
         with patch('swaggerpy.client.SwaggerClient'):
             with patch('swaggerpy.client.time.time', side_effect=[1]):
                 client.get_client('test', ttl=10)
-                assert client.cache.cache["('test',)[]"].is_stale(12)
+                assert client.cache.cache[key('test')].is_stale(12)
 
     def test_is_stale_returns_false_before_ttl(self):
         with patch('swaggerpy.client.SwaggerClient'):
             with patch('swaggerpy.client.time.time', side_effect=[1]):
                 client.get_client('test', ttl=10)
-                assert not client.cache.cache["('test',)[]"].is_stale(11)
+                assert not client.cache.cache[key('test')].is_stale(11)
 
     def test_build_cached_item_with_proper_values(self):
         with patch('swaggerpy.client.SwaggerClient.from_url') as mock:
@@ -77,20 +87,136 @@ class SwaggerClientCacheTest(unittest.TestCase):
 
     def test_builds_client_if_present_in_cache_but_stale(self):
         with patch('swaggerpy.client.time.time', side_effect=[2, 3]):
-            client.cache = client.SwaggerClientCache()
-            client.cache.cache['foo'] = client.CacheEntry('bar', 0, 1)
+            client.cache = client.SwaggerClientCache(background_refresh=False)
+            client.cache.cache[key('foo')] = client.CacheEntry('bar', 0, 1)
             with patch('swaggerpy.client.SwaggerClient.from_url') as mock:
                 client.get_client('foo')
                 mock.assert_called_once_with('foo')
 
+    def test_builds_client_on_every_call_without_ttl(self):
+        client.cache = client.SwaggerClientCache()
+        with patch('swaggerpy.client.SwaggerClient.from_url',
+                   side_effect=[object(), object()]) as mock:
+            first = client.get_client('foo', ttl=0)
+            second = client.get_client('foo', ttl=0)
+        self.assertIsNot(first, second)
+        self.assertEqual(2, mock.call_count)
+        self.assertEqual({}, client.cache._building)
+
     def test_uses_the_cache_if_present_and_fresh(self):
         client.cache = client.SwaggerClientCache()
-        client.cache.cache['foo'] = client.CacheEntry('bar', 2, 1)
+        client.cache.cache[key('foo')] = client.CacheEntry('bar', 2, 1)
         with patch('swaggerpy.client.SwaggerClient') as mock:
             with patch('swaggerpy.client.time.time', side_effect=[2]):
                 client.get_client('foo')
                 assert not mock.called
 
+    def test_stale_client_is_served_while_refreshed_in_background(self):
+        cache = client.SwaggerClientCache()
+        cache.cache[key('foo')] = client.CacheEntry('stale', 0, 1)
+        building = threading.Event()
+        release = threading.Event()
+
+        def build_client(*args, **kwargs):
+            building.set()
+            release.wait()
+            return 'fresh'
+        with patch.object(cache, 'build_client',
+                          side_effect=build_client) as mock_build:
+            self.assertEqual('stale', cache('foo'))
+            building.wait(1)
+            self.assertEqual('stale', cache('foo'))
+            release.set()
+            self.wait_for_refresh(cache)
+            self.assertEqual('fresh', cache('foo'))
+        mock_build.assert_called_once_with('foo')
+
+    def test_concurrent_calls_build_the_client_once(self):
+        cache = client.SwaggerClientCache()
+        results = []
+
+        def build_client(*args, **kwargs):
+            time.sleep(0.1)
+            return object()
+
+        def get():
+            results.append(cache('foo'))
+        with patch.object(cache, 'build_client',
+                          side_effect=build_client) as mock_build:
+            threads = [threading.Thread(target=get) for _ in xrange(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(1, mock_build.call_count)
+        self.assertEqual(5, len(results))
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def test_stale_client_is_kept_if_refresh_fails(self):
+        cache = client.SwaggerClientCache()
+        cache.cache[key('foo')] = client.CacheEntry('stale', 10, 1)
+        with patch.object(cache, 'build_client', side_effect=IOError):
+            self.assertEqual('stale', cache('foo'))
+            self.wait_for_refresh(cache)
+        self.assertFalse(cache.cache[key('foo')].is_stale())
+        self.assertEqual('stale', cache('foo'))
+
+    def test_stale_client_is_dropped_if_refresh_fails(self):
+        cache = client.SwaggerClientCache(serve_stale_on_error=False)
+        cache.cache[key('foo')] = client.CacheEntry('stale', 10, 1)
+        with patch.object(cache, 'build_client', side_effect=IOError):
+            self.assertEqual('stale', cache('foo'))
+            self.wait_for_refresh(cache)
+            self.assertFalse(key('foo') in cache.cache)
+            self.assertRaises(IOError, cache, 'foo')
+
+    def test_least_recently_used_client_is_evicted(self):
+        cache = client.SwaggerClientCache(max_size=2)
+        with patch.object(cache, 'build_client', side_effect=lambda url: url):
+            cache('a')
+            cache('b')
+            cache('a')
+            cache('c')
+        self.assertEqual(set([key('a'), key('c')]), set(cache.cache))
+        self.assertEqual(1, cache.stats()['evictions'])
+
+    def test_unused_stale_clients_are_swept_first(self):
+        cache = client.SwaggerClientCache(max_size=2)
+        with patch.object(cache, 'build_client', side_effect=lambda url: url):
+            cache('a', ttl=0.01)
+            cache('b')
+            cache('a', ttl=0.01)
+            time.sleep(0.02)
+            cache('c')
+        self.assertEqual(set([key('b'), key('c')]), set(cache.cache))
+        self.assertEqual(1, cache.stats()['expirations'])
+        self.assertEqual(0, cache.stats()['evictions'])
+
+    def test_sweep_keeps_fresh_clients(self):
+        cache = client.SwaggerClientCache()
+        cache.cache[key('a')] = client.CacheEntry('a', 10, 1)
+        cache.cache[key('b')] = client.CacheEntry('b', 10, 100)
+        cache.sweep(timestamp=50)
+        self.assertEqual([key('b')], cache.cache.keys())
+
+    def test_stats_count_hits_and_misses(self):
+        cache = client.SwaggerClientCache()
+        with patch.object(cache, 'build_client', side_effect=lambda url: url):
+            cache('a')
+            cache('a')
+            cache('b')
+        self.assertEqual(
+            {'size': 2, 'max_size': client.SWAGGER_CLIENT_CACHE_SIZE,
+             'hits': 1, 'misses': 2, 'evictions': 0, 'expirations': 0},
+            cache.stats())
+
+    def wait_for_refresh(self, cache):
+        for _ in xrange(100):
+            if not cache._building:
+                return
+            time.sleep(0.01)
+        self.fail("Refresh didn't finish")
+
     @patch('swaggerpy.client.load_resource_listing', autospec=True)
     def test_cache_with_async_http_client(self, _):
         url = 'http://example.com/api-docs'
@@ -101,6 +227,44 @@ class SwaggerClientCacheTest(unittest.TestCase):
         assert swagger_client is other
 
 
+class MakeCacheKeyTest(unittest.TestCase):
+
+    def test_equal_values_have_equal_keys(self):
+        self.assertEqual(
+            key('url', request_options={'headers': {'a': 'b'}, 'timeout': 1}),
+            key('url', request_options={'timeout': 1, 'headers': {'a': 'b'}}))
+        self.assertNotEqual(
+            key('url', request_options={'timeout': 1}),
+            key('url', request_options={'timeout': 2}))
+
+    def test_http_clients_are_compared_by_cache_key(self):
+        self.assertEqual(key('url', http_client=AsynchronousHttpClient()),
+                         key('url', http_client=AsynchronousHttpClient()))
+        self.assertNotEqual(
+            key('url', http_client=AsynchronousHttpClient()),
+            key('url', http_client=AsynchronousHttpClient(
+                max_connections_per_host=2)))
+        self.assertNotEqual(
+            key('url', http_client=AsynchronousHttpClient()),
+            key('url', http_client=client.SynchronousHttpClient()))
+
+    def test_synchronous_http_clients_are_compared_by_identity(self):
+        http_client = client.SynchronousHttpClient()
+        http_client.set_basic_auth('localhost', 'user', 'secret')
+        self.assertEqual(key('url', http_client=http_client),
+                         key('url', http_client=http_client))
+        self.assertNotEqual(
+            key('url', http_client=http_client),
+            key('url', http_client=client.SynchronousHttpClient()))
+
+    def test_unhashable_objects_are_compared_by_identity(self):
+        class Unhashable(object):
+            __hash__ = None
+        value = Unhashable()
+        self.assertEqual(key(value), key(value))
+        self.assertNotEqual(key(value), key(Unhashable()))
+
+
 class GetClientMethodTest(unittest.TestCase):
 
     def setUp(self):
@@ -128,8 +292,7 @@ class GetClientMethodTest(unittest.TestCase):
     def test_cache_of_a_json_dict(self):
         client.get_client({'swaggerVersion': '1.2', 'apis': []})
         self.assertTrue(
-            repr(({'swaggerVersion': '1.2', 'apis': []},)) + "[]" in
-            client.cache.cache)
+            key({'swaggerVersion': '1.2', 'apis': []}) in client.cache.cache)
 
 
 class ClientTest(unittest.TestCase):
@@ -258,6 +421,60 @@ class ClientTest(unittest.TestCase):
         resp = self.uut.pet.deletePet(petId=1234).result()
         self.assertEqual(None, resp)
 
+    def test_resources_and_operations_are_built_on_first_access(self):
+        with patch.object(client, 'Operation') as mock_operation:
+            uut = SwaggerClient.from_resource_listing(self.resource_listing)
+            self.assertEqual(['pet'], dir(uut))
+            pet = uut.pet
+            self.assertEqual(0, mock_operation.call_count)
+            self.assertIs(pet, uut.pet)
+            self.assertIs(pet.listPets, pet.listPets)
+            self.assertEqual(1, mock_operation.call_count)
+
+    def test_responses_without_content_are_parsed_with_json(self):
+        class TextResponse(object):
+            text = '["cat"]'
+
+            def json(self):
+                return ["cat"]
+
+            def raise_for_status(self):
+                pass
+        http_client = Mock(spec=['start_request'])
+        http_client.start_request.return_value.wait.return_value = \
+            TextResponse()
+        operation_json = self.resource_listing['apis'][0][
+            'api_declaration']['apis'][0]['operations'][0]
+        operation = client.Operation(
+            u'http://swagger.py/swagger-test/pet', operation_json,
+            http_client, {})
+        self.assertEqual(['cat'], operation().result())
+
+    @httpretty.activate
+    def test_response_decoder_is_built_once_per_operation(self):
+        httpretty.register_uri(
+            httpretty.GET, "http://swagger.py/swagger-test/pet",
+            body='[]')
+        with patch('swaggerpy.response.build_type_decoder',
+                   side_effect=response.build_type_decoder) as mock_build:
+            self.uut.pet.listPets().result()
+            built = mock_build.call_count
+            self.uut.pet.listPets().result()
+            self.assertEqual(built, mock_build.call_count)
+            self.uut.pet.listPets().result(lazy=True)
+            self.assertEqual(2 * built, mock_build.call_count)
+
+    @patch('swaggerpy.client.create_operation_docstring')
+    def test_operation_docstring_is_generated_on_first_access(
+            self, mock_create_docstring):
+        operation = self.uut.pet.listPets
+        self.assertEqual(0, mock_create_docstring.call_count)
+        self.assertEqual(mock_create_docstring.return_value,
+                         operation.__doc__)
+        operation.__doc__
+        self.assertEqual(1, mock_create_docstring.call_count)
+        self.assertTrue(client.Operation.__doc__.startswith('Perform'))
+
     def setUp(self):
         # Default handlers for all swagger.py access
         self.resource_listing = {
@@ -394,5 +611,84 @@ class AddParamToReqTest(unittest.TestCase):
         self.assertEqual(u"http://foo.com/%24%7Bn%7D%20review", request['url'])
 
 
+class BuildRequestBuilderTest(unittest.TestCase):
+
+    def build(self, uri, parameters, method='GET'):
+        params = [(param, swagger_type.compile_type(
+            swagger_type.get_swagger_type(param)))
+            for param in parameters]
+        return build_request_builder(
+            uri, {'method': method, 'nickname': 'op'}, params, {})
+
+    def test_path_params_fill_their_slots(self):
+        build_request = self.build('http://foo.com/{a}/{b}/{a}/{c}', [
+            {'name': 'a', 'type': 'string', 'paramType': 'path'},
+            {'name': 'b', 'type': 'array', 'items': {'type': 'integer'},
+             'paramType': 'path'},
+        ])
+        request = build_request({'a': '{b} x', 'b': [1, 2]}, {})
+        self.assertEqual(u'http://foo.com/%7Bb%7D%20x/1%2C2/%7Bb%7D%20x/{c}',
+                         request['url'])
+
+    def test_unset_path_params_keep_their_slot(self):
+        build_request = self.build('http://foo.com/{a}', [
+            {'name': 'a', 'type': 'string', 'paramType': 'path'}])
+        self.assertEqual('http://foo.com/{a}', build_request({}, {})['url'])
+
+    def test_params_are_routed_by_param_type(self):
+        build_request = self.build('http://foo.com/pet', [
+            {'name': 'q', 'type': 'integer', 'paramType': 'query'},
+            {'name': 'h', 'type': 'string', 'paramType': 'header'},
+            {'name': 'f', 'type': 'string', 'paramType': 'form'},
+            {'name': 'd', 'type': 'string', 'paramType': 'query',
+             'defaultValue': 'x'},
+        ], method=u'POST')
+        request = build_request({'q': [1, 2], 'h': 'v', 'f': 'w'}, {})
+        self.assertEqual({
+            'method': 'POST',
+            'url': 'http://foo.com/pet',
+            'params': {'q': [1, 2], 'd': 'x'},
+            'headers': {'h': 'v'},
+            'data': {'f': 'w'},
+        }, request)
+        self.assertTrue(isinstance(request['method'], str))
+
+    def test_body_of_complex_type_is_json(self):
+        build_request = self.build('http://foo.com/pet', [
+            {'name': 'body', 'type': 'Pet', 'paramType': 'body'}])
+        request = build_request({'body': {'id': 1}}, {})
+        self.assertEqual('{"id": 1}', request['data'])
+        self.assertEqual('application/json', request['headers']['content-type'])
+
+    def test_invalid_values_raise(self):
+        build_request = self.build('http://foo.com/{a}', [
+            {'name': 'a', 'type': 'integer', 'paramType': 'path',
+             'required': True},
+            {'name': 'q', 'type': 'Pet', 'paramType': 'query'}])
+        self.assertRaises(TypeError, build_request, {'a': 'x'}, {})
+        self.assertRaises(TypeError, build_request, {}, {})
+        self.assertRaises(TypeError, build_request, {'a': 1, 'q': {}}, {})
+        self.assertRaises(TypeError, build_request, {'a': 1, 'z': 1}, {})
+
+    def test_trusted_values_are_not_checked(self):
+        build_request = self.build('http://foo.com/{a}', [
+            {'name': 'a', 'type': 'integer', 'paramType': 'path',
+             'required': True},
+            {'name': 'q', 'type': 'integer', 'paramType': 'query'}])
+        request = build_request({'a': 'x', 'q': 'y'}, {}, validate=False)
+        self.assertEqual('http://foo.com/x', request['url'])
+        self.assertEqual({'q': 'y'}, request['params'])
+        self.assertRaises(TypeError, build_request, {}, {}, validate=False)
+
+    def test_trusted_model_body_is_flattened(self):
+        models = build_models({'Pet': {
+            'id': 'Pet', 'properties': {'id': {'type': 'integer'}}}})
+        build_request = self.build('http://foo.com/pet', [
+            {'name': 'body', 'type': 'Pet', 'paramType': 'body'}])
+        request = build_request(
+            {'body': models['Pet'](id=1)}, {}, validate=False)
+        self.assertEqual('{"id": 1}', request['data'])
+
+
 if __name__ == '__main__':
     unittest.main()
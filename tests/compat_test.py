@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+import mock
+import pytest
+
+from swaggerpy import compat
+
+
+@pytest.fixture
+def json_backend():
+    backend = compat.get_json_backend()
+    yield
+    compat._json_backend = backend
+
+
+@pytest.mark.parametrize('name', compat.JSON_BACKENDS)
+def test_backends_round_trip(json_backend, name):
+    try:
+        compat.set_json_backend(name)
+    except ImportError:
+        pytest.skip("%s is not installed" % name)
+    assert compat.get_json_backend().name == name
+    value = {u'id': 1, u'name': u'caf\xe9', u'tags': [1.5, None, True]}
+    assert compat.json_loads(compat.json_dumps(value)) == value
+    with pytest.raises(ValueError):
+        compat.json_loads('[1,')
+
+
+@pytest.mark.parametrize('name', compat.JSON_BACKENDS)
+def test_backends_parse_floats_like_json(json_backend, name):
+    try:
+        compat.set_json_backend(name)
+    except ImportError:
+        pytest.skip("%s is not installed" % name)
+    data = '[0.1, 1.2345678901234567, 2.5e-308, 123456789.98765432]'
+    assert compat.json_loads(data) == compat.json.loads(data)
+
+
+def test_set_json_backend_rejects_unknown_backend(json_backend):
+    with pytest.raises(ValueError):
+        compat.set_json_backend('foo')
+
+
+def test_find_json_backend_prefers_accelerated_backends():
+    slow = compat.JSONBackend('ujson', None, None, accelerated=False)
+    fast = compat.JSONBackend('json', None, None)
+    backends = {'ujson': slow, 'json': fast}
+
+    def load_json_backend(name):
+        if name not in backends:
+            raise ImportError(name)
+        return backends[name]
+    with mock.patch.object(compat, 'load_json_backend', load_json_backend):
+        assert compat.find_json_backend() is fast
+        del backends['json']
+        assert compat.find_json_backend() is slow
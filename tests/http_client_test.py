@@ -136,6 +136,77 @@ class SynchronousClientTestCase(unittest.TestCase):
         self.assertTrue(
             httpretty.last_request().headers.get('Authorization') is None)
 
+    def test_pool_is_configured(self):
+        client = SynchronousHttpClient(
+            pool_connections=3, pool_maxsize=20, pool_block=True,
+            max_retries=2, backoff_factor=0.5, retry_statuses=[503])
+        for prefix in ('http://', 'https://'):
+            adapter = client.session.get_adapter(prefix)
+            self.assertEqual(3, adapter._pool_connections)
+            self.assertEqual(20, adapter._pool_maxsize)
+            self.assertTrue(adapter._pool_block)
+            self.assertEqual(2, adapter.max_retries.total)
+            self.assertEqual(0.5, adapter.max_retries.backoff_factor)
+            self.assertEqual([503], adapter.max_retries.status_forcelist)
+
+    @httpretty.activate
+    def test_retry_on_status(self):
+        httpretty.register_uri(
+            httpretty.GET, "http://swagger.py/client-test",
+            responses=[httpretty.Response(body='busy', status=503),
+                       httpretty.Response(body='expected')])
+
+        client = SynchronousHttpClient(max_retries=1, retry_statuses=[503])
+        resp = client.start_request(self._default_params()).wait()
+
+        self.assertEqual(200, resp.status_code)
+        self.assertEqual('expected', resp.text)
+
+    @httpretty.activate
+    def test_last_response_is_returned_once_retries_are_exhausted(self):
+        httpretty.register_uri(
+            httpretty.GET, "http://swagger.py/client-test",
+            body='busy', status=503)
+
+        client = SynchronousHttpClient(max_retries=1, retry_statuses=[503])
+        resp = client.start_request(self._default_params()).wait()
+
+        self.assertEqual(503, resp.status_code)
+        self.assertEqual('busy', resp.text)
+
+    @httpretty.activate
+    def test_default_timeout(self):
+        httpretty.register_uri(
+            httpretty.GET, "http://swagger.py/client-test",
+            body='expected')
+
+        client = SynchronousHttpClient(default_timeout=3)
+        with mock.patch.object(client.session, 'send') as mock_send:
+            client.start_request(self._default_params()).wait()
+            client.start_request(self._default_params()).wait(timeout=1)
+
+        self.assertEqual([3, 1], [call[1]['timeout']
+                                  for call in mock_send.call_args_list])
+
+    @httpretty.activate
+    def test_pool_stats(self):
+        httpretty.register_uri(
+            httpretty.GET, "http://swagger.py/client-test",
+            body='expected')
+
+        client = SynchronousHttpClient(pool_maxsize=4)
+        client.start_request(self._default_params()).wait()
+        client.start_request(self._default_params()).wait()
+
+        self.assertEqual({'http://swagger.py:80': {
+            'maxsize': 4,
+            'idle': 1,
+            'connections': 1,
+            'requests': 2,
+        }}, client.pool_stats())
+        client.close()
+        self.assertEqual({}, client.pool_stats())
+
 
 @pytest.fixture
 def mock_session():
@@ -162,6 +233,16 @@ class TestSynchronousEventual(object):
             mock_session.prepare_request.return_value,
             timeout=timeout)
 
+    def test_stream(self, mock_session, mock_request):
+        timeout = 20
+        sync_eventual = SynchronousEventual(mock_session, mock_request)
+        assert sync_eventual.stream(timeout) == mock_session.send.return_value
+
+        mock_session.send.assert_called_once_with(
+            mock_session.prepare_request.return_value,
+            timeout=timeout,
+            stream=True)
+
     def test_cancel(self, mock_session, mock_request):
         sync_eventual = SynchronousEventual(mock_session, mock_request)
         # no-op cancel, test that is supports the interface
@@ -0,0 +1,157 @@
+# -*- coding: utf-8 -*-
+import httpretty
+import mock
+import pytest
+
+from swaggerpy import instrumentation
+from swaggerpy.client import SwaggerClient
+from swaggerpy.compat import json
+from swaggerpy.http_client import SynchronousHttpClient
+
+
+class RecordingHook(instrumentation.OperationHook):
+
+    def __init__(self):
+        self.timings = []
+        self.payloads = []
+
+    def on_timing(self, resource, nickname, phase, seconds):
+        assert seconds >= 0
+        self.timings.append((resource, nickname, phase))
+
+    def on_payload(self, resource, nickname, payload, size):
+        self.payloads.append((resource, nickname, payload, size))
+
+
+class FailingHook(instrumentation.OperationHook):
+
+    def on_timing(self, resource, nickname, phase, seconds):
+        raise RuntimeError(phase)
+
+    def on_payload(self, resource, nickname, payload, size):
+        raise RuntimeError(payload)
+
+
+@pytest.fixture
+def hook():
+    hook = RecordingHook()
+    instrumentation.add_hook(hook)
+    yield hook
+    instrumentation.remove_hook(hook)
+
+
+PET = {"id": 1, "name": "tommy"}
+
+
+@pytest.fixture
+def client():
+    httpretty.enable()
+    httpretty.register_uri(
+        httpretty.GET, "http://localhost/api-docs",
+        body=json.dumps({
+            "swaggerVersion": "1.2",
+            "apis": [{"path": "/pet"}],
+        }))
+    httpretty.register_uri(
+        httpretty.GET, "http://localhost/api-docs/pet",
+        body=json.dumps({
+            "swaggerVersion": "1.2",
+            "basePath": "http://localhost/api",
+            "apis": [{
+                "path": "/pet",
+                "operations": [{
+                    "method": "POST",
+                    "nickname": "addPet",
+                    "type": "Pet",
+                    "parameters": [{
+                        "paramType": "body",
+                        "name": "body",
+                        "type": "Pet",
+                    }],
+                }],
+            }],
+            "models": {
+                "Pet": {
+                    "id": "Pet",
+                    "properties": {
+                        "id": {"type": "integer"},
+                        "name": {"type": "string"},
+                    },
+                },
+            },
+        }))
+    httpretty.register_uri(
+        httpretty.POST, "http://localhost/api/pet", body=json.dumps(PET))
+    yield SwaggerClient.from_url(u'http://localhost/api-docs')
+    httpretty.disable()
+    httpretty.reset()
+
+
+def test_phases_of_a_call_are_reported(client, hook):
+    pet = client.pet.addPet(body=PET).result()
+    assert pet.name == 'tommy'
+    assert hook.timings == [
+        ('pet', 'addPet', phase) for phase in (
+            instrumentation.REQUEST,
+            instrumentation.WAIT,
+            instrumentation.PARSE,
+            instrumentation.DECODE,
+        )]
+    body_size = len(json.dumps(PET))
+    assert hook.payloads == [
+        ('pet', 'addPet', instrumentation.REQUEST_BODY, body_size),
+        ('pet', 'addPet', instrumentation.RESPONSE_BODY, body_size),
+    ]
+
+
+def test_send_is_timed_for_clients_sending_eagerly(client, hook):
+    with mock.patch.object(SynchronousHttpClient, 'sends_eagerly', True):
+        client.pet.addPet(body=PET).result()
+    assert hook.timings[:3] == [
+        ('pet', 'addPet', instrumentation.REQUEST),
+        ('pet', 'addPet', instrumentation.SEND),
+        ('pet', 'addPet', instrumentation.WAIT),
+    ]
+
+
+def test_failing_hooks_are_logged(client, hook):
+    failing = FailingHook()
+    instrumentation.add_hook(failing)
+    try:
+        with mock.patch.object(instrumentation.log, 'exception') as log:
+            pet = client.pet.addPet(body=PET).result()
+    finally:
+        instrumentation.remove_hook(failing)
+    assert pet.name == 'tommy'
+    # Every report to the failing hook is logged, and the others get them
+    assert len(log.call_args_list) == len(hook.timings) + len(hook.payloads)
+
+
+def test_trusted_results_report_construct(client, hook):
+    client.pet.addPet(body=PET).result(validate=False)
+    assert hook.timings[-1] == ('pet', 'addPet', instrumentation.CONSTRUCT)
+
+
+def test_raw_responses_are_not_decoded(client, hook):
+    assert client.pet.addPet(body=PET).result(raw_response=True) == PET
+    assert hook.timings[-1] == ('pet', 'addPet', instrumentation.PARSE)
+
+
+def test_calls_are_not_timed_without_hooks(client):
+    hook = RecordingHook()
+    instrumentation.add_hook(hook)
+    instrumentation.remove_hook(hook)
+    client.pet.addPet(body=PET).result()
+    assert hook.timings == []
+    assert instrumentation.hooks == ()
+
+
+def test_remove_unknown_hook_raises():
+    with pytest.raises(ValueError):
+        instrumentation.remove_hook(RecordingHook())
+
+
+def test_form_payloads_are_not_reported(hook):
+    instrumentation.record_payload(
+        ('pet', 'addPet'), instrumentation.REQUEST_BODY, {'name': 'tommy'})
+    assert hook.payloads == []
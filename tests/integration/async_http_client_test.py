@@ -8,10 +8,13 @@ import unittest
 import bottle
 
 from swaggerpy.async_http_client import AsynchronousHttpClient
+from swaggerpy.compat import json
+from swaggerpy.json_stream import iter_json_array
 
 
 ROUTE_1_RESPONSE = "HEY BUDDY"
 ROUTE_2_RESPONSE = "BYE BUDDY"
+LIST_SIZE = 20000
 
 
 @bottle.route("/1")
@@ -24,6 +27,12 @@ def two():
     return ROUTE_2_RESPONSE
 
 
+@bottle.route("/list")
+def list_():
+    bottle.response.content_type = 'application/json'
+    return json.dumps([{"id": i} for i in xrange(LIST_SIZE)])
+
+
 def get_hopefully_free_port():
     s = socket.socket()
     s.bind(('', 0))
@@ -71,3 +80,39 @@ class TestServer(unittest.TestCase):
 
         self.assertEqual(resp_one.text, ROUTE_1_RESPONSE)
         self.assertEqual(resp_two.text, ROUTE_2_RESPONSE)
+
+    def test_streamed_request_against_async_client(self):
+        port = get_hopefully_free_port()
+        launch_threaded_http_server(port)
+
+        client = AsynchronousHttpClient()
+
+        eventual = client.start_request({
+            'method': 'GET',
+            'headers': {},
+            'url': "http://localhost:{0}/list".format(port),
+            'params': {},
+        })
+        resp = eventual.stream(timeout=1)
+        resp.raise_for_status()
+        items = list(iter_json_array(resp.iter_content()))
+        resp.close()
+
+        self.assertEqual(200, resp.status_code)
+        self.assertEqual([{"id": i} for i in xrange(LIST_SIZE)], items)
+
+    def test_close_after_requests_against_async_client(self):
+        port = get_hopefully_free_port()
+        launch_threaded_http_server(port)
+
+        client = AsynchronousHttpClient()
+        resp = client.start_request({
+            'method': 'GET',
+            'headers': {},
+            'url': "http://localhost:{0}/1".format(port),
+            'params': {},
+        }).wait(timeout=1)
+        client.close(timeout=1)
+
+        self.assertEqual(ROUTE_1_RESPONSE, resp.text)
+        self.assertFalse(client.pool.persistent)
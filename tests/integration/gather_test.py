@@ -0,0 +1,27 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+from swaggerpy.client import SwaggerClient
+from swaggerpy.http_client import SynchronousHttpClient
+from tests.integration import pet_api  # noqa
+from tests.integration.async_http_client_test import (
+    get_hopefully_free_port,
+    launch_threaded_http_server,
+)
+
+
+class TestGather(unittest.TestCase):
+
+    def test_gather_results_of_sync_http_client_operations(self):
+        port = get_hopefully_free_port()
+        launch_threaded_http_server(port)
+
+        swagger_client = SwaggerClient.from_url(
+            "http://localhost:{0}/api-docs".format(port),
+            http_client=SynchronousHttpClient(pool_maxsize=5))
+        futures = [swagger_client.pet.getPetById(petId=i) for i in xrange(20)]
+        results = swagger_client.gather(futures, max_concurrency=5)
+
+        self.assertTrue(isinstance(results[3], Exception))
+        self.assertEqual([i for i in xrange(20) if i != 3],
+                         results[:3] + results[4:])
@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+"""Routes of a pet api, served by the integration test servers
+"""
+import bottle
+
+from swaggerpy.compat import json
+
+
+@bottle.route("/api-docs")
+def resource_listing():
+    return json.dumps({
+        "swaggerVersion": "1.2",
+        "apis": [{"path": "/pet"}],
+    })
+
+
+@bottle.route("/api-docs/pet")
+def api_declaration():
+    return json.dumps({
+        "swaggerVersion": "1.2",
+        "basePath": "/",
+        "apis": [{
+            "path": "/pet/{petId}",
+            "operations": [{
+                "method": "GET",
+                "nickname": "getPetById",
+                "type": "integer",
+                "parameters": [{"paramType": "path", "name": "petId",
+                                "type": "integer", "required": True}],
+            }],
+        }],
+    })
+
+
+@bottle.route("/pet/<pet_id:int>")
+def get_pet(pet_id):
+    if pet_id == 3:
+        bottle.abort(404, "Not found")
+    return str(pet_id)
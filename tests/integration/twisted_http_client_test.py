@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+import unittest
+
+import crochet
+from twisted.internet.defer import inlineCallbacks, returnValue
+
+from swaggerpy.async_http_client import TwistedHttpClient
+from swaggerpy.client import SwaggerClient
+from swaggerpy.exception import HTTPError
+from tests.integration import pet_api  # noqa
+from tests.integration.async_http_client_test import (
+    get_hopefully_free_port,
+    launch_threaded_http_server,
+)
+
+
+@crochet.run_in_reactor
+@inlineCallbacks
+def get_pets(swagger_client, pet_ids):
+    pets = []
+    for pet_id in pet_ids:
+        try:
+            pet = yield swagger_client.pet.getPetById(petId=pet_id)
+        except HTTPError as e:
+            pet = e
+        pets.append(pet)
+    returnValue(pets)
+
+
+class TestTwistedHttpClient(unittest.TestCase):
+
+    def test_operations_return_deferreds(self):
+        port = get_hopefully_free_port()
+        launch_threaded_http_server(port)
+
+        swagger_client = SwaggerClient.from_url(
+            "http://localhost:{0}/api-docs".format(port),
+            http_client=TwistedHttpClient())
+        pets = get_pets(swagger_client, [1, 2, 3]).wait(timeout=5)
+
+        self.assertEqual([1, 2], pets[:2])
+        self.assertTrue(isinstance(pets[2], HTTPError))
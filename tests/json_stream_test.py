@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from swaggerpy.compat import json
+from swaggerpy.json_stream import iter_json_array, JSONArrayDecoder
+
+
+ITEMS = [
+    {"a": "x,]}\\\"[{", "b": [1, {"c": []}]},
+    2,
+    "s\\",
+    [],
+    {},
+    None,
+    u"é",
+]
+
+
+@pytest.mark.parametrize('chunk_size', range(1, 12))
+def test_items_split_across_chunks(chunk_size):
+    body = json.dumps(ITEMS)
+    chunks = [body[i:i + chunk_size]
+              for i in xrange(0, len(body), chunk_size)]
+    assert list(iter_json_array(chunks)) == ITEMS
+
+
+def test_feed_returns_completed_items():
+    decoder = JSONArrayDecoder()
+    assert decoder.feed('[{"id": 1}, {"i') == [{'id': 1}]
+    assert decoder.feed('d": 2}]') == [{'id': 2}]
+    decoder.close()
+
+
+@pytest.mark.parametrize('body', ['', ' [ ] ', '[]\n'])
+def test_empty(body):
+    assert list(iter_json_array([body])) == []
+
+
+@pytest.mark.parametrize('body', [
+    '{}', '"foo"', '[1,]', '[,1]', '[1', '["a', '[1] 2', '[1][2]', 'x[1]',
+])
+def test_error_on_invalid_array(body):
+    with pytest.raises(ValueError):
+        list(iter_json_array([body]))
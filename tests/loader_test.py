@@ -3,7 +3,14 @@ import unittest
 import pytest
 
 import swaggerpy
-from swaggerpy.swagger_model import load_file
+from swaggerpy.processors import (
+    fuse_processors,
+    FusedProcessor,
+    ParsingContext,
+    SwaggerProcessor,
+    TraversalContext,
+)
+from swaggerpy.swagger_model import load_file, ValidationProcessor
 
 
 class TestProcessor(swaggerpy.swagger_model.SwaggerProcessor):
@@ -11,6 +18,29 @@ class TestProcessor(swaggerpy.swagger_model.SwaggerProcessor):
         resources['processed'] = True
 
 
+class RecordingProcessor(SwaggerProcessor):
+    """Records the objects given to its hooks
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.calls = []
+
+    def process_operation(self, resources, resource, api, operation,
+                          context, model_ids):
+        self.calls.append((self.name, operation[u'nickname']))
+
+    def process_property(self, resources, resource, model, prop,
+                         context, model_ids):
+        self.calls.append((self.name, prop.get(u'name')))
+
+
+class FailingProcessor(SwaggerProcessor):
+    def process_parameter(self, resources, resource, api, operation,
+                          parameter, context, model_ids):
+        raise swaggerpy.exception.SwaggerError(u"Failed", context)
+
+
 class LoaderTest(unittest.TestCase):
     def test_simple(self):
         uut = load_file('test-data/1.2/simple/resources.json')
@@ -23,6 +53,127 @@ class LoaderTest(unittest.TestCase):
         with pytest.raises(IOError):
             load_file('test-data/1.2/missing_resource/resources.json')
 
+    def test_processors(self):
+        uut = load_file('test-data/1.2/simple/resources.json',
+                        processors=[TestProcessor()])
+        self.assertTrue(uut['processed'])
+
+
+class SwaggerProcessorTest(unittest.TestCase):
+    def setUp(self):
+        self.resources = {
+            u'swaggerVersion': u'1.2',
+            u'apis': [{
+                u'path': u'/pet',
+                u'api_declaration': {
+                    u'swaggerVersion': u'1.2',
+                    u'basePath': u'http://localhost/api',
+                    u'apis': [{
+                        u'path': u'/pet/{petId}',
+                        u'operations': [{
+                            u'method': u'GET',
+                            u'nickname': u'getPet',
+                            u'type': u'Pet',
+                            u'parameters': [{
+                                u'name': u'petId',
+                                u'paramType': u'path',
+                                u'type': u'integer',
+                            }],
+                        }],
+                    }],
+                    u'models': {
+                        u'Pet': {
+                            u'id': u'Pet',
+                            u'properties': {
+                                u'name': {u'type': u'string'},
+                            },
+                        },
+                    },
+                },
+            }],
+        }
+
+    def test_overrides(self):
+        processor = RecordingProcessor('a')
+        self.assertTrue(processor.overrides(u'process_operation'))
+        self.assertFalse(processor.overrides(u'process_parameter'))
+
+    def test_apply_skips_unprocessed_objects(self):
+        # Parameters are not visited, so their missing name goes unnoticed
+        del self.resources[u'apis'][0][u'api_declaration'][u'apis'][0][
+            u'operations'][0][u'parameters'][0][u'name']
+        processor = RecordingProcessor('a')
+        processor.apply(self.resources)
+        self.assertEqual([('a', u'getPet'), ('a', None)], processor.calls)
+
+    def test_fused_processors(self):
+        ValidationProcessor().apply(self.resources)
+        first, second = RecordingProcessor('a'), RecordingProcessor('b')
+        FusedProcessor([first, second]).apply(self.resources)
+        self.assertEqual(
+            [('a', u'getPet'), ('a', u'name')], first.calls)
+        self.assertEqual(
+            [('b', u'getPet'), ('b', u'name')], second.calls)
+
+    def test_fused_processor_overrides(self):
+        fused = FusedProcessor([RecordingProcessor('a'), TestProcessor()])
+        self.assertTrue(fused.overrides(u'process_resource_listing'))
+        self.assertTrue(fused.overrides(u'process_property'))
+        self.assertFalse(fused.overrides(u'process_model'))
+
+    def test_fuse_processors(self):
+        processor = TestProcessor()
+        self.assertIsNone(fuse_processors([]))
+        self.assertIs(processor, fuse_processors([processor]))
+        self.assertIsInstance(
+            fuse_processors([processor, TestProcessor()]), FusedProcessor)
+
+    def test_model_ids_are_a_list(self):
+        processor = RecordingProcessor('a')
+        processor.process_operation = lambda model_ids, **kwargs: \
+            processor.calls.append(model_ids[u'model_ids'])
+        processor.apply(self.resources)
+        self.assertEqual(
+            list(self.resources[u'apis'][0][u'api_declaration'][u'models']),
+            processor.calls[0])
+
+    def test_error_context(self):
+        with pytest.raises(swaggerpy.exception.SwaggerError) as excinfo:
+            FailingProcessor().apply(self.resources)
+        context = excinfo.value.args[1]
+        self.assertEqual(
+            [u'resources', u'resource', u'api', u'operation', u'parameter'],
+            context.type_stack)
+        self.assertEqual(
+            [u'json:resource_listing', u'json:api_declaration',
+             u'/pet/{petId}', u'getPet', u'petId'],
+            context.id_stack)
+        self.assertEqual(u'petId', context.args[u'parameter'][u'name'])
+
+    def test_hooks_can_push_to_the_context(self):
+        class PushingProcessor(SwaggerProcessor):
+            def process_operation(self, resources, resource, api, operation,
+                                  context, model_ids):
+                context.push(u'example', {u'id': u'first'}, u'id')
+                context.push_str(u'example', {}, u'second')
+                self.id_stack = context.id_stack
+                context.pop()
+                context.pop()
+                self.type_stack = context.type_stack
+
+        processor = PushingProcessor()
+        processor.apply(self.resources)
+        self.assertEqual(
+            [u'json:resource_listing', u'json:api_declaration',
+             u'/pet/{petId}', u'getPet', u'first', u'second'],
+            processor.id_stack)
+        self.assertEqual(
+            [u'resources', u'resource', u'api', u'operation'],
+            processor.type_stack)
+        self.assertIsInstance(TraversalContext(), ParsingContext)
+        with pytest.raises(IndexError):
+            TraversalContext().pop()
+
 
 if __name__ == '__main__':
     unittest.main()
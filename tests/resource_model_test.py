@@ -290,6 +290,40 @@ class ResourceTest(unittest.TestCase):
         self.assertEqual(User(id=42, schools=[School(
             name="School1"), School(name="School2")]), resp)
 
+    @httpretty.activate
+    def test_success_on_complex_response_type_with_compact_models(self):
+        self.register_urls()
+        httpretty.register_uri(
+            httpretty.GET, "http://localhost/test_http",
+            body=json.dumps(self.sample_model))
+        resource = SwaggerClient.from_url(
+            u'http://localhost/api-docs', compact_models=True).api_test
+        resp = resource.testHTTP().result()
+        models = resource.testHTTP._models
+        User = models['User']
+        School = models['School']
+        self.assertFalse(hasattr(resp, '__dict__'))
+        self.assertEqual(None, resp._raw)
+        self.assertEqual(User(id=42, schools=[School(
+            name="School1"), School(name="School2")]), resp)
+
+    @httpretty.activate
+    def test_success_on_complex_response_type_with_lazy_result(self):
+        self.register_urls()
+        httpretty.register_uri(
+            httpretty.GET, "http://localhost/test_http",
+            body=json.dumps(self.sample_model))
+        resource = SwaggerClient.from_url(
+            u'http://localhost/api-docs').api_test
+        resp = resource.testHTTP().result(lazy=True)
+        models = resource.testHTTP._models
+        User = models['User']
+        School = models['School']
+        self.assertTrue(isinstance(resp, User))
+        self.assertEqual(self.sample_model, resp._raw)
+        self.assertEqual(User(id=42, schools=[School(
+            name="School1"), School(name="School2")]), resp)
+
     @httpretty.activate
     def test_error_on_missing_required_type_instead_of_complex_type(self):
         self.register_urls()
@@ -341,6 +341,30 @@ class ResourceOperationTest(unittest.TestCase):
         self.assertRaises(TypeError, resource.testHTTP,
                           test_param="NOT_INTEGER")
 
+    @httpretty.activate
+    def test_no_type_check_in_query_if_validate_is_false(self):
+        self.parameter["type"] = "integer"
+        self.register_urls()
+        httpretty.register_uri(
+            httpretty.GET, "http://localhost/test_http", body='')
+        resource = SwaggerClient.from_url(
+            u'http://localhost/api-docs').api_test
+        resource.testHTTP(test_param="NOT_INTEGER",
+                          _request_options={'validate': False}).result()
+        self.assertEqual(['NOT_INTEGER'],
+                         httpretty.last_request().querystring['test_param'])
+
+    @httpretty.activate
+    def test_no_type_check_in_query_if_client_validate_is_false(self):
+        self.parameter["type"] = "integer"
+        self.register_urls()
+        resource = SwaggerClient.from_url(
+            u'http://localhost/api-docs', validate=False).api_test
+        resource.testHTTP(test_param="NOT_INTEGER")
+        self.assertRaises(TypeError, resource.testHTTP,
+                          test_param="NOT_INTEGER",
+                          _request_options={'validate': True})
+
     @httpretty.activate
     def test_error_on_get_with_array_type_in_query(self):
         query_parameter = {
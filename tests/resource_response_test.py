@@ -56,6 +56,8 @@ is validated against its type 'Pet' which is defined like so:
 
 import datetime
 from swaggerpy.compat import json
+import threading
+import time
 import unittest
 from mock import Mock
 
@@ -66,7 +68,7 @@ from requests import HTTPError
 from swaggerpy.client import SwaggerClient
 from swaggerpy.exception import CancelledError
 from swaggerpy.processors import SwaggerError
-from swaggerpy.response import HTTPFuture
+from swaggerpy.response import gather, HTTPFuture
 
 
 class HTTPFutureTest(unittest.TestCase):
@@ -87,6 +89,55 @@ class HTTPFutureTest(unittest.TestCase):
     def test_cancelled_returns_false_if_called_before_cancel(self):
         self.assertFalse(self.future.cancelled())
 
+    def test_result_uses_default_timeout_of_http_client(self):
+        self.http_client.default_timeout = 7
+        HTTPFuture(self.http_client, None, Mock()).result()
+        HTTPFuture(self.http_client, None, Mock()).result(timeout=1)
+        wait = self.http_client.start_request.return_value.wait
+        self.assertEqual([7, 1], [call[1]['timeout']
+                                  for call in wait.call_args_list])
+
+
+class GatherTest(unittest.TestCase):
+
+    class SlowFuture(object):
+        lock = threading.Lock()
+        running = 0
+        max_running = 0
+
+        def __init__(self, value):
+            self.value = value
+
+        def result(self, **kwargs):
+            cls = self.__class__
+            with cls.lock:
+                cls.running += 1
+                cls.max_running = max(cls.max_running, cls.running)
+            time.sleep(0.01)
+            with cls.lock:
+                cls.running -= 1
+            if isinstance(self.value, Exception):
+                raise self.value
+            return self.value, kwargs
+
+    def test_results_are_in_order_with_errors(self):
+        error = ValueError("failed")
+        futures = [self.SlowFuture(i) for i in xrange(20)]
+        futures[3] = self.SlowFuture(error)
+        results = gather(futures, max_concurrency=4, timeout=2)
+        self.assertEqual(error, results[3])
+        self.assertEqual([(i, {'timeout': 2}) for i in xrange(20) if i != 3],
+                         results[:3] + results[4:])
+        self.assertEqual(4, self.SlowFuture.max_running)
+
+    def test_empty(self):
+        self.assertEqual([], gather([]))
+
+    def test_max_concurrency_below_one_raises(self):
+        futures = [self.SlowFuture(i) for i in xrange(3)]
+        self.assertRaises(ValueError, gather, futures, max_concurrency=0)
+        self.assertRaises(ValueError, gather, [], max_concurrency=-1)
+
 
 class ResourceResponseTest(unittest.TestCase):
     def setUp(self):
@@ -181,6 +232,18 @@ class ResourceResponseTest(unittest.TestCase):
             future = resource.testHTTP(test_param="foo")
             self.assertRaises(TypeError, future)
 
+    @httpretty.activate
+    def test_no_type_check_on_response_if_validate_is_false(self):
+        self.response["apis"][0]["operations"][0]["type"] = "integer"
+        self.register_urls()
+        httpretty.register_uri(
+            httpretty.GET, "http://localhost/test_http?test_param=foo",
+            body='"NOT_INTEGER"')
+        resource = SwaggerClient.from_url(
+            u'http://localhost/api-docs').api_test
+        resp = resource.testHTTP(test_param="foo").result(validate=False)
+        self.assertEqual("NOT_INTEGER", resp)
+
     @httpretty.activate
     def test_success_on_returning_anything_for_type_void(self):
         # default operation type is void
@@ -251,6 +314,62 @@ class ResourceResponseTest(unittest.TestCase):
         future = resource.testHTTP(test_param="foo")
         self.assertRaises(TypeError, future)
 
+    @httpretty.activate
+    def test_success_on_iterating_over_streamed_array_response(self):
+        self.response["apis"][0]["operations"][0]["type"] = "array"
+        self.response["apis"][0]["operations"][0]["items"] = {
+            "type": "string",
+            "format": "date"
+        }
+        self.register_urls()
+        httpretty.register_uri(
+            httpretty.GET, "http://localhost/test_http?test_param=foo",
+            body='["2014-06-10", "2014-06-11"]')
+        resource = SwaggerClient.from_url(
+            u'http://localhost/api-docs').api_test
+        items = resource.testHTTP(test_param="foo").iter_result()
+        self.assertEqual(datetime.date(2014, 6, 10), next(items))
+        self.assertEqual([datetime.date(2014, 6, 11)], list(items))
+
+    @httpretty.activate
+    def test_error_on_incorrect_item_of_streamed_array_response(self):
+        self.response["apis"][0]["operations"][0]["type"] = "array"
+        self.response["apis"][0]["operations"][0]["items"] = {"type": "string"}
+        self.register_urls()
+        httpretty.register_uri(
+            httpretty.GET, "http://localhost/test_http?test_param=foo",
+            body='["foo", 42]')
+        resource = SwaggerClient.from_url(
+            u'http://localhost/api-docs').api_test
+        items = resource.testHTTP(test_param="foo").iter_result()
+        self.assertEqual(u"foo", next(items))
+        self.assertRaises(TypeError, next, items)
+
+    @httpretty.activate
+    def test_error_on_streaming_response_which_is_not_an_array(self):
+        self.response["apis"][0]["operations"][0]["type"] = "string"
+        self.register_urls()
+        httpretty.register_uri(
+            httpretty.GET, "http://localhost/test_http?test_param=foo",
+            body='"foo"')
+        resource = SwaggerClient.from_url(
+            u'http://localhost/api-docs').api_test
+        self.assertRaises(TypeError,
+                          resource.testHTTP(test_param="foo").iter_result)
+
+    @httpretty.activate
+    def test_error_on_streamed_response_if_response_not_OK(self):
+        self.response["apis"][0]["operations"][0]["type"] = "array"
+        self.response["apis"][0]["operations"][0]["items"] = {"type": "string"}
+        self.register_urls()
+        httpretty.register_uri(
+            httpretty.GET, "http://localhost/test_http?test_param=foo",
+            status=500)
+        resource = SwaggerClient.from_url(
+            u'http://localhost/api-docs').api_test
+        self.assertRaises(HTTPError,
+                          resource.testHTTP(test_param="foo").iter_result)
+
     # Also test that /test_http? is not called when Future is returned for Sync
     @httpretty.activate
     def test_future_is_returned_from_swagger_client(self):
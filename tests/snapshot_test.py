@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+from cStringIO import StringIO
+
+import httpretty
+import mock
+import pytest
+
+from swaggerpy import snapshot
+from swaggerpy.client import SwaggerClient
+from swaggerpy.exception import SnapshotVersionError
+from swaggerpy.http_client import SynchronousHttpClient
+from swaggerpy.swagger_model import is_compact_model_type
+
+
+def resource_listing():
+    return {
+        'swaggerVersion': '1.2',
+        'url': 'http://localhost/api-docs',
+        'apis': [{
+            'path': '/pet',
+            'api_declaration': {
+                'swaggerVersion': '1.2',
+                'basePath': '/api',
+                'apis': [{
+                    'path': '/pet/{petId}',
+                    'operations': [{
+                        'method': 'GET',
+                        'nickname': 'getPetById',
+                        'type': 'Pet',
+                        'summary': 'Find pet by ID',
+                        'parameters': [{'paramType': 'path', 'name': 'petId',
+                                        'type': 'integer', 'required': True}],
+                    }],
+                }],
+                'models': {
+                    'Pet': {
+                        'id': 'Pet',
+                        'required': ['id'],
+                        'properties': {
+                            'id': {'type': 'integer'},
+                            'tags': {'type': 'array',
+                                     'items': {'$ref': 'Tag'}},
+                        },
+                    },
+                    'Tag': {
+                        'id': 'Tag',
+                        'properties': {'name': {'type': 'string'}},
+                    },
+                },
+            },
+        }],
+    }
+
+
+def round_trip(client, http_client=None):
+    fp = StringIO()
+    snapshot.dump_snapshot(client, fp)
+    fp.seek(0)
+    return snapshot.load_snapshot_file(fp, http_client)
+
+
+@httpretty.activate
+def test_loaded_client_performs_requests():
+    httpretty.register_uri(
+        httpretty.GET, 'http://localhost/api/pet/1',
+        body='{"id": 1, "tags": [{"name": "cute"}]}')
+    client = round_trip(
+        SwaggerClient.from_resource_listing(resource_listing()))
+
+    pet = client.pet.getPetById(petId=1).result()
+    assert pet.id == 1
+    assert pet.tags[0].name == 'cute'
+    assert 'Find pet by ID' in client.pet.getPetById.__doc__
+
+
+def test_loaded_client_uses_given_http_client():
+    http_client = SynchronousHttpClient()
+    client = round_trip(
+        SwaggerClient.from_resource_listing(resource_listing()), http_client)
+    assert client.pet.getPetById._http_client is http_client
+
+
+def test_compact_models_are_kept():
+    client = round_trip(SwaggerClient.from_resource_listing(
+        resource_listing(), compact_models=True))
+    models = client.pet.getPetById._models
+    assert is_compact_model_type(models['Pet'])
+    assert models['Pet']._swagger_descriptors['tags'].item.model is \
+        models['Tag']
+
+
+def test_validate_is_kept():
+    client = round_trip(SwaggerClient.from_resource_listing(
+        resource_listing(), validate=False))
+    assert not client._validate
+    assert not client.pet.getPetById._validate
+    assert not client._compact_models
+
+    client = round_trip(SwaggerClient.from_resource_listing(
+        resource_listing()))
+    assert client.pet.getPetById._validate
+
+
+def test_snapshot_of_other_version_is_rejected():
+    client = SwaggerClient.from_resource_listing(resource_listing())
+    fp = StringIO()
+    with mock.patch('swaggerpy.version', '0.0.1'):
+        snapshot.dump_snapshot(client, fp)
+    fp.seek(0)
+
+    with pytest.raises(SnapshotVersionError):
+        snapshot.load_snapshot_file(fp)
+
+
+def test_save_and_load_snapshot_file(tmpdir):
+    path = str(tmpdir.join('pets.snapshot'))
+    snapshot.save_snapshot(
+        SwaggerClient.from_resource_listing(resource_listing()), path)
+
+    client = snapshot.load_snapshot(path)
+    assert repr(client) == 'SwaggerClient(http://localhost/api-docs)'
+    assert dir(client.pet) == ['getPetById']
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*-
+from collections import OrderedDict
+
+import httpretty
+import mock
+import pytest
+
+from swaggerpy.client import SwaggerClient
+from swaggerpy.compat import json
+from swaggerpy.http_client import SynchronousHttpClient
+from swaggerpy.processors import SwaggerProcessor
+from swaggerpy import spec_cache as spec_cache_module
+from swaggerpy.spec_cache import SpecCache
+from swaggerpy import swagger_model
+from swaggerpy.swagger_model import load_resource_listing, ValidationProcessor
+
+URL = 'http://localhost/api-docs'
+
+
+def api_declaration(nickname):
+    return {
+        'swaggerVersion': '1.2',
+        'basePath': 'http://localhost/',
+        'apis': [{
+            'path': '/pet',
+            'operations': [{
+                'method': 'GET',
+                'nickname': nickname,
+                'type': 'integer',
+                'parameters': [],
+            }],
+        }],
+    }
+
+
+class SpecServer(object):
+    """Serves api docs with an ETag, answering 304 to conditional requests
+    for unmodified documents. Pass last_modified to use Last-Modified
+    instead.
+    """
+
+    def __init__(self, last_modified=False):
+        self.last_modified = last_modified
+        self.documents = {}
+        self.requests = []
+
+    def set(self, url, body, version):
+        self.documents[url] = (json.dumps(body), version)
+        httpretty.register_uri(httpretty.GET, url, body=self.respond)
+
+    def respond(self, request, uri, headers):
+        body, version = self.documents[uri]
+        self.requests.append((uri, dict(request.headers)))
+        if self.last_modified:
+            validator = 'Wed, 0%d Jan 2014 00:00:00 GMT' % version
+            headers['Last-Modified'] = validator
+            if request.headers.get('If-Modified-Since') == validator:
+                return 304, headers, ''
+        else:
+            headers['ETag'] = '"v%d"' % version
+            if request.headers.get('If-None-Match') == headers['ETag']:
+                return 304, headers, ''
+        return 200, headers, body
+
+
+@pytest.fixture
+def server():
+    httpretty.enable()
+    server = SpecServer()
+    server.set(URL, {'swaggerVersion': '1.2', 'apis': [{'path': '/pet'}]},
+               1)
+    server.set(URL + '/pet', api_declaration('getPet'), 1)
+    yield server
+    httpretty.disable()
+    httpretty.reset()
+
+
+@pytest.fixture
+def spec_cache(tmpdir):
+    return SpecCache(str(tmpdir.join('specs')))
+
+
+def load(spec_cache, **kwargs):
+    return load_resource_listing(URL, SynchronousHttpClient(),
+                                 spec_cache=spec_cache, **kwargs)
+
+
+class CountingProcessor(SwaggerProcessor):
+    def process_resource_listing(self, resources, context):
+        resources['processed'] = resources.get('processed', 0) + 1
+
+
+def get_nickname(resource_listing):
+    api = resource_listing['apis'][0]['api_declaration']['apis'][0]
+    return api['operations'][0]['nickname']
+
+
+def test_documents_are_cached_with_their_validators(server, spec_cache):
+    resource_listing = load(spec_cache)
+
+    entry = spec_cache.load(URL)
+    assert entry['resource_listing'] == resource_listing
+    assert entry['documents'][URL + '/pet']['etag'] == '"v1"'
+    assert entry['documents'][URL + '/pet']['body'] == \
+        api_declaration('getPet')
+
+
+def test_unmodified_spec_is_not_processed_again(server, spec_cache):
+    resource_listing = load(spec_cache)
+    server.requests = []
+
+    with mock.patch.object(ValidationProcessor, 'apply') as apply:
+        assert load(spec_cache) == resource_listing
+    assert not apply.called
+    assert [headers['if-none-match'] for _, headers in server.requests] == \
+        ['"v1"', '"v1"']
+
+
+def test_modified_declaration_is_fetched(server, spec_cache):
+    load(spec_cache)
+    server.set(URL + '/pet', api_declaration('getPetById'), 2)
+
+    assert get_nickname(load(spec_cache)) == 'getPetById'
+    assert spec_cache.load(URL)['documents'][URL + '/pet']['etag'] == '"v2"'
+    assert get_nickname(load(spec_cache)) == 'getPetById'
+
+
+def test_last_modified_is_revalidated(server, spec_cache):
+    server.last_modified = True
+    load(spec_cache)
+    server.requests = []
+
+    load(spec_cache)
+    assert [headers['if-modified-since'] for _, headers in server.requests] \
+        == ['Wed, 01 Jan 2014 00:00:00 GMT'] * 2
+
+
+def test_fresh_entry_is_used_without_requests(server, tmpdir):
+    spec_cache = SpecCache(str(tmpdir), max_age=60)
+    resource_listing = load(spec_cache)
+    server.requests = []
+
+    assert load(spec_cache) == resource_listing
+    assert server.requests == []
+
+
+@pytest.mark.parametrize('max_age', [0, 60])
+def test_processors_are_applied_to_cached_specs(server, tmpdir, max_age):
+    spec_cache = SpecCache(str(tmpdir), max_age=max_age)
+    assert load(spec_cache, processors=[CountingProcessor()])[
+        'processed'] == 2
+    assert 'processed' not in spec_cache.load(URL)['resource_listing']
+
+    assert load(spec_cache, processors=[CountingProcessor()])[
+        'processed'] == 2
+
+
+@pytest.mark.parametrize('max_age', [0, 60])
+@pytest.mark.parametrize('validation_mode', [
+    swagger_model.VALIDATE_FULL, swagger_model.VALIDATE_CACHED])
+def test_specs_cached_without_validation_are_validated(
+        server, tmpdir, max_age, validation_mode):
+    spec_cache = SpecCache(str(tmpdir), max_age=max_age)
+    with mock.patch.object(swagger_model, '_validated_specs', OrderedDict()):
+        load(spec_cache, validation_mode=swagger_model.VALIDATE_OFF)
+        assert not spec_cache.load(URL)['validated']
+
+        with mock.patch.object(
+                ValidationProcessor, 'apply', autospec=True,
+                side_effect=ValidationProcessor.apply) as apply:
+            load(spec_cache, validation_mode=validation_mode)
+        assert apply.call_count == 1
+        assert spec_cache.load(URL)['validated']
+
+
+def test_unreadable_entries_are_ignored(server, spec_cache):
+    load(spec_cache)
+    with open(spec_cache.get_path(URL), 'w') as fp:
+        fp.write('{"truncated": ')
+    assert spec_cache.load(URL) is None
+
+    load(spec_cache)
+    assert spec_cache.load(URL) is not None
+
+
+def test_entries_of_other_versions_are_ignored(server, spec_cache):
+    load(spec_cache)
+    with mock.patch.object(spec_cache_module, 'CACHE_FORMAT_VERSION', 0):
+        assert spec_cache.load(URL) is None
+
+
+def test_client_from_url_uses_spec_cache(server, spec_cache):
+    SwaggerClient.from_url(URL, spec_cache=spec_cache)
+    server.requests = []
+
+    client = SwaggerClient.from_url(URL, spec_cache=spec_cache)
+    assert client.pet.getPet
+    assert len(server.requests) == 2
+    assert all('if-none-match' in headers for _, headers in server.requests)
+
+
+def test_get_validators_of_async_responses():
+    response = mock.Mock(headers={'Etag': ['"v1"'],
+                                  'Last-Modified': ['Wed, 01 Jan 2014']})
+    assert spec_cache_module.get_validators(response) == \
+        ('"v1"', 'Wed, 01 Jan 2014')
@@ -1,7 +1,12 @@
+from collections import OrderedDict
+import datetime
+import threading
+import time
+
 import mock
 import pytest
 
-from swaggerpy.exception import SwaggerError
+from swaggerpy.exception import SwaggerError, TimeoutError
 from swaggerpy import swagger_model
 from swaggerpy.swagger_model import (
     validate_required_fields,
@@ -76,3 +81,439 @@ class TestCreateModelType(object):
         assert not mock_create_docstring.called
         assert model_type.__doc__ == mock_create_docstring.return_value
         mock_create_docstring.assert_called_once_with(self.model['properties'])
+
+
+class TestGeneratedModelFunctions(object):
+
+    @pytest.fixture
+    def models(self):
+        models = {
+            'Tag': swagger_model.create_model_type({
+                'id': 'Tag',
+                'properties': {'name': {'type': 'string'}},
+                'required': ['name'],
+            }),
+            'Pet': swagger_model.create_model_type({
+                'id': 'Pet',
+                'properties': {
+                    'id': {'type': 'integer', 'format': 'int64'},
+                    'tags': {'type': 'array', 'items': {'$ref': 'Tag'}},
+                    'born': {'type': 'string', 'format': 'date'},
+                },
+            }),
+        }
+        swagger_model.bind_model_types(models)
+        return models
+
+    def test_validate_converts_fields_in_place(self, models):
+        value = {'id': 1, 'born': '2014-06-10', 'extra': 'x'}
+        assert models['Pet']._validate(value, models, False) is value
+        assert value['born'] == datetime.date(2014, 6, 10)
+        assert value['extra'] == 'x'
+
+    def test_validate_raises_on_nested_errors(self, models):
+        with pytest.raises(TypeError):
+            models['Pet']._validate({'tags': [{'name': 1}]}, models, False)
+        with pytest.raises(AssertionError):
+            models['Pet']._validate({'tags': [{}]}, models, False)
+        with pytest.raises(TypeError):
+            models['Pet']._validate({'tags': [None]}, models, False)
+        models['Pet']._validate({'tags': [None]}, models, True)
+
+    def test_from_dict_builds_nested_instances(self, models):
+        Pet, Tag = models['Pet'], models['Tag']
+        value = {'id': 1, 'tags': [{'name': 'a'}], 'extra': 'x'}
+        pet = Pet._from_dict(value, models)
+        assert isinstance(pet, Pet)
+        assert isinstance(pet.tags[0], Tag)
+        assert pet == Pet(id=1, tags=[Tag(name='a')], born=None)
+        assert pet._raw is value
+
+    def test_from_dict_does_not_share_mutable_defaults(self, models):
+        first = models['Pet']._from_dict({}, models)
+        second = models['Pet']._from_dict({}, models)
+        assert first.tags == [] and first.tags is not second.tags
+
+    def test_decode_validates_and_builds_without_modifying_value(self, models):
+        Pet, Tag = models['Pet'], models['Tag']
+        value = {'id': 1, 'born': '2014-06-10', 'tags': [{'name': 'a'}]}
+        pet = Pet._decode(value, models, False)
+        assert pet == Pet(id=1, tags=[Tag(name='a')],
+                          born=datetime.date(2014, 6, 10))
+        assert pet._raw is value
+        assert value['born'] == '2014-06-10'
+
+    def test_decode_raises_on_nested_errors(self, models):
+        Pet = models['Pet']
+        with pytest.raises(TypeError):
+            Pet._decode({'tags': [{'name': 1}]}, models, False)
+        with pytest.raises(AssertionError):
+            Pet._decode({'tags': [{}]}, models, False)
+        with pytest.raises(TypeError):
+            Pet._decode({'tags': [None]}, models, False)
+        assert Pet._decode({'tags': [None]}, models, True).tags == [None]
+
+
+class TestLazyModelType(object):
+
+    @pytest.fixture(params=[False, True])
+    def models(self, request):
+        models = {
+            'Tag': swagger_model.create_model_type({
+                'id': 'Tag',
+                'properties': {'name': {'type': 'string'}},
+            }, compact=request.param),
+            'Pet': swagger_model.create_model_type({
+                'id': 'Pet',
+                'properties': {
+                    'id': {'type': 'integer', 'format': 'int64'},
+                    'tags': {'type': 'array', 'items': {'$ref': 'Tag'}},
+                    'born': {'type': 'string', 'format': 'date'},
+                },
+                'required': ['id'],
+            }, compact=request.param),
+        }
+        swagger_model.bind_model_types(models)
+        return models
+
+    def test_fields_are_decoded_on_first_read(self, models):
+        Pet, Tag = models['Pet'], models['Tag']
+        value = {'id': 1, 'born': '2014-06-10', 'tags': [{'name': 'a'}]}
+        pet = Pet._decode_lazy(value, models, False)
+        assert isinstance(pet, Pet)
+        assert isinstance(pet, swagger_model.LazyModel)
+        assert pet.born == datetime.date(2014, 6, 10)
+        assert pet.born is pet.born
+        assert isinstance(pet.tags[0], Tag)
+        assert pet.tags[0].name == 'a'
+        assert value['born'] == '2014-06-10'
+
+    def test_compare_flat_dict_and_repr(self, models):
+        Pet, Tag = models['Pet'], models['Tag']
+        pet = Pet._decode_lazy({'id': 1, 'tags': [{'name': 'a'}]},
+                               models, False)
+        expected = Pet(id=1, tags=[Tag(name='a')], born=None)
+        assert pet == expected
+        assert expected == pet
+        assert pet._flat_dict()['tags'][0]['name'] == 'a'
+        assert repr(pet) == repr(expected)
+
+    def test_errors_are_raised_when_field_is_read(self, models):
+        pet = models['Pet']._decode_lazy({'id': 'x', 'tags': [{'name': 1}]},
+                                         models, False)
+        with pytest.raises(TypeError):
+            pet.id
+        with pytest.raises(TypeError):
+            pet.tags[0].name
+
+    def test_type_and_required_fields_are_checked_upfront(self, models):
+        with pytest.raises(TypeError):
+            models['Pet']._decode_lazy([], models, False)
+        with pytest.raises(AssertionError):
+            models['Pet']._decode_lazy({'tags': []}, models, False)
+
+    def test_unknown_attributes_raise_attribute_error(self, models):
+        pet = models['Pet']._decode_lazy({'id': 1}, models, False)
+        with pytest.raises(AttributeError):
+            pet.extra
+
+
+class TestCompactModelType(object):
+
+    @pytest.fixture
+    def models(self):
+        models = {
+            'Tag': swagger_model.create_model_type({
+                'id': 'Tag',
+                'properties': {'name': {'type': 'string'}},
+            }, compact=True),
+            'Pet': swagger_model.create_model_type({
+                'id': 'Pet',
+                'properties': {
+                    'id': {'type': 'integer', 'format': 'int64'},
+                    'tags': {'type': 'array', 'items': {'$ref': 'Tag'}},
+                },
+                'required': ['id'],
+            }, compact=True),
+        }
+        swagger_model.bind_model_types(models)
+        return models
+
+    def test_instances_use_slots(self, models):
+        pet = models['Pet'](id=1)
+        assert not hasattr(pet, '__dict__')
+        assert set(models['Pet'].__slots__) == set(['id', 'tags'])
+        assert pet._raw is None
+        with pytest.raises(AttributeError):
+            pet.extra = 1
+
+    def test_compare_flat_dict_and_repr(self, models):
+        Pet, Tag = models['Pet'], models['Tag']
+        pet = Pet(id=1, tags=[Tag(name='a'), None])
+        assert pet == Pet(id=1, tags=[Tag(name='a'), None])
+        assert not pet == Pet(id=2)
+        assert not pet == 1
+        assert pet._flat_dict() == {'id': 1, 'tags': [{'name': 'a'}]}
+        assert repr(Tag(name='a')) == "Tag(name='a')"
+
+    def test_decode_builds_compact_instances(self, models):
+        Pet, Tag = models['Pet'], models['Tag']
+        value = {'id': 1, 'tags': [{'name': 'a'}], 'extra': 'x'}
+        pet = Pet._decode(value, models, False)
+        assert pet == Pet(id=1, tags=[Tag(name='a')])
+        assert pet._raw is None
+        assert Pet._from_dict(value, models) == pet
+
+    def test_falls_back_to_dict_if_properties_are_not_identifiers(self):
+        model_type = swagger_model.create_model_type({
+            'id': 'Odd',
+            'properties': {'odd-name': {'type': 'string'}},
+        }, compact=True)
+        assert not swagger_model.is_compact_model_type(model_type)
+        assert vars(model_type(**{'odd-name': 'a'})) == {'odd-name': 'a'}
+
+
+class TestLazyModels(object):
+
+    @pytest.fixture
+    def models(self):
+        return swagger_model.LazyModels({
+            'Node': {
+                'id': 'Node',
+                'properties': {
+                    'parent': {'$ref': 'Node'},
+                    'tags': {'type': 'array', 'items': {'$ref': 'Tag'}},
+                },
+            },
+            'Tag': {'id': 'Tag', 'properties': {'name': {'type': 'string'}}},
+            'Unused': {'id': 'Unused', 'properties': {}},
+        })
+
+    def test_types_are_generated_on_first_lookup(self, models):
+        assert sorted(models) == ['Node', 'Tag', 'Unused']
+        node = models['Node']
+        assert models['Node'] is node
+        assert sorted(models._types) == ['Node', 'Tag']
+
+    def test_referred_types_are_bound(self, models):
+        node = models['Node']
+        assert node._swagger_descriptors['parent'].model is node
+        assert node._swagger_descriptors['tags'].item.model is models['Tag']
+        value = node._decode(
+            {'parent': {'tags': [{'name': 'a'}]}}, models, False)
+        assert value.parent.tags[0].name == 'a'
+
+    def test_unknown_model_raises_key_error(self, models):
+        with pytest.raises(KeyError):
+            models['Pet']
+        assert models.get('Pet') is None
+
+
+class TestModelRegistry(object):
+
+    def definitions(self, category_properties):
+        return {
+            'Pet': {
+                'id': 'Pet',
+                'properties': {'category': {'$ref': 'Category'}},
+            },
+            'Category': {
+                'id': 'Category',
+                'properties': category_properties,
+            },
+            'Error': {
+                'id': 'Error',
+                'properties': {'message': {'type': 'string'}},
+            },
+        }
+
+    def test_identical_models_share_their_type(self):
+        registry = swagger_model.ModelRegistry()
+        first = swagger_model.LazyModels(
+            self.definitions({'id': {'type': 'integer'}}), registry=registry)
+        second = swagger_model.LazyModels(
+            self.definitions({'id': {'type': 'integer'}}), registry=registry)
+        assert first['Pet'] is second['Pet']
+        assert first['Category'] is second['Category']
+        assert len(registry) == 2
+
+    def test_models_referring_to_different_models_do_not(self):
+        registry = swagger_model.ModelRegistry()
+        first = swagger_model.LazyModels(
+            self.definitions({'id': {'type': 'integer'}}), registry=registry)
+        second = swagger_model.LazyModels(
+            self.definitions({'id': {'type': 'string'}}), registry=registry)
+        assert first['Error'] is second['Error']
+        assert first['Pet'] is not second['Pet']
+        assert second['Pet']._swagger_descriptors['category'].model is \
+            second['Category']
+
+    def test_model_key_depends_on_compact(self):
+        definitions = self.definitions({})
+        assert swagger_model.model_key('Pet', definitions) != \
+            swagger_model.model_key('Pet', definitions, compact=True)
+
+
+class SlowEventual(object):
+    """Returns an api doc after a delay, counting the concurrent waits.
+    """
+
+    lock = threading.Lock()
+
+    def __init__(self, api_doc, delay, counter):
+        self.api_doc = api_doc
+        self.delay = delay
+        self.counter = counter
+
+    def wait(self, timeout):
+        with self.lock:
+            self.counter['current'] += 1
+            self.counter['max'] = max(self.counter['max'],
+                                      self.counter['current'])
+        time.sleep(self.delay)
+        with self.lock:
+            self.counter['current'] -= 1
+        return mock.Mock(json=lambda: self.api_doc)
+
+
+class TestLoadResourceListing(object):
+
+    def api_declaration(self, name):
+        return {
+            'swaggerVersion': '1.2',
+            'basePath': 'http://localhost/',
+            'apis': [{
+                'path': '/%s' % name,
+                'operations': [{
+                    'method': 'GET',
+                    'nickname': 'get_%s' % name,
+                    'type': 'integer',
+                    'parameters': [],
+                }],
+            }],
+        }
+
+    def http_client(self, count, delay, counter):
+        api_docs = {'http://localhost/api-docs': {
+            'swaggerVersion': '1.2',
+            'apis': [{'path': '/r%d' % i} for i in xrange(count)],
+        }}
+        for i in xrange(count):
+            api_docs['http://localhost/api-docs/r%d' % i] = \
+                self.api_declaration('r%d' % i)
+        http_client = mock.Mock()
+        http_client.start_request.side_effect = lambda params: SlowEventual(
+            api_docs[params['url']], delay, counter)
+        return http_client
+
+    def test_api_declarations_are_fetched_concurrently(self):
+        counter = {'current': 0, 'max': 0}
+        http_client = self.http_client(12, 0.05, counter)
+
+        resource_listing = swagger_model.load_resource_listing(
+            'http://localhost/api-docs', http_client, max_concurrency=4)
+
+        assert counter['max'] == 4
+        assert [api['api_declaration']['apis'][0]['path']
+                for api in resource_listing['apis']] == \
+            ['/r%d' % i for i in xrange(12)]
+
+    def test_timeout_is_a_deadline_for_the_whole_spec(self):
+        counter = {'current': 0, 'max': 0}
+        http_client = self.http_client(10, 0.1, counter)
+
+        with pytest.raises(TimeoutError):
+            swagger_model.load_resource_listing(
+                'http://localhost/api-docs', http_client,
+                request_options={'timeout': 0.35}, max_concurrency=1)
+        assert http_client.start_request.call_count < 11
+
+    def test_first_error_is_raised(self):
+        counter = {'current': 0, 'max': 0}
+        http_client = self.http_client(3, 0, counter)
+        error = IOError('Connection refused')
+
+        def start_request(params):
+            if params['url'].endswith('/r1'):
+                raise error
+            return SlowEventual(self.api_declaration('r'), 0, counter)
+        listing = http_client.start_request.side_effect(
+            {'url': 'http://localhost/api-docs'})
+        http_client.start_request.side_effect = lambda params: (
+            listing if params['url'].endswith('/api-docs')
+            else start_request(params))
+
+        with pytest.raises(IOError) as excinfo:
+            swagger_model.load_resource_listing(
+                'http://localhost/api-docs', http_client)
+        assert excinfo.value is error
+
+    def load(self, validation_mode, count=2):
+        counter = {'current': 0, 'max': 0}
+        return swagger_model.load_resource_listing(
+            'http://localhost/api-docs', self.http_client(count, 0, counter),
+            validation_mode=validation_mode)
+
+    @pytest.mark.parametrize('validation_mode, applies', [
+        (swagger_model.VALIDATE_FULL, 2),
+        (swagger_model.VALIDATE_CACHED, 1),
+        (swagger_model.VALIDATE_OFF, 0),
+    ])
+    def test_validation_modes(self, validation_mode, applies):
+        with mock.patch.object(swagger_model, '_validated_specs',
+                               OrderedDict()), \
+                mock.patch.object(
+                    swagger_model.ValidationProcessor, 'apply',
+                    autospec=True,
+                    side_effect=swagger_model.ValidationProcessor.apply) as \
+                apply:
+            first = self.load(validation_mode)
+            second = self.load(validation_mode)
+        assert apply.call_count == applies
+        assert first == second
+
+    def test_cached_validation_is_per_content(self):
+        with mock.patch.object(swagger_model, '_validated_specs',
+                               OrderedDict()), \
+                mock.patch.object(swagger_model.ValidationProcessor,
+                                  'apply') as apply:
+            self.load(swagger_model.VALIDATE_CACHED, count=2)
+            self.load(swagger_model.VALIDATE_CACHED, count=3)
+        assert apply.call_count == 2
+
+    def test_cached_validation_forgets_least_recently_used_specs(self):
+        with mock.patch.object(swagger_model, '_validated_specs',
+                               OrderedDict()), \
+                mock.patch.object(swagger_model, 'MAX_VALIDATED_SPECS', 2), \
+                mock.patch.object(swagger_model.ValidationProcessor,
+                                  'apply') as apply:
+            for count in (1, 2, 1, 3, 1, 2):
+                self.load(swagger_model.VALIDATE_CACHED, count=count)
+        # 2 is forgotten when 3 is validated, as 1 was used after it
+        assert apply.call_count == 4
+
+    def test_unknown_validation_mode_raises(self):
+        with pytest.raises(ValueError):
+            self.load('partial')
+
+
+class TestValidationProcessor(object):
+
+    def test_allowed_types_are_built_once_per_declaration(self):
+        processor = swagger_model.ValidationProcessor()
+        model_ids = {'model_ids': ['Pet']}
+        param_types, operation_types = processor.get_allowed_types(model_ids)
+        assert 'Pet' in param_types and 'void' not in param_types
+        assert 'Pet' in operation_types and 'void' in operation_types
+        assert processor.get_allowed_types(model_ids)[0] is param_types
+        other_types, _ = processor.get_allowed_types(
+            {'model_ids': ['Tag']})
+        assert 'Tag' in other_types and 'Pet' not in other_types
+
+    def test_unknown_ref_raises_with_sorted_allowed_types(self):
+        with pytest.raises(TypeError) as excinfo:
+            swagger_model.validate_type_or_ref(
+                {'$ref': 'Unknown'}, {'model_ids': ['Pet']},
+                swagger_model.PROPERTY_TYPES, frozenset(['Pet']), None)
+        assert "Unknown not in allowed types: [u'File', 'Pet'" in \
+            str(excinfo.value)
@@ -0,0 +1,87 @@
+import datetime
+
+import pytest
+
+from swaggerpy import swagger_type
+from swaggerpy.swagger_model import bind_model_types, create_model_type
+from swaggerpy.swagger_type import compile_type, SwaggerTypeCheck
+
+
+@pytest.fixture
+def models():
+    models = {
+        'Tag': create_model_type({
+            'id': 'Tag',
+            'properties': {'name': {'type': 'string'}},
+        }),
+        'Pet': create_model_type({
+            'id': 'Pet',
+            'properties': {
+                'id': {'type': 'integer', 'format': 'int64'},
+                'tags': {'type': 'array', 'items': {'$ref': 'Tag'}},
+            },
+            'required': ['id'],
+        }),
+    }
+    bind_model_types(models)
+    return models
+
+
+def test_compile_type_is_interned():
+    assert compile_type('array:integer:int64') is \
+        compile_type('array:integer:int64')
+
+
+def test_compile_type_of_primitive():
+    type_ = compile_type('integer:int64')
+    assert type_.kind is swagger_type.PRIMITIVE
+    assert type_.py_type is long
+    assert type_.check_type == (long, int)
+
+
+def test_compile_type_of_array():
+    type_ = compile_type('array:string:date-time')
+    assert type_.kind is swagger_type.ARRAY
+    assert type_.py_type is list
+    assert type_.item is compile_type('string:date-time')
+    assert type_.item.check_type is datetime.datetime
+
+
+def test_compile_type_of_void_and_complex():
+    assert compile_type('void').kind is swagger_type.VOID
+    assert compile_type('Pet').kind is swagger_type.COMPLEX
+    assert compile_type('Pet').model is None
+
+
+def test_compile_type_binds_models(models):
+    type_ = compile_type('array:Pet', models)
+    assert type_.item.model is models['Pet']
+    assert type_ is compile_type('array:Pet', models)
+    assert type_ is not compile_type('array:Pet')
+    tags = models['Pet']._swagger_descriptors['tags']
+    assert tags.item.model is models['Tag']
+
+
+def test_compile_type_leaves_unknown_models_unbound(models):
+    assert compile_type('Unknown', models) is compile_type('Unknown')
+
+
+def test_array_of_keeps_item_binding(models):
+    pet = compile_type('Pet', models)
+    assert swagger_type.array_of(pet) is compile_type('array:Pet', models)
+
+
+def test_type_descriptor_is_immutable():
+    with pytest.raises(AttributeError):
+        compile_type('string').kind = swagger_type.ARRAY
+
+
+def test_type_check_dispatches_on_bound_descriptor(models):
+    type_ = compile_type('Pet', models)
+    value = SwaggerTypeCheck('pet', {'id': 1, 'tags': [{'name': 'a'}]},
+                             type_).value
+    assert value == {'id': 1, 'tags': [{'name': 'a'}]}
+    with pytest.raises(TypeError):
+        SwaggerTypeCheck('pet', {'id': 1, 'tags': [{'name': 1}]}, type_)
+    with pytest.raises(AssertionError):
+        SwaggerTypeCheck('pet', {'tags': []}, type_)